@@ -0,0 +1,116 @@
+"""
+مقارنة محركات قراءة الملفات (pandas / pyarrow): زمن التحميل والذاكرة المستهلكة
+
+الاستخدام:
+    python benchmarks/bench_reader_backends.py --rows 1000000
+    python benchmarks/bench_reader_backends.py --file path/to/sales.csv
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from sales_data_loader import read_sales_file, READER_BACKENDS
+
+
+def generate_sales_csv(path, rows, seed=0):
+    """إنشاء ملف مبيعات تجريبي بالحجم المطلوب"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'order_id': np.arange(rows),
+        'order_date': pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 730, rows), unit='D'),
+        'customer_id': rng.integers(0, max(rows // 20, 1), rows),
+        'product_name': rng.choice([f'منتج {i}' for i in range(500)], rows),
+        'category': rng.choice(['إلكترونيات', 'ملابس', 'أغذية', 'أدوات منزلية'], rows),
+        'region': rng.choice(['الرياض', 'جدة', 'الدمام', 'مكة', 'المدينة'], rows),
+        'salesperson': rng.choice([f'مندوب {i}' for i in range(40)], rows),
+        'payment_method': rng.choice(['نقدي', 'بطاقة', 'تحويل'], rows),
+        'quantity': rng.integers(1, 20, rows),
+        'total_amount': np.round(rng.gamma(2.0, 150.0, rows), 2),
+        'cost': np.round(rng.gamma(2.0, 10.0, rows), 2),
+        'discount': np.round(rng.uniform(0, 20, rows), 2),
+    })
+    df.to_csv(path, index=False)
+
+
+def peak_rss_mb():
+    """ذروة الذاكرة المقيمة للعملية الحالية بالميغابايت"""
+    # VmHWM تبدأ من جديد مع كل عملية، بعكس ru_maxrss التي ترث قيمة الأب على Linux
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_worker(backend, path):
+    """قياس محرك واحد داخل عملية مستقلة حتى لا تتداخل قراءات الذاكرة"""
+    with open(path, 'rb') as f:
+        content = f.read()
+
+    baseline_rss = peak_rss_mb()
+    start = time.perf_counter()
+    df, _ = read_sales_file(os.path.basename(path), content, backend)
+    load_time = time.perf_counter() - start
+    peak_rss = peak_rss_mb()
+
+    print(json.dumps({
+        'backend': backend,
+        'rows': len(df),
+        'load_time': load_time,
+        'peak_rss_mb': peak_rss,
+        'rss_growth_mb': peak_rss - baseline_rss,
+        'frame_mb': df.memory_usage(deep=True).sum() / 1024 ** 2,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--file', help='ملف CSV/Excel موجود بدلاً من البيانات التجريبية')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--worker', choices=READER_BACKENDS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.file)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = args.file
+        if path is None:
+            path = os.path.join(tmp_dir, 'sales.csv')
+            generate_sales_csv(path, args.rows)
+
+        print(f"file: {path} ({os.path.getsize(path) / 1024 ** 2:,.1f} MB)")
+        print(f"{'backend':<10}{'rows':>12}{'load (s)':>12}{'peak RSS (MB)':>16}{'RSS growth (MB)':>18}{'frame (MB)':>12}")
+
+        for backend in READER_BACKENDS:
+            runs = []
+            for _ in range(args.repeat):
+                output = subprocess.run(
+                    [sys.executable, __file__, '--worker', backend, '--file', path],
+                    check=True, capture_output=True, text=True
+                ).stdout
+                runs.append(json.loads(output.strip().splitlines()[-1]))
+
+            best = min(runs, key=lambda run: run['load_time'])
+            print(f"{backend:<10}{best['rows']:>12,}{best['load_time']:>12.3f}"
+                  f"{best['peak_rss_mb']:>16.1f}{best['rss_growth_mb']:>18.1f}{best['frame_mb']:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
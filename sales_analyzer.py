@@ -1,15 +1,47 @@
 """
-وحدة التحليل الذكي لبيانات المبيعات
+وحدة التحليل الذكي لبيانات المبيعات - مستقلة عن Streamlit (تستخدمها لوحة التحكم ووضع الدفعات)
 """
 
-import pandas as pd
-import numpy as np
 from datetime import datetime
 
+import numpy as np
+import pandas as pd
+
+from sales_translations import TranslationSystem
+from sales_duplicates import find_duplicates, resolve_key_columns
+from sales_dataset_registry import read_only_view
+from sales_prepared import PreparedSalesDataset
+from sales_section_cache import SectionCache, mapping_key
+from sales_sketches import EXACT_DISTINCT_LIMIT, QUANTILES, QUANTILE_GROUP_FIELDS
+from sales_growth import GROWTH_PERIODS, GROWTH_WINDOWS, GROWTH_GROUP_FIELDS, growth_rate
+from sales_rfm import summarize_rfm
+from sales_portfolio import summarize_portfolio
+from sales_profiler import profile_columns, PROFILE_OUTLIER_WARN_RATIO
+from sales_projection import NUMERIC_FIELDS
+
+
 class SalesDataAnalyzer:
-    def __init__(self, dataframe, column_mapping):
-        self.df = dataframe.copy()
+    def __init__(self, dataframe, column_mapping, sources=None, duplicate_key='all', max_fingerprints=None,
+                 prepared=None, dataset_key=None, section_cache=None, distinct_mode='auto', profile_budget=None):
+        # مرجع للقراءة فقط: الأعمدة المحوّلة تُحفظ في طبقة البيانات المُجهّزة بدلاً من نسخ البيانات وتعديلها
+        self.df = read_only_view(dataframe)
         self.mapping = column_mapping
+        # يمكن تمرير بيانات مُجهّزة محفوظة (في الجلسة) حتى لا يُعاد تحويل الحقول مع كل تحليل
+        self.prepared = prepared if prepared is not None else PreparedSalesDataset(self.df, column_mapping)
+        # sources: (اسم الملف, عدد الصفوف) بترتيب الصفوف في البيانات المدمجة
+        self.sources = sources
+        self.duplicate_key = duplicate_key
+        self.max_fingerprints = max_fingerprints
+        self.duplicate_report = None
+        # رسائل للمستخدم (المستوى, النص) تعرضها الواجهة أو تُكتب في سجل الدفعات
+        self.notices = []
+        # عدّ العملاء والمنتجات: exact أو sketch (HyperLogLog) أو auto (تقريبي فوق EXACT_DISTINCT_LIMIT صف)
+        self.distinct_mode = distinct_mode
+        # مهلة فحص الجودة بالثواني (None = كل الصفوف، وإلا عيّنة بحجم ما يتسع للمهلة)
+        self.profile_budget = profile_budget
+        # نتائج الأقسام مفهرسة بهوية البيانات والتعيين (ذاكرة الجلسة تُمرَّر من الواجهة لتبقى بين إعادات التشغيل)
+        self.section_cache = section_cache if section_cache is not None else SectionCache()
+        self.section_cache.bind((dataset_key if dataset_key is not None else id(dataframe), mapping_key(column_mapping)))
     
     def analyze_all(self):
         """إجراء جميع التحليلات المتاحة للمبيعات"""
@@ -18,154 +50,286 @@ class SalesDataAnalyzer:
             'distributions': {},
             'trends': {},
             'insights': [],
-            'warnings': []
+            'warnings': [],
+            'quality_profile': {},
+            'percentiles': {},
+            'top_performers': {},
+            'growth_metrics': {},
+            'customer_analysis': {},
+            'product_analysis': {}
         }
         
-        # 1. تحليل KPIs
-        analysis_results['kpis'] = self._calculate_kpis()
-        
-        # 2. توزيع البيانات
-        analysis_results['distributions'] = self._analyze_distributions()
-        
-        # 3. تحليل الاتجاهات
-        analysis_results['trends'] = self._analyze_trends()
+        lang = TranslationSystem.current_language()
         
-        # 4. استخلاص Insights
-        analysis_results['insights'] = self._extract_insights()
-        
-        # 5. التحذيرات
-        analysis_results['warnings'] = self._check_data_quality()
+        analysis_results['kpis'] = self._calculate_kpis()
+        analysis_results['distributions'] = self._memo('distributions', self._analyze_distributions)
+        analysis_results['trends'] = self._memo('trends', self._analyze_trends)
+        analysis_results['percentiles'] = self._memo('percentiles', self._analyze_percentiles)
+        analysis_results['insights'] = self._memo('insights', self._extract_insights, lang)
+        analysis_results['warnings'] = self._memo('warnings', self._check_data_quality, lang, self.profile_budget,
+                                                  *self._duplicate_options())
+        analysis_results['quality_profile'] = self._profile_quality()
+        analysis_results['duplicates'] = self._find_duplicates()
+        analysis_results['coercion'] = self.prepared.coercion_stats()
+        analysis_results['top_performers'] = self._memo('top_performers', self._identify_top_performers)
+        analysis_results['growth_metrics'] = self._memo('growth_metrics', self._calculate_growth_metrics, lang)
+        analysis_results['customer_analysis'] = self._memo('customer_analysis', self._analyze_customer_segments)
+        analysis_results['product_analysis'] = self._memo('product_analysis', self._analyze_product_portfolio)
         
         return analysis_results
     
+    def _memo(self, section, compute, *options):
+        """نتيجة قسم من الذاكرة أو حسابها مرة واحدة - رسائل القسم تُعاد مع النتيجة المخزنة"""
+        found, entry = self.section_cache.get(section, options)
+        if found:
+            result, notices = entry
+            self.notices.extend(notice for notice in notices if notice not in self.notices)
+            return result
+        
+        start = len(self.notices)
+        result = compute()
+        self.section_cache.put(section, (result, self.notices[start:]), options)
+        return result
+    
+    def _duplicate_options(self):
+        """خيارات كشف التكرار التي تدخل في مفتاح نتائجه"""
+        return (self.duplicate_key, tuple(self.sources or ()), self.max_fingerprints)
+    
+    def _group_aggregates(self):
+        """مجاميع كل الأبعاد بتمريرة واحدة (مشتركة مع الرسوم عبر البيانات المُجهّزة)"""
+        return self._memo('group_aggregates', self.prepared.aggregates)
+    
+    def _find_duplicates(self):
+        """تقرير التكرارات (بصمات الصفوف على مفتاح التكرار المختار)"""
+        def compute():
+            key_columns = resolve_key_columns(self.df, self.mapping, self.duplicate_key)
+            return find_duplicates(self.df, key_columns, self.sources, self.max_fingerprints)
+        
+        self.duplicate_report = self._memo('duplicates', compute, *self._duplicate_options())
+        return self.duplicate_report
+    
     def _calculate_kpis(self):
-        """حساب مؤشرات أداء المبيعات"""
-        kpis = {}
+        """حساب مؤشرات أداء المبيعات (مرة واحدة لكل لغة، والمجاميع مرة واحدة فقط)"""
+        return self._memo('kpis', lambda: self._format_kpis(self._calculate_kpi_totals()),
+                          TranslationSystem.current_language(), self.distinct_mode)
+    
+    def _calculate_kpi_totals(self):
+        """حساب المجاميع الخام التي تُبنى عليها المؤشرات"""
+        return self._memo('kpi_totals', self._compute_kpi_totals, self.distinct_mode)
+    
+    def _distinct_count(self, field, key, totals):
+        """عدد القيم الفريدة دقيقاً أو تقديراً من ملخص HyperLogLog (مع الخطأ النسبي في totals['distinct_error'])"""
+        if self.distinct_mode == 'exact' or (self.distinct_mode == 'auto' and len(self.df) <= EXACT_DISTINCT_LIMIT):
+            return self.prepared.distinct_count(field)
+        sketch = self.prepared.distinct_sketch(field)
+        totals.setdefault('distinct_error', {})[key] = sketch.relative_error
+        return sketch.count()
+    
+    def _compute_kpi_totals(self):
+        """المرور على البيانات لحساب المجاميع"""
+        totals = {}
+        lang = TranslationSystem.current_language()
         
         # إجمالي عدد المعاملات
-        total_transactions = len(self.df)
-        kpis['total_transactions'] = {
-            'value': f"{total_transactions:,}",
-            'label': 'إجمالي المعاملات',
-            'icon': '🛒'
-        }
+        totals['total_transactions'] = len(self.df)
         
         # إجمالي المبيعات
         if 'total_amount' in self.mapping:
             amount_col = self.mapping['total_amount']
             if amount_col in self.df.columns:
                 try:
-                    self.df[amount_col] = pd.to_numeric(self.df[amount_col], errors='coerce')
-                    total_sales = self.df[amount_col].sum()
-                    kpis['total_sales'] = {
-                        'value': f"${total_sales:,.0f}",
-                        'label': 'إجمالي المبيعات',
-                        'icon': '💰'
-                    }
-                    
-                    # متوسط قيمة المعاملة
-                    avg_transaction = total_sales / total_transactions
-                    kpis['avg_transaction'] = {
-                        'value': f"${avg_transaction:,.0f}",
-                        'label': 'متوسط قيمة المعاملة',
-                        'icon': '📊'
-                    }
+                    totals['total_sales'] = self.prepared.numeric('total_amount').sum()
+                except Exception as e:
+                    self.notices.append(('error', f"خطأ في حساب المبيعات: {str(e)}" if lang == 'ar' else f"Error calculating sales: {str(e)}"))
+        
+        # تكلفة البضاعة المباعة
+        if 'cost' in self.mapping and 'total_amount' in self.mapping:
+            cost_col = self.mapping['cost']
+            amount_col = self.mapping['total_amount']
+            
+            if cost_col in self.df.columns and amount_col in self.df.columns:
+                try:
+                    # الضرب بـ float64 حتى لا يفيض حاصل ضرب أعداد صحيحة صغيرة النوع
+                    costs = self.prepared.numeric('cost').astype(np.float64)
                     
-                    # حساب الربح الإجمالي وهامش الربح الإجمالي
-                    if 'cost' in self.mapping:
-                        cost_col = self.mapping['cost']
-                        if cost_col in self.df.columns:
-                            try:
-                                self.df[cost_col] = pd.to_numeric(self.df[cost_col], errors='coerce')
-                                self.df[amount_col] = pd.to_numeric(self.df[amount_col], errors='coerce')
-                                
-                                # حساب تكلفة البضاعة المباعة
-                                if 'quantity' in self.mapping:
-                                    quantity_col = self.mapping['quantity']
-                                    if quantity_col in self.df.columns:
-                                        self.df[quantity_col] = pd.to_numeric(self.df[quantity_col], errors='coerce')
-                                        total_cogs = (self.df[cost_col] * self.df[quantity_col]).sum()
-                                    else:
-                                        total_cogs = self.df[cost_col].sum()
-                                else:
-                                    total_cogs = self.df[cost_col].sum()
-                                
-                                gross_profit = total_sales - total_cogs
-                                gross_margin = (gross_profit / total_sales * 100) if total_sales > 0 else 0
-                                
-                                kpis['gross_profit'] = {
-                                    'value': f"${gross_profit:,.0f}",
-                                    'label': 'الربح الإجمالي',
-                                    'icon': '📈'
-                                }
-                                
-                                kpis['gross_margin'] = {
-                                    'value': f"{gross_margin:.1f}%",
-                                    'label': 'هامش الربح الإجمالي',
-                                    'icon': '📊'
-                                }
-                            except:
-                                pass
-                except:
-                    pass
+                    if 'quantity' in self.mapping and self.mapping['quantity'] in self.df.columns:
+                        quantity_col = self.mapping['quantity']
+                        totals['total_cogs'] = (costs * self.prepared.numeric('quantity').astype(np.float64)).sum()
+                    else:
+                        totals['total_cogs'] = costs.sum()
+                except Exception as e:
+                    if lang == 'ar':
+                        self.notices.append(('warning', "لم يتم حساب الربح بسبب مشكلة في البيانات"))
+                    else:
+                        self.notices.append(('warning', "Profit calculation skipped due to data issue"))
+        
+        # مئينات قيمة المعاملة (ملخص بدون ترتيب عمود المبالغ)
+        if 'total_sales' in totals:
+            totals['transaction_quantiles'] = self.prepared.quantile_sketch().quantiles()
         
         # عدد العملاء الفريدين
         if 'customer_id' in self.mapping:
             customer_col = self.mapping['customer_id']
             if customer_col in self.df.columns:
-                unique_customers = self.df[customer_col].nunique()
-                kpis['unique_customers'] = {
-                    'value': f"{unique_customers:,}",
-                    'label': 'عدد العملاء',
-                    'icon': '👥'
-                }
+                totals['unique_customers'] = self._distinct_count('customer_id', 'unique_customers', totals)
         
         # عدد المنتجات الفريدة
         if 'product_id' in self.mapping:
             product_col = self.mapping['product_id']
             if product_col in self.df.columns:
-                unique_products = self.df[product_col].nunique()
-                kpis['unique_products'] = {
-                    'value': f"{unique_products:,}",
-                    'label': 'عدد المنتجات',
-                    'icon': '📦'
-                }
+                totals['unique_products'] = self._distinct_count('product_id', 'unique_products', totals)
         
         # متوسط الكمية لكل معاملة
         if 'quantity' in self.mapping:
             quantity_col = self.mapping['quantity']
             if quantity_col in self.df.columns:
                 try:
-                    self.df[quantity_col] = pd.to_numeric(self.df[quantity_col], errors='coerce')
-                    avg_quantity = self.df[quantity_col].mean()
-                    kpis['avg_quantity'] = {
-                        'value': f"{avg_quantity:.1f}",
-                        'label': 'متوسط الكمية',
-                        'icon': '⚖️'
-                    }
+                    totals['avg_quantity'] = self.prepared.numeric('quantity').mean()
                 except:
                     pass
         
-        # معدل الخصم
+        # إجمالي الخصم
         if 'discount' in self.mapping and 'total_amount' in self.mapping:
             discount_col = self.mapping['discount']
             amount_col = self.mapping['total_amount']
             if discount_col in self.df.columns and amount_col in self.df.columns:
                 try:
-                    self.df[discount_col] = pd.to_numeric(self.df[discount_col], errors='coerce')
-                    self.df[amount_col] = pd.to_numeric(self.df[amount_col], errors='coerce')
-                    
-                    total_discount = self.df[discount_col].sum()
-                    discount_rate = (total_discount / total_sales * 100) if total_sales > 0 else 0
-                    
-                    kpis['discount_rate'] = {
-                        'value': f"{discount_rate:.1f}%",
-                        'label': 'معدل الخصم',
-                        'icon': '🎯'
-                    }
+                    totals['total_discount'] = self.prepared.numeric('discount').sum()
                 except:
                     pass
         
+        return totals
+    
+    @staticmethod
+    def _format_kpis(totals):
+        """بناء بطاقات المؤشرات من المجاميع الخام (مشتركة مع التحليل المتدفق)"""
+        kpis = {}
+        
+        # إجمالي عدد المعاملات
+        total_transactions = totals['total_transactions']
+        kpis['total_transactions'] = {
+            'value': total_transactions,
+            'formatted': f"{total_transactions:,}",
+            'label': TranslationSystem.t('kpi_transactions'),
+            'icon': '🛒',
+            'trend': 'neutral',
+            'definition': TranslationSystem.t('def_transactions')
+        }
+        
+        # إجمالي المبيعات
+        if 'total_sales' in totals:
+            total_sales = totals['total_sales']
+            kpis['total_sales'] = {
+                'value': total_sales,
+                'formatted': f"${total_sales:,.0f}",
+                'label': TranslationSystem.t('kpi_sales'),
+                'icon': '💰',
+                'trend': 'positive' if total_sales > 0 else 'negative',
+                'definition': TranslationSystem.t('def_total_sales')
+            }
+            
+            avg_transaction = total_sales / total_transactions if total_transactions > 0 else 0
+            kpis['avg_transaction'] = {
+                'value': avg_transaction,
+                'formatted': f"${avg_transaction:,.0f}",
+                'label': TranslationSystem.t('kpi_avg_transaction'),
+                'icon': '📊',
+                'trend': 'positive' if avg_transaction > 0 else 'negative'
+            }
+        
+        # الوسيط والمئين 90 و 99 لقيمة المعاملة (لا تتأثر بالطلبات الكبيرة كما يتأثر المتوسط)
+        quantiles = totals.get('transaction_quantiles') or {}
+        for name, icon in (('p50', '⚖️'), ('p90', '📐'), ('p99', '🔝')):
+            if name in quantiles:
+                kpis[f'{name}_transaction'] = {
+                    'value': quantiles[name],
+                    'formatted': f"${quantiles[name]:,.0f}",
+                    'label': TranslationSystem.t(f'kpi_{name}_transaction'),
+                    'icon': icon,
+                    'trend': 'neutral',
+                    'definition': TranslationSystem.t('def_percentile', percent=round(QUANTILES[name] * 100))
+                }
+        
+        # حساب الربح الإجمالي وهامش الربح الإجمالي
+        if 'total_cogs' in totals and 'total_sales' in totals:
+            total_sales = totals['total_sales']
+            gross_profit = total_sales - totals['total_cogs']
+            gross_margin = (gross_profit / total_sales * 100) if total_sales > 0 else 0
+            
+            kpis['gross_profit'] = {
+                'value': gross_profit,
+                'formatted': f"${gross_profit:,.0f}",
+                'label': TranslationSystem.t('gross_profit'),
+                'icon': '📈',
+                'trend': 'positive' if gross_profit > 0 else 'negative',
+                'definition': TranslationSystem.t('def_gross_profit')
+            }
+            
+            kpis['gross_margin'] = {
+                'value': gross_margin,
+                'formatted': f"{gross_margin:.1f}%",
+                'label': TranslationSystem.t('gross_margin'),
+                'icon': '📊',
+                'trend': 'positive' if gross_margin > 15 else 'neutral',
+                'definition': TranslationSystem.t('def_gross_margin')
+            }
+        
+        # عدد العملاء الفريدين
+        if 'unique_customers' in totals:
+            unique_customers = totals['unique_customers']
+            kpis['unique_customers'] = {
+                'value': unique_customers,
+                'formatted': f"{unique_customers:,}",
+                'label': TranslationSystem.t('kpi_customers'),
+                'icon': '👥',
+                'trend': 'positive' if unique_customers > 0 else 'neutral'
+            }
+        
+        # عدد المنتجات الفريدة
+        if 'unique_products' in totals:
+            unique_products = totals['unique_products']
+            kpis['unique_products'] = {
+                'value': unique_products,
+                'formatted': f"{unique_products:,}",
+                'label': TranslationSystem.t('kpi_products'),
+                'icon': '📦',
+                'trend': 'positive' if unique_products > 0 else 'neutral'
+            }
+        
+        # الأعداد المقدّرة من ملخص HyperLogLog: علامة ≈ وحد الخطأ النسبي
+        for key, error in totals.get('distinct_error', {}).items():
+            if key in kpis:
+                kpis[key].update(
+                    formatted=f"≈{kpis[key]['value']:,}",
+                    approximate=True,
+                    error_bound=error,
+                    definition=TranslationSystem.t('def_distinct_estimate', error=f"{error * 100:.1f}")
+                )
+        
+        # متوسط الكمية لكل معاملة
+        if 'avg_quantity' in totals:
+            avg_quantity = totals['avg_quantity']
+            kpis['avg_quantity'] = {
+                'value': avg_quantity,
+                'formatted': f"{avg_quantity:.1f}",
+                'label': TranslationSystem.t('kpi_avg_quantity'),
+                'icon': '⚖️',
+                'trend': 'positive' if avg_quantity > 1 else 'neutral'
+            }
+        
+        # معدل الخصم
+        if 'total_discount' in totals and 'total_sales' in totals:
+            total_sales = totals['total_sales']
+            discount_rate = (totals['total_discount'] / total_sales * 100) if total_sales > 0 else 0
+            
+            kpis['discount_rate'] = {
+                'value': discount_rate,
+                'formatted': f"{discount_rate:.1f}%",
+                'label': TranslationSystem.t('kpi_discount_rate'),
+                'icon': '🎯',
+                'trend': 'positive' if discount_rate < 10 else 'neutral'
+            }
+        
         return kpis
     
     def _analyze_distributions(self):
@@ -176,29 +340,25 @@ class SalesDataAnalyzer:
         if 'region' in self.mapping:
             region_col = self.mapping['region']
             if region_col in self.df.columns:
-                region_dist = self.df[region_col].value_counts().to_dict()
-                distributions['region'] = region_dist
+                distributions['region'] = self._group_aggregates().top('region').to_dict()
         
         # توزيع الفئات
         if 'category' in self.mapping:
             category_col = self.mapping['category']
             if category_col in self.df.columns:
-                category_dist = self.df[category_col].value_counts().to_dict()
-                distributions['category'] = category_dist
+                distributions['category'] = self._group_aggregates().top('category').to_dict()
         
         # توزيع المنتجات (أعلى 10)
         if 'product_name' in self.mapping:
             product_col = self.mapping['product_name']
             if product_col in self.df.columns:
-                product_dist = self.df[product_col].value_counts().head(10).to_dict()
-                distributions['top_products'] = product_dist
+                distributions['top_products'] = self._group_aggregates().top('product_name', n=10).to_dict()
         
         # توزيع طرق الدفع
         if 'payment_method' in self.mapping:
             payment_col = self.mapping['payment_method']
             if payment_col in self.df.columns:
-                payment_dist = self.df[payment_col].value_counts().to_dict()
-                distributions['payment_method'] = payment_dist
+                distributions['payment_method'] = self._group_aggregates().top('payment_method').to_dict()
         
         return distributions
     
@@ -212,18 +372,16 @@ class SalesDataAnalyzer:
             
             if date_col in self.df.columns and amount_col in self.df.columns:
                 try:
-                    # تحويل التواريخ
-                    df_copy = self.df.copy()
-                    df_copy[date_col] = pd.to_datetime(df_copy[date_col], errors='coerce')
-                    df_copy[amount_col] = pd.to_numeric(df_copy[amount_col], errors='coerce')
+                    dates = self.prepared.dates('order_date')
+                    amounts = self.prepared.numeric('total_amount')
                     
                     # تنظيف البيانات
-                    df_clean = df_copy.dropna(subset=[date_col, amount_col])
+                    valid = dates.notna() & amounts.notna()
                     
-                    if len(df_clean) > 0:
+                    if valid.any():
                         # الاتجاه الشهري
-                        df_clean['year_month'] = df_clean[date_col].dt.to_period('M')
-                        monthly_trend = df_clean.groupby('year_month')[amount_col].agg(['sum', 'count']).reset_index()
+                        year_month = dates[valid].dt.to_period('M').rename('year_month')
+                        monthly_trend = amounts[valid].groupby(year_month).agg(['sum', 'count']).reset_index()
                         monthly_trend['year_month'] = monthly_trend['year_month'].astype(str)
                         
                         trends['monthly'] = monthly_trend.to_dict('records')
@@ -232,124 +390,608 @@ class SalesDataAnalyzer:
         
         return trends
     
+    def _profile_quality(self):
+        """ملف تعريف جودة الأعمدة بتمريرة واحدة لكل عمود (من عيّنة إذا حُددت مهلة)"""
+        return self._memo('quality_profile', lambda: profile_columns(self.prepared, self.profile_budget),
+                          self.profile_budget)
+    
+    def _check_data_quality(self):
+        """فحص جودة بيانات المبيعات (من ملف تعريف الأعمدة وتقرير التكرارات)"""
+        warnings = []
+        lang = TranslationSystem.current_language()
+        
+        try:
+            columns = self._profile_quality()['columns']
+        except:
+            columns = []
+        
+        # 1. فحص القيم المفقودة
+        high_missing = [column['column'] for column in columns if column['null_ratio'] > 20]
+        
+        if high_missing:
+            if lang == 'ar':
+                warnings.append(f"⚠️ أعمدة بها قيم مفقودة >20%: {', '.join(high_missing[:3])}")
+            else:
+                warnings.append(f"⚠️ Columns with missing values >20%: {', '.join(high_missing[:3])}")
+        
+        # 2. فحص التكرارات (بصمات الصفوف على مفتاح التكرار المختار)
+        duplicates = self._find_duplicates()['duplicate_rows']
+        if duplicates > 0:
+            if lang == 'ar':
+                warnings.append(f"⚠️ يوجد {duplicates} سجل مكرر")
+            else:
+                warnings.append(f"⚠️ Found {duplicates} duplicate records")
+            
+            for item in self.duplicate_report['cross_file']:
+                if lang == 'ar':
+                    warnings.append(f"⚠️ {item['count']} سجل في {item['file']} مكرر من {item['origin']}")
+                else:
+                    warnings.append(f"⚠️ {item['count']} records in {item['file']} duplicate rows of {item['origin']}")
+        
+        # 3. فحص القيم السلبية في المبالغ
+        for column in columns:
+            if column['field'] == 'total_amount' and column['negative']:
+                if lang == 'ar':
+                    warnings.append(f"⚠️ يوجد {column['negative']} معاملة بمبلغ سالب")
+                else:
+                    warnings.append(f"⚠️ Found {column['negative']} transactions with negative amounts")
+        
+        # 4. القيم التي تعذر تحويلها
+        for column in columns:
+            if column['parse_failures'] > 0:
+                if lang == 'ar':
+                    warnings.append(f"⚠️ {column['parse_failures']} قيمة في {column['column']} تعذر تحويلها")
+                else:
+                    warnings.append(f"⚠️ {column['parse_failures']} values in {column['column']} could not be parsed")
+        
+        # 5. القيم الشاذة في الحقول الرقمية (نسبة كبيرة من القيم خارج حدود IQR)
+        for column in columns:
+            if column['field'] in NUMERIC_FIELDS and column['outliers'] and column['outliers'] > len(self.df) * PROFILE_OUTLIER_WARN_RATIO:
+                if lang == 'ar':
+                    warnings.append(f"⚠️ {column['outliers']} قيمة شاذة في {column['column']}")
+                else:
+                    warnings.append(f"⚠️ {column['outliers']} outlier values in {column['column']}")
+
+        return warnings
+    
     def _extract_insights(self):
         """استخلاص رؤى من بيانات المبيعات"""
         insights = []
+        lang = TranslationSystem.current_language()
         
-        # 1. أفضل منطقة مبيعات
         if 'region' in self.mapping and 'total_amount' in self.mapping:
             region_col = self.mapping['region']
             amount_col = self.mapping['total_amount']
             
             if region_col in self.df.columns and amount_col in self.df.columns:
                 try:
-                    self.df[amount_col] = pd.to_numeric(self.df[amount_col], errors='coerce')
-                    region_sales = self.df.groupby(region_col)[amount_col].sum().sort_values(ascending=False)
+                    region_sales = self._group_aggregates().top('region', 'sales', n=1)
                     
                     if len(region_sales) > 0:
                         top_region = region_sales.index[0]
                         top_sales = region_sales.iloc[0]
-                        insights.append(f"🏆 **أفضل منطقة مبيعات**: {top_region} (${top_sales:,.0f})")
+                        if lang == 'ar':
+                            insights.append(f"🏆 **أفضل منطقة مبيعات**: {top_region} (${top_sales:,.0f})")
+                        else:
+                            insights.append(f"🏆 **Top Sales Region**: {top_region} (${top_sales:,.0f})")
                 except:
                     pass
         
-        # 2. أفضل منتج
         if 'product_name' in self.mapping and 'quantity' in self.mapping:
             product_col = self.mapping['product_name']
             quantity_col = self.mapping['quantity']
             
             if product_col in self.df.columns and quantity_col in self.df.columns:
                 try:
-                    self.df[quantity_col] = pd.to_numeric(self.df[quantity_col], errors='coerce')
-                    product_sales = self.df.groupby(product_col)[quantity_col].sum().sort_values(ascending=False)
+                    product_sales = self._group_aggregates().top('product_name', 'quantity', n=1)
                     
                     if len(product_sales) > 0:
                         top_product = product_sales.index[0]
                         top_qty = product_sales.iloc[0]
-                        insights.append(f"📦 **أكثر منتج مبيعاً**: {top_product} ({top_qty:,} وحدة)")
+                        if lang == 'ar':
+                            insights.append(f"📦 **أكثر منتج مبيعاً**: {top_product} ({top_qty:,} وحدة)")
+                        else:
+                            insights.append(f"📦 **Top Selling Product**: {top_product} ({top_qty:,} units)")
                 except:
                     pass
         
-        # 3. أفضل مندوب مبيعات
         if 'salesperson' in self.mapping and 'total_amount' in self.mapping:
             salesperson_col = self.mapping['salesperson']
             amount_col = self.mapping['total_amount']
             
             if salesperson_col in self.df.columns and amount_col in self.df.columns:
                 try:
-                    self.df[amount_col] = pd.to_numeric(self.df[amount_col], errors='coerce')
-                    salesperson_performance = self.df.groupby(salesperson_col)[amount_col].sum().sort_values(ascending=False)
+                    salesperson_performance = self._group_aggregates().top('salesperson', 'sales', n=1)
                     
                     if len(salesperson_performance) > 0:
                         top_salesperson = salesperson_performance.index[0]
-                        top_amount = salesperson_performance.iloc[0]
-                        insights.append(f"👨‍💼 **أفضل مندوب مبيعات**: {top_salesperson} (${top_amount:,.0f})")
+                        top_sales = salesperson_performance.iloc[0]
+                        if lang == 'ar':
+                            insights.append(f"👤 **أفضل مندوب مبيعات**: {top_salesperson} (${top_sales:,.0f})")
+                        else:
+                            insights.append(f"👤 **Top Salesperson**: {top_salesperson} (${top_sales:,.0f})")
                 except:
                     pass
         
-        return insights
+        # تحليل هامش الربح (من المؤشرات المحسوبة مسبقاً)
+        kpis = self._calculate_kpis()
+        if 'gross_margin' in kpis:
+            margin = kpis['gross_margin']['value']
+            if lang == 'ar':
+                if margin > 20:
+                    insights.append(f"✅ **هامش ربح ممتاز**: {margin:.1f}% (أعلى من المتوسط)")
+                elif margin > 10:
+                    insights.append(f"⚠️ **هامش ربح متوسط**: {margin:.1f}% (بحاجة للتحسين)")
+                else:
+                    insights.append(f"❌ **هامش ربح منخفض**: {margin:.1f}% (تحتاج مراجعة)")
+            else:
+                if margin > 20:
+                    insights.append(f"✅ **Excellent Profit Margin**: {margin:.1f}% (Above average)")
+                elif margin > 10:
+                    insights.append(f"⚠️ **Average Profit Margin**: {margin:.1f}% (Needs improvement)")
+                else:
+                    insights.append(f"❌ **Low Profit Margin**: {margin:.1f}% (Review needed)")
+        
+        # شرائح العملاء: حصة الأبطال من الإيرادات والعملاء المعرّضين للفقد
+        segments = {row['segment']: row for row in self._memo('customer_analysis', self._analyze_customer_segments).get('segments', [])}
+        if 'champions' in segments:
+            champions = segments['champions']
+            at_risk = segments.get('at_risk', {'customers': 0, 'revenue_share': 0.0})
+            if lang == 'ar':
+                insights.append(f"👑 **العملاء الأبطال**: {champions['customer_share']:.0f}% من العملاء يحققون {champions['revenue_share']:.0f}% من الإيرادات، و {at_risk['customers']:,} عميل معرّض للفقد ({at_risk['revenue_share']:.0f}% من الإيرادات)")
+            else:
+                insights.append(f"👑 **Champion Customers**: {champions['customer_share']:.0f}% of customers bring {champions['revenue_share']:.0f}% of revenue; {at_risk['customers']:,} customers are at risk ({at_risk['revenue_share']:.0f}% of revenue)")
+        
+        return insights[:5]  # تقليل النقاط إلى 5 فقط
     
-    def _check_data_quality(self):
-        """فحص جودة بيانات المبيعات"""
-        warnings = []
+    def _analyze_percentiles(self):
+        """مئينات قيمة المعاملة للكل ولكل منطقة ومندوب من ملخصات المئينات"""
+        percentiles = {}
+        
+        if 'total_amount' in self.mapping and self.mapping['total_amount'] in self.df.columns:
+            try:
+                percentiles['overall'] = self.prepared.quantile_sketch().quantiles()
+                for field in QUANTILE_GROUP_FIELDS:
+                    if self.prepared.has(field):
+                        percentiles[field] = self.prepared.quantile_sketch(field).records()
+            except:
+                pass
+        
+        return percentiles
+    
+    def _identify_top_performers(self):
+        """لوحات الصدارة: الأعلى والأدنى لكل بعد (منتج، مندوب، منطقة، عميل، مدينة) من المجاميع المشتركة"""
+        performers = {}
+        
+        try:
+            boards = self._group_aggregates().leaderboards()
+        except:
+            return performers
+        
+        for field, board in boards.items():
+            performers[field] = {
+                'measure': board['measure'],
+                'top': board['top'].reset_index(names='value').to_dict('records'),
+                'bottom': board['bottom'].reset_index(names='value').to_dict('records'),
+            }
+        
+        return performers
+    
+    def _calculate_growth_metrics(self):
+        """نمو الفترات (شهري، ربعي، سنوي) والنوافذ المتحركة والنمو لكل منطقة ومندوب من المبيعات اليومية"""
+        growth = {}
+        
+        try:
+            daily = self.prepared.daily_sales()
+        except:
+            daily = None
+        if daily is None:
+            return growth
+        
+        growth['as_of'] = str(np.datetime64(daily.last_day, 'D'))
+        
+        # آخر فترة كاملة مقابل السابقة (أو نفس الشهر من السنة الماضية)
+        growth['periods'] = {}
+        for name, (months, shift) in GROWTH_PERIODS.items():
+            result = daily.period_growth(months, shift)
+            if result is not None:
+                current_period, previous_period, current, previous = result
+                growth['periods'][name] = {
+                    'current_period': current_period,
+                    'previous_period': previous_period,
+                    'current': float(current[0]),
+                    'previous': float(previous[0]),
+                    'growth': self._growth_value(growth_rate(current, previous)[0])
+                }
         
-        # 1. فحص القيم المفقودة
-        missing_percentage = (self.df.isnull().sum() / len(self.df)) * 100
-        high_missing = missing_percentage[missing_percentage > 20].index.tolist()
+        # آخر 7/30/90/365 يوماً مقابل النافذة التي قبلها
+        growth['windows'] = {}
+        for days in GROWTH_WINDOWS:
+            current, previous = daily.trailing(days)
+            growth['windows'][f'{days}d'] = {
+                'days': days,
+                'current': float(current[0]),
+                'previous': None if previous is None else float(previous[0]),
+                'growth': None if previous is None else self._growth_value(growth_rate(current, previous)[0])
+            }
+        
+        # النمو لكل قيمة (كل القيم في مصفوفة واحدة)
+        for field in GROWTH_GROUP_FIELDS:
+            if self.prepared.has(field):
+                try:
+                    grouped = self.prepared.daily_sales(field)
+                    if grouped is not None:
+                        growth[field] = self._group_growth(grouped)
+                except:
+                    pass
         
-        if high_missing:
-            warnings.append(f"⚠️ أعمدة بها قيم مفقودة >20%: {', '.join(high_missing)}")
+        growth['kpis'] = self._format_growth_kpis(growth)
+        return growth
+    
+    @staticmethod
+    def _growth_value(rate):
+        """نسبة النمو كرقم عادي أو None إذا لم تكن قابلة للحساب"""
+        return None if np.isnan(rate) else float(rate)
+    
+    @classmethod
+    def _group_growth(cls, daily):
+        """مبيعات كل قيمة ونموها الشهري والربعي والسنوي مرتبة تنازلياً حسب المبيعات"""
+        table = {'sales': daily.prefix[:, -1]}
+        for name, (months, shift) in GROWTH_PERIODS.items():
+            result = daily.period_growth(months, shift)
+            table[name] = growth_rate(result[2], result[3]) if result is not None else np.full(len(daily.groups), np.nan)
+        
+        frame = pd.DataFrame(table, index=daily.groups)
+        frame = frame[frame['sales'] != 0].sort_values('sales', ascending=False, kind='stable')
+        return [
+            {'value': value, 'sales': float(row['sales']),
+             **{name: cls._growth_value(row[name]) for name in GROWTH_PERIODS}}
+            for value, row in frame.iterrows()
+        ]
+    
+    @staticmethod
+    def _format_growth_kpis(growth):
+        """بطاقات النمو بنفس بنية بطاقات المؤشرات (اللون من اتجاه النمو)"""
+        kpis = {}
         
-        # 2. فحص التكرارات
-        duplicates = self.df.duplicated().sum()
-        if duplicates > 0:
-            warnings.append(f"⚠️ يوجد {duplicates} سجل مكرر")
+        def trend(rate):
+            if rate is None or rate == 0:
+                return 'neutral'
+            return 'positive' if rate > 0 else 'negative'
+        
+        for name, period in growth.get('periods', {}).items():
+            rate = period['growth']
+            kpis[f'{name}_growth'] = {
+                'value': rate,
+                'formatted': 'N/A' if rate is None else f"{rate:+.1f}%",
+                'label': TranslationSystem.t(f'kpi_{name}_growth'),
+                'icon': '📈' if trend(rate) != 'negative' else '📉',
+                'trend': trend(rate),
+                'definition': TranslationSystem.t(
+                    'def_period_growth',
+                    current=period['current_period'],
+                    previous=period['previous_period']
+                )
+            }
+        
+        for key, window in growth.get('windows', {}).items():
+            rate = window['growth']
+            kpis[f'sales_{key}'] = {
+                'value': window['current'],
+                'formatted': f"${window['current']:,.0f}",
+                'label': TranslationSystem.t('kpi_trailing_sales', days=window['days']),
+                'icon': '🗓️',
+                'trend': trend(rate),
+                'definition': TranslationSystem.t('def_window_growth', days=window['days'],
+                                                  growth='N/A' if rate is None else f"{rate:+.1f}%")
+            }
         
-        # 3. فحص القيم السلبية في المبالغ
-        if 'total_amount' in self.mapping:
-            amount_col = self.mapping['total_amount']
-            if amount_col in self.df.columns:
+        return kpis
+    
+    def _analyze_customer_segments(self):
+        """تقسيم العملاء RFM: حجم كل شريحة وحصتها من العملاء والإيرادات"""
+        try:
+            table = self.prepared.rfm()
+        except:
+            table = None
+        if table is None or not len(table):
+            return {}
+        return summarize_rfm(table)
+    
+    def _analyze_product_portfolio(self):
+        """تحليل محفظة المنتجات ABC/Pareto: فئات الإيرادات والربح والذيل الخاسر"""
+        try:
+            table = self.prepared.portfolio()
+        except:
+            table = None
+        if table is None or not len(table):
+            return {}
+        return summarize_portfolio(table)
+    
+    def generate_professional_report(self, analysis_results=None):
+        """إنشاء تقرير احترافي مختصر (بدون نتائج يُستخدم analyze_all من الذاكرة)"""
+        if analysis_results is None:
+            analysis_results = self.analyze_all()
+        return self.format_report(analysis_results, self._get_date_range())
+    
+    @staticmethod
+    def format_report(analysis_results, date_range=None):
+        """
+        نص التقرير من نتائج التحليل فقط - يُستخدم أيضاً لنتائج المجمّع التراكمي (الدفعات)
+        حيث تأتي فترة التحليل في analysis_results['date_range']
+        """
+        if date_range is None:
+            date_range = analysis_results.get('date_range') or SalesDataAnalyzer.format_date_range(None, None)
+        lang = TranslationSystem.current_language()
+        current_date = datetime.now().strftime('%Y-%m-%d')
+        
+        if lang == 'ar':
+            report = f"""
+{'='*80}
+تقرير تحليل المبيعات
+{'='*80}
+
+📅 تاريخ التقرير: {current_date}
+📊 فترة التحليل: {date_range}
+👥 الجمهور المستهدف: {TranslationSystem.t('audience_target')}
+
+{'-'*80}
+الملخص التنفيذي
+{'-'*80}
+
+تم إجراء تحليل شامل لبيانات المبيعات لاستخلاص رؤى قابلة للتنفيذ.
+
+• إجمالي المبيعات: {analysis_results['kpis'].get('total_sales', {}).get('formatted', 'غير متوفر')}
+• عدد المعاملات: {analysis_results['kpis'].get('total_transactions', {}).get('formatted', 'غير متوفر')}
+• هامش الربح الإجمالي: {analysis_results['kpis'].get('gross_margin', {}).get('formatted', 'غير متوفر')}
+
+{'-'*80}
+النقاط الرئيسية
+{'-'*80}
+
+"""
+            for insight in analysis_results['insights']:
+                report += f"• {insight.replace('**', '')}\n"
+            
+            report += f"""
+{'-'*80}
+تحليل هامش الربح
+{'-'*80}
+
+"""
+            if 'gross_margin' in analysis_results['kpis']:
+                margin = analysis_results['kpis']['gross_margin']['value']
+                if margin > 20:
+                    report += f"✅ هامش الربح ممتاز ({margin:.1f}%)\n"
+                    report += "   (أعلى من متوسط الصناعة - حافظ على هذا الأداء)\n"
+                elif margin > 10:
+                    report += f"⚠️ هامش الربح متوسط ({margin:.1f}%)\n"
+                    report += "   (بحاجة للتحسين - راجع تكاليف البضاعة)\n"
+                else:
+                    report += f"❌ هامش الربح منخفض ({margin:.1f}%)\n"
+                    report += "   (يتطلب مراجعة عاجلة - راجع التسعير والتكاليف)\n"
+            
+            report += SalesDataAnalyzer._percentiles_report(analysis_results.get('percentiles', {}), lang)
+            report += SalesDataAnalyzer._segments_report(analysis_results.get('customer_analysis', {}), lang)
+            report += SalesDataAnalyzer._portfolio_report(analysis_results.get('product_analysis', {}), lang)
+            
+            report += f"""
+{'-'*80}
+التوصيات الاستراتيجية
+{'-'*80}
+
+1. **تحسين هامش الربح**
+   • راجع تكاليف البضاعة
+   • عدل استراتيجية التسعير
+   • قلل الخصومات غير الضرورية
+
+2. **تعزيز المناطق عالية الأداء**
+   • ركز التسويق على المناطق الرابحة
+   • زود المخزون فيها
+
+3. **استثمار أفضل المنتجات**
+   • زد إنتاجية المنتجات الأكثر مبيعاً
+   • طور منتجات مشابهة لها
+
+{'-'*80}
+جودة البيانات
+{'-'*80}
+
+"""
+            if analysis_results['warnings']:
+                report += "⚠️ تم اكتشاف بعض المشاكل:\n"
+                for warning in analysis_results['warnings']:
+                    report += f"• {warning}\n"
+            else:
+                report += "✅ جودة البيانات ممتازة - لا توجد مشاكل رئيسية\n"
+            
+            report += f"""
+{'='*80}
+نهاية التقرير
+{'='*80}
+"""
+        else:
+            report = f"""
+{'='*80}
+SALES ANALYSIS REPORT
+{'='*80}
+
+📅 Report Date: {current_date}
+📊 Analysis Period: {date_range}
+👥 Target Audience: {TranslationSystem.t('audience_target')}
+
+{'-'*80}
+EXECUTIVE SUMMARY
+{'-'*80}
+
+Comprehensive sales data analysis conducted to extract actionable insights.
+
+• Total Sales: {analysis_results['kpis'].get('total_sales', {}).get('formatted', 'N/A')}
+• Total Transactions: {analysis_results['kpis'].get('total_transactions', {}).get('formatted', 'N/A')}
+• Gross Margin: {analysis_results['kpis'].get('gross_margin', {}).get('formatted', 'N/A')}
+
+{'-'*80}
+KEY FINDINGS
+{'-'*80}
+
+"""
+            for insight in analysis_results['insights']:
+                report += f"• {insight.replace('**', '')}\n"
+            
+            report += f"""
+{'-'*80}
+GROSS MARGIN ANALYSIS
+{'-'*80}
+
+"""
+            if 'gross_margin' in analysis_results['kpis']:
+                margin = analysis_results['kpis']['gross_margin']['value']
+                if margin > 20:
+                    report += f"✅ Excellent Profit Margin ({margin:.1f}%)\n"
+                    report += "   (Above industry average - Maintain this performance)\n"
+                elif margin > 10:
+                    report += f"⚠️ Average Profit Margin ({margin:.1f}%)\n"
+                    report += "   (Needs improvement - Review cost of goods)\n"
+                else:
+                    report += f"❌ Low Profit Margin ({margin:.1f}%)\n"
+                    report += "   (Requires urgent review - Check pricing and costs)\n"
+            
+            report += SalesDataAnalyzer._percentiles_report(analysis_results.get('percentiles', {}), lang)
+            report += SalesDataAnalyzer._segments_report(analysis_results.get('customer_analysis', {}), lang)
+            report += SalesDataAnalyzer._portfolio_report(analysis_results.get('product_analysis', {}), lang)
+            
+            report += f"""
+{'-'*80}
+STRATEGIC RECOMMENDATIONS
+{'-'*80}
+
+1. **Improve Profit Margin**
+   • Review cost of goods
+   • Adjust pricing strategy
+   • Reduce unnecessary discounts
+
+2. **Enhance High-Performing Regions**
+   • Focus marketing on profitable regions
+   • Increase stock availability
+
+3. **Invest in Top Products**
+   • Increase production of best-selling products
+   • Develop similar products
+
+{'-'*80}
+DATA QUALITY
+{'-'*80}
+
+"""
+            if analysis_results['warnings']:
+                report += "⚠️ Some issues detected:\n"
+                for warning in analysis_results['warnings']:
+                    report += f"• {warning}\n"
+            else:
+                report += "✅ Excellent data quality - No major issues found\n"
+            
+            report += f"""
+{'='*80}
+END OF REPORT
+{'='*80}
+"""
+        
+        return report
+    
+    @staticmethod
+    def _percentiles_report(percentiles, lang, top=5):
+        """قسم مئينات قيمة المعاملة في التقرير: الكل ثم كل منطقة وأكثر المندوبين معاملات"""
+        overall = percentiles.get('overall')
+        if not overall:
+            return ""
+        
+        def line(label, row):
+            return f"• {label}: ${row['p50']:,.0f} / ${row['p90']:,.0f} / ${row['p99']:,.0f} ({row['count']:,})\n"
+        
+        title = "مئينات قيمة المعاملة (الوسيط / 90% / 99%)" if lang == 'ar' else "TRANSACTION VALUE PERCENTILES (MEDIAN / P90 / P99)"
+        text = f"\n{'-'*80}\n{title}\n{'-'*80}\n\n"
+        text += line("الكل" if lang == 'ar' else "All transactions", overall)
+        
+        for field, heading in (('region', ("حسب المنطقة", "By region")), ('salesperson', ("أكثر المندوبين معاملات", "Busiest salespeople"))):
+            rows = percentiles.get(field) or []
+            if rows:
+                text += f"\n{heading[0] if lang == 'ar' else heading[1]}:\n"
+                for row in rows[:None if field == 'region' else top]:
+                    text += line(row['value'], row)
+        
+        return text
+    
+    @staticmethod
+    def _segments_report(customer_analysis, lang):
+        """قسم شرائح العملاء RFM في التقرير: عدد العملاء وحصتهم من الإيرادات لكل شريحة"""
+        segments = customer_analysis.get('segments')
+        if not segments:
+            return ""
+        
+        title = "شرائح العملاء (RFM)" if lang == 'ar' else "CUSTOMER SEGMENTS (RFM)"
+        text = f"\n{'-'*80}\n{title}\n{'-'*80}\n\n"
+        for row in segments:
+            label = TranslationSystem.t(f"segment_{row['segment']}")
+            if lang == 'ar':
+                text += f"• {label}: {row['customers']:,} عميل ({row['customer_share']:.1f}%) - {row['revenue_share']:.1f}% من الإيرادات\n"
+            else:
+                text += f"• {label}: {row['customers']:,} customers ({row['customer_share']:.1f}%) - {row['revenue_share']:.1f}% of revenue\n"
+        
+        return text
+    
+    @staticmethod
+    def _portfolio_report(product_analysis, lang):
+        """قسم محفظة المنتجات في التقرير: فئات ABC ثم المنتجات الخاسرة في الذيل"""
+        classes = product_analysis.get('classes')
+        if not classes:
+            return ""
+        
+        title = "محفظة المنتجات (ABC)" if lang == 'ar' else "PRODUCT PORTFOLIO (ABC)"
+        text = f"\n{'-'*80}\n{title}\n{'-'*80}\n\n"
+        for row in classes:
+            if lang == 'ar':
+                text += f"• الفئة {row['class']}: {row['products']:,} منتج ({row['product_share']:.1f}%) - {row['revenue_share']:.1f}% من الإيرادات\n"
+            else:
+                text += f"• Class {row['class']}: {row['products']:,} products ({row['product_share']:.1f}%) - {row['revenue_share']:.1f}% of revenue\n"
+        
+        tail = product_analysis.get('long_tail_loss')
+        if tail and tail['products']:
+            if lang == 'ar':
+                text += f"\n⚠️ {tail['products']:,} منتج من الفئة C بهامش سالب (خسارة ${-tail['margin']:,.0f})\n"
+            else:
+                text += f"\n⚠️ {tail['products']:,} class C products have a negative margin (loss of ${-tail['margin']:,.0f})\n"
+            for row in tail['worst'][:5]:
+                text += f"   • {row.get('product_name', row['product'])}: ${row['margin']:,.0f}\n"
+        
+        return text
+    
+    def _get_date_range(self):
+        """الحصول على نطاق التاريخ من البيانات"""
+        return self._memo('date_range', self._compute_date_range, TranslationSystem.current_language())
+    
+    def _compute_date_range(self):
+        """أول وآخر تاريخ طلب بلغة الواجهة"""
+        if 'order_date' in self.mapping:
+            date_col = self.mapping['order_date']
+            if date_col in self.df.columns:
                 try:
-                    amount_data = pd.to_numeric(self.df[amount_col], errors='coerce')
-                    negative_amounts = (amount_data < 0).sum()
-                    if negative_amounts > 0:
-                        warnings.append(f"⚠️ يوجد {negative_amounts} معاملة بمبلغ سالب")
+                    dates = self.prepared.dates('order_date')
+                    return self.format_date_range(dates.min(), dates.max())
                 except:
                     pass
         
-        return warnings
-    
-    def generate_report(self):
-        """توليد تقرير نصي عن تحليل المبيعات"""
-        report_lines = []
-        report_lines.append("=" * 60)
-        report_lines.append("تقرير تحليل بيانات المبيعات")
-        report_lines.append(f"تاريخ التوليد: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
-        report_lines.append("=" * 60)
-        report_lines.append("")
-        
-        # معلومات عامة
-        report_lines.append("معلومات عامة:")
-        report_lines.append(f"- عدد المعاملات: {len(self.df)}")
-        report_lines.append("")
-        
-        # KPIs
-        kpis = self._calculate_kpis()
-        report_lines.append("المؤشرات الرئيسية (KPIs):")
-        for kpi_name, kpi_info in kpis.items():
-            report_lines.append(f"- {kpi_info['label']}: {kpi_info['value']}")
-        report_lines.append("")
-        
-        # Insights
-        insights = self._extract_insights()
-        if insights:
-            report_lines.append("الرؤى المستخلصة:")
-            for insight in insights:
-                report_lines.append(f"- {insight}")
-            report_lines.append("")
-        
-        return "\n".join(report_lines)
+        return self.format_date_range(None, None)
     
-    def get_modified_dataframe(self):
-        """الحصول على البيانات بعد التعديل"""
-        return self.df
\ No newline at end of file
+    @staticmethod
+    def format_date_range(min_date, max_date):
+        """فترة التحليل بلغة الواجهة من أول وآخر تاريخ (غير متوفر بدون تواريخ)"""
+        if min_date is not None and max_date is not None and pd.notna(min_date) and pd.notna(max_date):
+            if TranslationSystem.current_language() == 'ar':
+                return f"{min_date.strftime('%Y-%m-%d')} إلى {max_date.strftime('%Y-%m-%d')}"
+            else:
+                return f"{min_date.strftime('%Y-%m-%d')} to {max_date.strftime('%Y-%m-%d')}"
+        
+        if TranslationSystem.current_language() == 'ar':
+            return "غير متوفر"
+        else:
+            return "Not available"
@@ -0,0 +1,185 @@
+"""
+وضع الدفعات - تشغيل التحليل كاملاً بدون Streamlit (للمهام الليلية والخوادم)
+
+الاستخدام:
+    python sales_batch.py data/branch_a data/branch_b --config sales_config.json --output reports
+
+كل مجلد يحتوي ملفات Excel/CSV هو مجموعة بيانات واحدة، والمجلد الذي لا يحتوي ملفات
+تُعامل مجلداته الفرعية كمجموعات بيانات منفصلة (فرع لكل مجلد مثلاً).
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, date
+
+import numpy as np
+import pandas as pd
+
+from sales_data_loader import load_files, is_supported_file, READER_BACKENDS
+from sales_projection import build_analysis_frame, compact_frame
+from sales_schema import align_and_merge
+from sales_duplicates import DUPLICATE_KEYS
+from sales_translations import TranslationSystem
+from sales_analyzer import SalesDataAnalyzer
+from sales_prepared import PreparedSalesDataset
+from sales_sketches import DISTINCT_MODES
+
+
+def find_datasets(paths):
+    """مجلدات مجموعات البيانات: المجلد نفسه إن احتوى ملفات وإلا مجلداته الفرعية"""
+    datasets = []
+    for path in paths:
+        if _dataset_files(path):
+            datasets.append(path)
+            continue
+        for entry in sorted(os.listdir(path)):
+            subdir = os.path.join(path, entry)
+            if os.path.isdir(subdir) and _dataset_files(subdir):
+                datasets.append(subdir)
+    return datasets
+
+
+def _dataset_files(directory):
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if is_supported_file(name) and os.path.isfile(os.path.join(directory, name))
+    )
+
+
+def _json_default(value):
+    """تحويل أنواع numpy/pandas إلى أنواع JSON"""
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return None if np.isnan(value) else float(value)
+    if isinstance(value, (pd.Timestamp, datetime, date)):
+        return value.isoformat()
+    if isinstance(value, pd.Period):
+        return str(value)
+    return str(value)
+
+
+def run_dataset(directory, column_mapping, output_dir, language='ar', backend='pandas', duplicate_key='all',
+                distinct_mode='auto'):
+    """تحميل ← دمج ← analyze_all ← التقرير لمجموعة بيانات واحدة، وكتابة JSON والتقرير النصي"""
+    TranslationSystem.set_language_source(language)
+    name = os.path.basename(os.path.normpath(directory))
+    summary = {'dataset': name, 'directory': directory, 'error': None}
+
+    try:
+        files = []
+        for path in _dataset_files(directory):
+            with open(path, 'rb') as f:
+                files.append((os.path.basename(path), f.read()))
+
+        # التوازي هنا على مستوى مجموعات البيانات، فالملفات تُقرأ تسلسلياً داخل كل عملية
+        results = load_files(files, parallel=False, backend=backend)
+        loaded = [result for result in results if result['error'] is None]
+        summary['files'] = [
+            {'name': result['name'], 'error': result['error'],
+             'rows': None if result['dataframe'] is None else len(result['dataframe'])}
+            for result in results
+        ]
+        if not loaded:
+            raise ValueError('no readable files')
+
+        dataframes = [compact_frame(result['dataframe']) for result in loaded]
+        merged_df = align_and_merge(dataframes)[0] if len(dataframes) > 1 else dataframes[0]
+        coercion = {}
+        analysis_df = build_analysis_frame(merged_df, column_mapping, coercion)
+
+        sources = [(result['name'], len(df)) for result, df in zip(loaded, dataframes)]
+        analyzer = SalesDataAnalyzer(analysis_df, column_mapping,
+                                     sources=sources if len(sources) > 1 else None,
+                                     duplicate_key=duplicate_key,
+                                     prepared=PreparedSalesDataset(analysis_df, column_mapping, coercion),
+                                     distinct_mode=distinct_mode)
+        analysis = analyzer.analyze_all()
+        report = analyzer.generate_professional_report(analysis)
+
+        os.makedirs(output_dir, exist_ok=True)
+        json_path = os.path.join(output_dir, f"{name}_analysis.json")
+        report_path = os.path.join(output_dir, f"{name}_report.txt")
+
+        payload = {
+            'dataset': name,
+            'generated_at': datetime.now().isoformat(),
+            'language': language,
+            'rows': len(analysis_df),
+            'files': summary['files'],
+            'notices': [{'level': level, 'message': message} for level, message in analyzer.notices],
+            'section_cache': analyzer.section_cache.stats(),
+            **analysis
+        }
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2, default=_json_default)
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.write(report)
+
+        summary.update(rows=len(analysis_df), json=json_path, report=report_path)
+    except Exception as e:
+        summary['error'] = str(e)
+
+    return summary
+
+
+def run_batch(directories, column_mapping, output_dir, language='ar', backend='pandas',
+              duplicate_key='all', workers=None, distinct_mode='auto'):
+    """تشغيل عدة مجموعات بيانات بالتوازي (عملية لكل مجموعة)"""
+    jobs = [(directory, column_mapping, output_dir, language, backend, duplicate_key, distinct_mode)
+            for directory in directories]
+    workers = min(len(jobs), workers or os.cpu_count() or 1)
+
+    if workers < 2:
+        return [run_dataset(*job) for job in jobs]
+
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        futures = [executor.submit(run_dataset, *job) for job in jobs]
+        return [future.result() for future in futures]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Sales analysis batch mode (no Streamlit)')
+    parser.add_argument('directories', nargs='+', help='dataset directories (or parents of per-dataset directories)')
+    parser.add_argument('--config', default='sales_config.json', help='saved settings with column_mapping')
+    parser.add_argument('--output', default='reports', help='output directory for JSON and text reports')
+    parser.add_argument('--language', choices=['ar', 'en'], help='report language (default: from config)')
+    parser.add_argument('--backend', choices=READER_BACKENDS, default='pandas')
+    parser.add_argument('--duplicate-key', choices=list(DUPLICATE_KEYS), default='all')
+    parser.add_argument('--distinct-mode', choices=DISTINCT_MODES, default='auto',
+                        help='unique customers/products: exact, HyperLogLog sketch, or auto by size')
+    parser.add_argument('--workers', type=int, default=None, help='parallel datasets (default: CPU count)')
+    args = parser.parse_args(argv)
+
+    with open(args.config, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    column_mapping = config.get('column_mapping', {})
+    if not column_mapping:
+        parser.error(f"{args.config} has no column_mapping")
+
+    datasets = find_datasets(args.directories)
+    if not datasets:
+        parser.error('no Excel/CSV files found')
+
+    summaries = run_batch(datasets, column_mapping, args.output,
+                          language=args.language or config.get('language', 'ar'),
+                          backend=args.backend, duplicate_key=args.duplicate_key, workers=args.workers,
+                          distinct_mode=args.distinct_mode)
+
+    failed = 0
+    for summary in summaries:
+        if summary['error']:
+            failed += 1
+            print(f"✗ {summary['dataset']}: {summary['error']}", file=sys.stderr)
+        else:
+            print(f"✓ {summary['dataset']}: {summary['rows']:,} rows → {summary['json']}, {summary['report']}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
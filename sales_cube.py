@@ -0,0 +1,193 @@
+"""
+مكعب المبيعات - مقاييس جمعية محسوبة مسبقاً لكل (فترة × منطقة × فئة × مندوب × طريقة دفع)
+لتقطيع المؤشرات والتوزيعات والاتجاهات بأي مرشح دون المرور على الصفوف
+"""
+
+import numpy as np
+import pandas as pd
+
+# أبعاد المكعب (إلى جانب الفترة الزمنية)
+CUBE_DIMENSIONS = ('region', 'category', 'salesperson', 'payment_method')
+
+# دقة الفترة: شهر أو يوم
+CUBE_GRANULARITIES = {'month': 'M', 'day': 'D'}
+
+
+def _smallest_int(size):
+    """أصغر نوع صحيح يتسع للرموز من -1 حتى size"""
+    for dtype in (np.int8, np.int16, np.int32):
+        if size < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def _measure(prepared, field):
+    """(القيم مع المفقودة صفراً, عدد القيم الموجودة لكل صف)"""
+    values = prepared.numeric(field).to_numpy(dtype=np.float64, na_value=np.nan)
+    present = ~np.isnan(values)
+    return np.where(present, values, 0.0), present
+
+
+class SalesCube:
+    """
+    خلايا المكعب: رمز الفترة ورمز كل بعد (أنواع صحيحة صغيرة) ومجاميع المقاييس لكل خلية.
+
+    كل المرشحات تُطبَّق على الخلايا (بضعة آلاف عادةً) لا على الصفوف، والرمز -1
+    يعني قيمة مفقودة (تاريخ أو بعد) فيبقى الصف في الإجماليات ويخرج عند التصفية عليه.
+    """
+
+    def __init__(self, cells, periods, dimensions, granularity):
+        self.cells = cells
+        self.periods = periods
+        self.dimensions = dimensions
+        self.granularity = granularity
+
+    def __len__(self):
+        return len(self.cells)
+
+    @property
+    def memory_bytes(self):
+        return int(self.cells.memory_usage(deep=True).sum())
+
+    def values(self, field):
+        """قيم بعد معيّن (لقوائم الاختيار)"""
+        return list(self.dimensions[field])
+
+    def date_range(self):
+        """أول وآخر فترة في المكعب"""
+        if not len(self.periods):
+            return None, None
+        return self.periods[0], self.periods[-1]
+
+    def _mask(self, date_from=None, date_to=None, filters=None):
+        """الخلايا المطابقة للمرشحات - filters: {الحقل: قائمة القيم}"""
+        mask = np.ones(len(self.cells), dtype=bool)
+
+        if date_from is not None or date_to is not None:
+            period = self.cells['period'].to_numpy()
+            allowed = np.ones(len(self.periods), dtype=bool)
+            if date_from is not None:
+                allowed &= self.periods >= pd.Timestamp(date_from).to_period(self.granularity)
+            if date_to is not None:
+                allowed &= self.periods <= pd.Timestamp(date_to).to_period(self.granularity)
+            mask &= (period >= 0) & allowed[np.maximum(period, 0)]
+
+        for field, selected in (filters or {}).items():
+            if selected is None or field not in self.dimensions:
+                continue
+            wanted = self.dimensions[field].get_indexer(list(selected))
+            mask &= np.isin(self.cells[field].to_numpy(), wanted[wanted >= 0])
+
+        return mask
+
+    def totals(self, date_from=None, date_to=None, filters=None):
+        """المجاميع الخام بنفس مفاتيح SalesDataAnalyzer._calculate_kpi_totals"""
+        selected = self.cells[self._mask(date_from, date_to, filters)]
+        totals = {'total_transactions': int(selected['transactions'].sum())}
+        for key, measure in (('total_sales', 'sales'), ('total_cogs', 'cogs'), ('total_discount', 'discount')):
+            if measure in selected:
+                totals[key] = selected[measure].sum()
+        if 'quantity' in selected:
+            counted = selected['quantity_count'].sum()
+            totals['avg_quantity'] = selected['quantity'].sum() / counted if counted else np.nan
+        return totals
+
+    def distribution(self, field, measure='transactions', date_from=None, date_to=None, filters=None):
+        """مجموع مقياس لكل قيمة من البعد مرتبة تنازلياً"""
+        selected = self.cells[self._mask(date_from, date_to, filters)]
+        codes = selected[field].to_numpy()
+        valid = codes >= 0
+        uniques = self.dimensions[field]
+        sums = np.bincount(codes[valid], weights=selected[measure].to_numpy()[valid], minlength=len(uniques))
+        series = pd.Series(sums, index=uniques)
+        if measure == 'transactions':
+            series = series.astype(np.int64)
+        return series[series > 0].sort_values(ascending=False, kind='stable')
+
+    def trend(self, date_from=None, date_to=None, filters=None):
+        """الاتجاه الشهري بنفس شكل _analyze_trends: [{'year_month', 'sum', 'count'}]"""
+        if 'sales' not in self.cells:
+            return []
+        selected = self.cells[self._mask(date_from, date_to, filters)]
+        selected = selected[selected['period'] >= 0]
+        months = self.periods.asfreq('M')[selected['period'].to_numpy()]
+        monthly = selected[['sales', 'sales_count']].groupby(months).sum()
+        return [
+            {'year_month': str(month), 'sum': row.sales, 'count': int(row.sales_count)}
+            for month, row in zip(monthly.index, monthly.itertuples())
+            if row.sales_count > 0
+        ]
+
+
+def build_sales_cube(prepared, granularity='month', dimensions=CUBE_DIMENSIONS):
+    """بناء المكعب بتمريرة واحدة: مفتاح خلية لكل صف ثم np.bincount لكل مقياس"""
+    freq = CUBE_GRANULARITIES[granularity]
+    n = len(prepared)
+
+    # رمز الفترة لكل صف (-1 للتاريخ المفقود)
+    if prepared.has('order_date'):
+        dates = prepared.dates('order_date')
+        ordinals = dates.to_numpy().astype(f'datetime64[{freq}]').astype(np.int64)
+        valid = dates.notna().to_numpy()
+        period_values, inverse = np.unique(ordinals[valid], return_inverse=True)
+        period_codes = np.full(n, -1, dtype=np.int64)
+        period_codes[valid] = inverse
+        periods = pd.PeriodIndex(period_values.astype(f'datetime64[{freq}]'), freq=freq)
+    else:
+        period_codes = np.full(n, -1, dtype=np.int64)
+        periods = pd.PeriodIndex([], freq=freq)
+
+    # مفتاح الخلية: أرقام مختلطة الأساس (كل رمز +1 حتى يصبح -1 صفراً)
+    columns = [('period', period_codes, len(periods))]
+    uniques = {}
+    for field in dimensions:
+        if prepared.has(field):
+            codes, values = prepared.codes(field)
+            columns.append((field, codes, len(values)))
+            uniques[field] = values
+
+    radices = [size + 1 for _, _, size in columns]
+    if np.prod(radices, dtype=float) < 2 ** 62:
+        keys = np.zeros(n, dtype=np.int64)
+        for (_, codes, _), radix in zip(columns, radices):
+            keys = keys * radix + (codes.astype(np.int64) + 1)
+        cell_ids, cell_keys = pd.factorize(keys)
+        cell_codes = {}
+        remaining = np.asarray(cell_keys, dtype=np.int64)
+        for (name, _, _), radix in reversed(list(zip(columns, radices))):
+            remaining, digit = np.divmod(remaining, radix)
+            cell_codes[name] = digit - 1
+    else:
+        # أبعاد كثيرة القيم جداً: تجميع على الرموز مباشرة
+        stacked = np.column_stack([codes.astype(np.int64) for _, codes, _ in columns])
+        cell_rows, cell_ids = np.unique(stacked, axis=0, return_inverse=True)
+        cell_codes = {name: cell_rows[:, i] for i, (name, _, _) in enumerate(columns)}
+    cell_ids = np.asarray(cell_ids).ravel()
+    n_cells = int(cell_ids.max()) + 1 if n else 0
+
+    cells = {
+        name: cell_codes[name].astype(_smallest_int(size))
+        for name, _, size in columns
+    }
+    cells['transactions'] = np.bincount(cell_ids, minlength=n_cells).astype(np.int64)
+
+    # المقاييس الجمعية
+    measures = {}
+    if prepared.has('total_amount'):
+        measures['sales'], present = _measure(prepared, 'total_amount')
+        measures['sales_count'] = present
+        if prepared.has('cost'):
+            cost, _ = _measure(prepared, 'cost')
+            if prepared.has('quantity'):
+                cost = cost * _measure(prepared, 'quantity')[0]
+            measures['cogs'] = cost
+        if prepared.has('discount'):
+            measures['discount'], _ = _measure(prepared, 'discount')
+    if prepared.has('quantity'):
+        measures['quantity'], measures['quantity_count'] = _measure(prepared, 'quantity')
+
+    for name, values in measures.items():
+        sums = np.bincount(cell_ids, weights=values, minlength=n_cells)
+        cells[name] = sums.astype(np.int64) if values.dtype == bool else sums
+
+    return SalesCube(pd.DataFrame(cells), periods, uniques, freq)
@@ -8,937 +8,297 @@ import numpy as np
 import json
 import os
 import re
+import time
 import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime, timedelta
 from io import BytesIO
 import textwrap
 
-# ==================== 1. نظام الترجمة المتكامل ====================
+from sales_data_loader import load_files, is_supported_file, READER_BACKENDS
+from sales_streaming import SalesKPIAccumulator, stream_csv, STREAM_PREVIEW_ROWS
+from sales_upload_cache import ParsedUploadCache
+from sales_projection import build_analysis_frame, compact_frame
+from sales_dataset_store import LocalDatasetStore, merged_dataset_key, DEFAULT_STORE_MAX_BYTES
+from sales_schema import align_and_merge
+from sales_incremental import IncrementalSalesDataset
+from sales_duplicates import DUPLICATE_KEYS
+from sales_sketches import DISTINCT_MODES, QUANTILE_GROUP_FIELDS
+from sales_growth import GROWTH_GROUP_FIELDS
+from sales_profiler import PROFILE_TIME_BUDGET
+from sales_dataset_registry import DatasetRegistry
+from sales_translations import TranslationSystem
+from sales_analyzer import SalesDataAnalyzer
+from sales_prepared import PreparedSalesDataset, FILTER_FIELDS
+from sales_section_cache import SectionCache
 
-class TranslationSystem:
-    """نظام ترجمة متكامل ثنائي اللغة"""
-    
-    TRANSLATIONS = {
-        'ar': {
-            # العنوان الرئيسي
-            'dashboard_title': '📊 لوحة تحكم المبيعات الذكية',
-            'dashboard_subtitle': 'تحليل احترافي لبيانات المبيعات - مصمم للشركات الصغيرة والمتوسطة',
-            'audience_target': 'هذا المنتج مصمم للشركات الصغيرة والمتوسطة لفهم أداء المبيعات بسرعة',
-            
-            # الشريط الجانبي
-            'sidebar_settings': '⚙️ الإعدادات',
-            'language': 'اللغة',
-            'theme': 'المظهر',
-            'light_theme': '☀️ فاتح',
-            'dark_theme': '🌙 مظلم',
-            'load_settings': '📥 تحميل الإعدادات',
-            'save_settings': '💾 حفظ الإعدادات',
-            'settings_loaded': 'تم تحميل الإعدادات السابقة',
-            'settings_saved': 'تم حفظ الإعدادات',
-            'no_settings': 'لا توجد إعدادات سابقة',
-            'reset': '🔄 إعادة تعيين',
-            
-            # رفع الملفات
-            'step_1': 'الخطوة 1: رفع الملفات',
-            'upload_title': '📤 رفع ملفات المبيعات',
-            'upload_hint': 'اسحب وأفلت ملفات Excel أو CSV هنا أو انقر للاختيار',
-            'upload_supported': 'يدعم: Excel (.xlsx, .xls), CSV',
-            'upload_success': '✅ تم تحميل {count} ملف بنجاح!',
-            'upload_error': '❌ خطأ في تحميل الملف:',
-            'file_info': '📄 معلومات الملف',
-            'file_name': 'اسم الملف',
-            'file_size': 'حجم الملف',
-            'rows': 'عدد الصفوف',
-            'columns': 'عدد الأعمدة',
-            'preview': '👀 معاينة البيانات',
-            'preview_rows': 'عرض أول 5 صفوف',
-            'merge_files': '🔗 دمج الملفات',
-            'use_merged': 'استخدام البيانات المدمجة',
-            'use_single': 'استخدام ملف واحد',
-            'merged_success': '✅ تم دمج الملفات بنجاح!',
-            
-            # الإحصائيات
-            'statistics': '📈 الإحصائيات',
-            'total_files': 'عدد الملفات',
-            'total_records': 'عدد السجلات',
-            'total_columns': 'عدد الأعمدة',
-            'numeric_columns': 'أعمدة رقمية',
-            'merged_data': 'بيانات مدمجة',
-            'individual_file': 'ملف فردي',
-            
-            # تعيين الأعمدة
-            'step_2': 'الخطوة 2: تعيين الأعمدة',
-            'mapping_title': '🎯 تعيين أعمدة البيانات',
-            'auto_detection': '💡 التعرف التلقائي',
-            'auto_detection_desc': 'النظام حاول تخمين أنواع الأعمدة. يمكنك تعديلها يدوياً إذا لزم الأمر.',
-            'not_available': '❌ غير متوفر',
-            
-            # فئات الأعمدة
-            'category_order': 'معلومات الطلب',
-            'category_customer': 'معلومات العميل',
-            'category_product': 'معلومات المنتج',
-            'category_financial': 'المعلومات المالية',
-            'category_location': 'الموقع',
-            'category_sales': 'معلومات المبيعات',
-            
-            # أسماء الحقول
-            'field_order_id': 'رقم الطلب',
-            'field_customer_id': 'رقم العميل',
-            'field_customer_name': 'اسم العميل',
-            'field_product_id': 'رقم المنتج',
-            'field_product_name': 'اسم المنتج',
-            'field_category': 'الفئة',
-            'field_quantity': 'الكمية',
-            'field_unit_price': 'سعر الوحدة',
-            'field_total_amount': 'المبلغ الإجمالي',
-            'field_order_date': 'تاريخ الطلب',
-            'field_region': 'المنطقة',
-            'field_city': 'المدينة',
-            'field_country': 'البلد',
-            'field_salesperson': 'مندوب المبيعات',
-            'field_payment_method': 'طريقة الدفع',
-            'field_discount': 'الخصم',
-            'field_cost': 'التكلفة',
-            'field_status': 'حالة الطلب',
-            
-            # التحليل
-            'step_3': 'الخطوة 3: التحليل',
-            'analyze_button': '🚀 بدء التحليل',
-            'analysis_title': '📊 نتائج تحليل المبيعات',
-            'loading_analysis': 'جاري تحليل البيانات...',
-            
-            # KPIs
-            'kpis_title': '📈 المؤشرات الرئيسية',
-            'kpi_transactions': 'إجمالي المعاملات',
-            'kpi_sales': 'إجمالي المبيعات',
-            'kpi_avg_transaction': 'متوسط قيمة المعاملة',
-            'kpi_customers': 'عدد العملاء',
-            'kpi_products': 'عدد المنتجات',
-            'kpi_avg_quantity': 'متوسط الكمية',
-            'kpi_discount_rate': 'معدل الخصم',
-            'gross_profit': 'الربح الإجمالي',
-            'gross_margin': 'هامش الربح الإجمالي',
-            
-            # التعريفات
-            'def_gross_profit': 'المبلغ المتبقي من الإيرادات بعد خصم تكلفة البضاعة المباعة',
-            'def_gross_margin': 'النسبة المئوية للإيرادات المتبقية بعد خصم تكلفة البضاعة المباعة',
-            'def_total_sales': 'إجمالي الإيرادات من جميع المعاملات',
-            'def_transactions': 'عدد الفواتير أو المعاملات المكتملة',
-            
-            # الرسوم البيانية
-            'charts_title': '📊 الرسوم البيانية',
-            'chart_sales_trend': 'اتجاه المبيعات الشهري',
-            'chart_top_products': 'أفضل 10 منتجات مبيعاً',
-            'chart_region_dist': 'توزيع المبيعات حسب المنطقة',
-            'chart_category_dist': 'توزيع المبيعات حسب الفئة',
-            'chart_sales_performance': 'أداء مندوبي المبيعات',
-            'chart_price_quantity': 'العلاقة بين السعر والكمية',
-            'chart_payment_methods': 'توزيع طرق الدفع',
-            'chart_profit_dist': 'توزيع الأرباح',
-            'no_charts_data': '⚠️ لا توجد بيانات كافية لإنشاء الرسوم البيانية',
-            
-            # التقرير
-            'report_title': '📄 التقرير التحليلي',
-            'generate_report': '📋 إنشاء التقرير',
-            'copy_report': '📋 نسخ التقرير',
-            'report_copied': '✅ تم نسخ التقرير إلى الحافظة',
-            'executive_summary': 'الملخص التنفيذي',
-            'key_findings': 'النقاط الرئيسية',
-            'performance_analysis': 'تحليل الأداء',
-            'recommendations': 'التوصيات الاستراتيجية',
-            'data_quality': 'جودة البيانات',
-            'report_date': 'تاريخ التقرير',
-            'analysis_period': 'فترة التحليل',
-            'total_analysis': 'إجمالي التحليل',
-            'top_performers': 'الأفضل أداءً',
-            'areas_improvement': 'مجالات التحسين',
-            
-            # جودة البيانات
-            'data_quality_title': '🔍 جودة البيانات',
-            'missing_values': 'قيم مفقودة',
-            'duplicates': 'سجلات مكررة',
-            'negative_amounts': 'مبالغ سلبية',
-            'invalid_quantities': 'كميات غير منطقية',
-            'future_dates': 'تواريخ مستقبلية',
-            
-            # الأزرار العامة
-            'download': 'تحميل',
-            'copy': 'نسخ',
-            'close': 'إغلاق',
-            'back': 'رجوع',
-            'next': 'التالي',
-            'finish': 'إنهاء',
-            
-            # الرسائل
-            'no_data': 'لم يتم تحميل بيانات بعد',
-            'select_file_first': 'يرجى رفع ملف أولاً',
-            'select_columns': 'يرجى تعيين الأعمدة أولاً',
-            'analysis_complete': 'تم التحليل بنجاح',
-            'error': 'خطأ',
-            'warning': 'تحذير',
-            'success': 'نجاح',
-            'info': 'معلومة',
-            'definition': 'تعريف',
-            'explanation': 'تفسير',
-            
-            # تعريفات النقاط
-            'missing_values_desc': 'نسبة البيانات الناقصة في هذا العمود',
-            'duplicates_desc': 'سجلات متكررة قد تؤثر على دقة التحليل',
-            'data_uniqueness_desc': 'تكرر العملاء أو المنتجات - طبيعي في بيانات التجزئة',
-        },
-        
-        'en': {
-            # Main Title
-            'dashboard_title': '📊 Smart Sales Analytics Dashboard',
-            'dashboard_subtitle': 'Professional sales data analysis - Designed for small and medium businesses',
-            'audience_target': 'This product is designed for small and medium businesses to quickly understand sales performance',
-            
-            # Sidebar
-            'sidebar_settings': '⚙️ Settings',
-            'language': 'Language',
-            'theme': 'Theme',
-            'light_theme': '☀️ Light',
-            'dark_theme': '🌙 Dark',
-            'load_settings': '📥 Load Settings',
-            'save_settings': '💾 Save Settings',
-            'settings_loaded': 'Previous settings loaded',
-            'settings_saved': 'Settings saved',
-            'no_settings': 'No previous settings',
-            'reset': '🔄 Reset',
-            
-            # File Upload
-            'step_1': 'Step 1: Upload Files',
-            'upload_title': '📤 Upload Sales Files',
-            'upload_hint': 'Drag and drop Excel or CSV files here or click to browse',
-            'upload_supported': 'Supports: Excel (.xlsx, .xls), CSV',
-            'upload_success': '✅ Successfully uploaded {count} file(s)!',
-            'upload_error': '❌ Error loading file:',
-            'file_info': '📄 File Information',
-            'file_name': 'File Name',
-            'file_size': 'File Size',
-            'rows': 'Rows',
-            'columns': 'Columns',
-            'preview': '👀 Data Preview',
-            'preview_rows': 'Show first 5 rows',
-            'merge_files': '🔗 Merge Files',
-            'use_merged': 'Use Merged Data',
-            'use_single': 'Use Single File',
-            'merged_success': '✅ Files merged successfully!',
-            
-            # Statistics
-            'statistics': '📈 Statistics',
-            'total_files': 'Total Files',
-            'total_records': 'Total Records',
-            'total_columns': 'Total Columns',
-            'numeric_columns': 'Numeric Columns',
-            'merged_data': 'Merged Data',
-            'individual_file': 'Individual File',
-            
-            # Column Mapping
-            'step_2': 'Step 2: Map Columns',
-            'mapping_title': '🎯 Data Column Mapping',
-            'auto_detection': '💡 Auto Detection',
-            'auto_detection_desc': 'System tried to guess column types. You can adjust manually if needed.',
-            'not_available': '❌ Not Available',
-            
-            # Column Categories
-            'category_order': 'Order Information',
-            'category_customer': 'Customer Information',
-            'category_product': 'Product Information',
-            'category_financial': 'Financial Information',
-            'category_location': 'Location',
-            'category_sales': 'Sales Information',
-            
-            # Field Names
-            'field_order_id': 'Order ID',
-            'field_customer_id': 'Customer ID',
-            'field_customer_name': 'Customer Name',
-            'field_product_id': 'Product ID',
-            'field_product_name': 'Product Name',
-            'field_category': 'Category',
-            'field_quantity': 'Quantity',
-            'field_unit_price': 'Unit Price',
-            'field_total_amount': 'Total Amount',
-            'field_order_date': 'Order Date',
-            'field_region': 'Region',
-            'field_city': 'City',
-            'field_country': 'Country',
-            'field_salesperson': 'Salesperson',
-            'field_payment_method': 'Payment Method',
-            'field_discount': 'Discount',
-            'field_cost': 'Cost',
-            'field_status': 'Order Status',
-            
-            # Analysis
-            'step_3': 'Step 3: Analysis',
-            'analyze_button': '🚀 Start Analysis',
-            'analysis_title': '📊 Sales Analysis Results',
-            'loading_analysis': 'Analyzing data...',
-            
-            # KPIs
-            'kpis_title': '📈 Key Performance Indicators',
-            'kpi_transactions': 'Total Transactions',
-            'kpi_sales': 'Total Sales',
-            'kpi_avg_transaction': 'Average Transaction Value',
-            'kpi_customers': 'Number of Customers',
-            'kpi_products': 'Number of Products',
-            'kpi_avg_quantity': 'Average Quantity',
-            'kpi_discount_rate': 'Discount Rate',
-            'gross_profit': 'Gross Profit',
-            'gross_margin': 'Gross Margin',
-            
-            # Definitions
-            'def_gross_profit': 'Revenue remaining after deducting cost of goods sold',
-            'def_gross_margin': 'Percentage of revenue remaining after deducting cost of goods sold',
-            'def_total_sales': 'Total revenue from all transactions',
-            'def_transactions': 'Number of completed invoices or transactions',
-            
-            # Charts
-            'charts_title': '📊 Charts & Visualizations',
-            'chart_sales_trend': 'Monthly Sales Trend',
-            'chart_top_products': 'Top 10 Selling Products',
-            'chart_region_dist': 'Sales Distribution by Region',
-            'chart_category_dist': 'Sales Distribution by Category',
-            'chart_sales_performance': 'Salesperson Performance',
-            'chart_price_quantity': 'Price vs Quantity Relationship',
-            'chart_payment_methods': 'Payment Methods Distribution',
-            'chart_profit_dist': 'Profit Distribution',
-            'no_charts_data': '⚠️ Insufficient data to generate charts',
-            
-            # Report
-            'report_title': '📄 Analytical Report',
-            'generate_report': '📋 Generate Report',
-            'copy_report': '📋 Copy Report',
-            'report_copied': '✅ Report copied to clipboard',
-            'executive_summary': 'Executive Summary',
-            'key_findings': 'Key Findings',
-            'performance_analysis': 'Performance Analysis',
-            'recommendations': 'Strategic Recommendations',
-            'data_quality': 'Data Quality',
-            'report_date': 'Report Date',
-            'analysis_period': 'Analysis Period',
-            'total_analysis': 'Total Analysis',
-            'top_performers': 'Top Performers',
-            'areas_improvement': 'Areas for Improvement',
-            
-            # Data Quality
-            'data_quality_title': '🔍 Data Quality',
-            'missing_values': 'Missing Values',
-            'duplicates': 'Duplicate Records',
-            'negative_amounts': 'Negative Amounts',
-            'invalid_quantities': 'Invalid Quantities',
-            'future_dates': 'Future Dates',
-            
-            # General Buttons
-            'download': 'Download',
-            'copy': 'Copy',
-            'close': 'Close',
-            'back': 'Back',
-            'next': 'Next',
-            'finish': 'Finish',
-            
-            # Messages
-            'no_data': 'No data loaded yet',
-            'select_file_first': 'Please upload a file first',
-            'select_columns': 'Please map columns first',
-            'analysis_complete': 'Analysis completed successfully',
-            'error': 'Error',
-            'warning': 'Warning',
-            'success': 'Success',
-            'info': 'Info',
-            'definition': 'Definition',
-            'explanation': 'Explanation',
-            
-            # Point definitions
-            'missing_values_desc': 'Percentage of missing data in this column',
-            'duplicates_desc': 'Duplicate records that may affect analysis accuracy',
-            'data_uniqueness_desc': 'Repeated customers or products - expected in retail datasets',
-        }
-    }
-    
-    @classmethod
-    def t(cls, key, **kwargs):
-        """ترجمة النص بناءً على اللغة الحالية"""
-        lang = st.session_state.get('language', 'ar')
-        translation = cls.TRANSLATIONS.get(lang, cls.TRANSLATIONS['ar']).get(key, key)
-        
-        if kwargs:
-            try:
-                return translation.format(**kwargs)
-            except:
-                return translation
-        return translation
-    
-    @classmethod
-    def get_language_direction(cls):
-        """الحصول على اتجاه النص للغة الحالية"""
-        lang = st.session_state.get('language', 'ar')
-        return 'rtl' if lang == 'ar' else 'ltr'
-    
-    @classmethod
-    def get_font_family(cls):
-        """الحصول على خط النص للغة الحالية"""
-        lang = st.session_state.get('language', 'ar')
-        return "'Cairo', 'Segoe UI', sans-serif" if lang == 'ar' else "'Segoe UI', Tahoma, Geneva, sans-serif"
+# ==================== 1. نظام الترجمة والتحليل ====================
 
-# ==================== 2. وحدة التحليل الذكي (مُحسنة) ====================
+# اللغة تُقرأ من حالة الجلسة في كل استدعاء
+TranslationSystem.set_language_source(lambda: st.session_state.get('language', 'ar'))
 
-class SalesDataAnalyzer:
-    def __init__(self, dataframe, column_mapping):
-        self.df = dataframe.copy()
-        self.mapping = column_mapping
-    
-    def analyze_all(self):
-        """إجراء جميع التحليلات المتاحة للمبيعات"""
-        analysis_results = {
-            'kpis': {},
-            'distributions': {},
-            'trends': {},
-            'insights': [],
-            'warnings': [],
-            'top_performers': {},
-            'growth_metrics': {},
-            'customer_analysis': {},
-            'product_analysis': {}
-        }
-        
-        analysis_results['kpis'] = self._calculate_kpis()
-        analysis_results['distributions'] = self._analyze_distributions()
-        analysis_results['trends'] = self._analyze_trends()
-        analysis_results['insights'] = self._extract_insights()
-        analysis_results['warnings'] = self._check_data_quality()
-        analysis_results['top_performers'] = self._identify_top_performers()
-        analysis_results['growth_metrics'] = self._calculate_growth_metrics()
-        analysis_results['customer_analysis'] = self._analyze_customer_segments()
-        analysis_results['product_analysis'] = self._analyze_product_portfolio()
-        
-        return analysis_results
+# ==================== 3. وحدات مساعدة ====================
+
+@st.cache_resource
+def get_upload_cache():
+    """ذاكرة مؤقتة مشتركة للملفات المحلَّلة بين إعادات التشغيل والجلسات"""
+    return ParsedUploadCache(spill_dir=os.environ.get('SALES_UPLOAD_CACHE_DIR'))
+
+@st.cache_resource
+def get_duplicate_max_fingerprints():
+    """حد البصمات المحفوظة لكشف التكرار بذاكرة محدودة (بدون حد إذا لم يُحدد)"""
+    max_fingerprints = os.environ.get('SALES_DUPLICATES_MAX_FINGERPRINTS')
+    return int(max_fingerprints) if max_fingerprints else None
+
+def get_analysis_sources(df, file_info_list, use_merged):
+    """الملف الأصلي لكل مجموعة صفوف في البيانات المدمجة"""
+    if not use_merged or len(file_info_list) < 2:
+        return None
+    sources = [(file_info['name'], file_info['rows']) for file_info in file_info_list]
+    return sources if sum(rows for _, rows in sources) == len(df) else None
+
+def get_filtered_sources(sources, rows):
+    """عدد الصفوف المختارة من كل ملف (أرقام الصفوف مرتبة فتبقى بترتيب الملفات)"""
+    if not sources:
+        return None
+    ends = np.cumsum([count for _, count in sources])
+    counts = np.diff(np.searchsorted(rows, ends, 'left'), prepend=0)
+    return [(name, int(count)) for (name, _), count in zip(sources, counts)]
+
+def render_filter_panel(prepared):
+    """لوحة المرشحات في الشريط الجانبي - تعيد (من تاريخ, إلى تاريخ, {الحقل: القيم المختارة})"""
+    date_from = date_to = None
+    filters = {}
     
-    def _calculate_kpis(self):
-        """حساب مؤشرات أداء المبيعات"""
-        kpis = {}
-        lang = st.session_state.get('language', 'ar')
-        
-        # إجمالي عدد المعاملات
-        total_transactions = len(self.df)
-        kpis['total_transactions'] = {
-            'value': total_transactions,
-            'formatted': f"{total_transactions:,}",
-            'label': TranslationSystem.t('kpi_transactions'),
-            'icon': '🛒',
-            'trend': 'neutral',
-            'definition': TranslationSystem.t('def_transactions')
-        }
+    with st.sidebar:
+        st.divider()
+        st.markdown(f"**🔎 {TranslationSystem.t('filters_title')}**")
         
-        # إجمالي المبيعات
-        if 'total_amount' in self.mapping:
-            amount_col = self.mapping['total_amount']
-            if amount_col in self.df.columns:
-                try:
-                    self.df[amount_col] = pd.to_numeric(self.df[amount_col], errors='coerce')
-                    total_sales = self.df[amount_col].sum()
-                    kpis['total_sales'] = {
-                        'value': total_sales,
-                        'formatted': f"${total_sales:,.0f}",
-                        'label': TranslationSystem.t('kpi_sales'),
-                        'icon': '💰',
-                        'trend': 'positive' if total_sales > 0 else 'negative',
-                        'definition': TranslationSystem.t('def_total_sales')
-                    }
-                    
-                    avg_transaction = total_sales / total_transactions if total_transactions > 0 else 0
-                    kpis['avg_transaction'] = {
-                        'value': avg_transaction,
-                        'formatted': f"${avg_transaction:,.0f}",
-                        'label': TranslationSystem.t('kpi_avg_transaction'),
-                        'icon': '📊',
-                        'trend': 'positive' if avg_transaction > 0 else 'negative'
-                    }
-                except Exception as e:
-                    st.error(f"خطأ في حساب المبيعات: {str(e)}" if lang == 'ar' else f"Error calculating sales: {str(e)}")
+        first, last = prepared.date_bounds()
+        if first is not None:
+            picked = st.date_input(
+                TranslationSystem.t('filter_date_range'),
+                value=(first.date(), last.date()),
+                min_value=first.date(),
+                max_value=last.date(),
+                key='filter_dates'
+            )
+            # النطاق الكامل لا يُعد مرشحاً
+            if isinstance(picked, (tuple, list)) and len(picked) == 2 and (picked[0] > first.date() or picked[1] < last.date()):
+                date_from, date_to = picked
         
-        # حساب الربح الإجمالي وهامش الربح الإجمالي
-        if 'cost' in self.mapping and 'total_amount' in self.mapping:
-            cost_col = self.mapping['cost']
-            amount_col = self.mapping['total_amount']
-            
-            if cost_col in self.df.columns and amount_col in self.df.columns:
-                try:
-                    self.df[cost_col] = pd.to_numeric(self.df[cost_col], errors='coerce')
-                    self.df[amount_col] = pd.to_numeric(self.df[amount_col], errors='coerce')
-                    
-                    # حساب تكلفة البضاعة المباعة
-                    if 'quantity' in self.mapping:
-                        quantity_col = self.mapping['quantity']
-                        if quantity_col in self.df.columns:
-                            self.df[quantity_col] = pd.to_numeric(self.df[quantity_col], errors='coerce')
-                            total_cogs = (self.df[cost_col] * self.df[quantity_col]).sum()
-                        else:
-                            total_cogs = self.df[cost_col].sum()
-                    else:
-                        total_cogs = self.df[cost_col].sum()
-                    
-                    total_sales = self.df[amount_col].sum()
-                    gross_profit = total_sales - total_cogs
-                    gross_margin = (gross_profit / total_sales * 100) if total_sales > 0 else 0
-                    
-                    kpis['gross_profit'] = {
-                        'value': gross_profit,
-                        'formatted': f"${gross_profit:,.0f}",
-                        'label': TranslationSystem.t('gross_profit'),
-                        'icon': '📈',
-                        'trend': 'positive' if gross_profit > 0 else 'negative',
-                        'definition': TranslationSystem.t('def_gross_profit')
-                    }
-                    
-                    kpis['gross_margin'] = {
-                        'value': gross_margin,
-                        'formatted': f"{gross_margin:.1f}%",
-                        'label': TranslationSystem.t('gross_margin'),
-                        'icon': '📊',
-                        'trend': 'positive' if gross_margin > 15 else 'neutral',
-                        'definition': TranslationSystem.t('def_gross_margin')
-                    }
-                except Exception as e:
-                    if lang == 'ar':
-                        st.warning("لم يتم حساب الربح بسبب مشكلة في البيانات")
-                    else:
-                        st.warning("Profit calculation skipped due to data issue")
-        
-        # عدد العملاء الفريدين
-        if 'customer_id' in self.mapping:
-            customer_col = self.mapping['customer_id']
-            if customer_col in self.df.columns:
-                unique_customers = self.df[customer_col].nunique()
-                kpis['unique_customers'] = {
-                    'value': unique_customers,
-                    'formatted': f"{unique_customers:,}",
-                    'label': TranslationSystem.t('kpi_customers'),
-                    'icon': '👥',
-                    'trend': 'positive' if unique_customers > 0 else 'neutral'
-                }
-        
-        # عدد المنتجات الفريدة
-        if 'product_id' in self.mapping:
-            product_col = self.mapping['product_id']
-            if product_col in self.df.columns:
-                unique_products = self.df[product_col].nunique()
-                kpis['unique_products'] = {
-                    'value': unique_products,
-                    'formatted': f"{unique_products:,}",
-                    'label': TranslationSystem.t('kpi_products'),
-                    'icon': '📦',
-                    'trend': 'positive' if unique_products > 0 else 'neutral'
-                }
-        
-        # متوسط الكمية لكل معاملة
-        if 'quantity' in self.mapping:
-            quantity_col = self.mapping['quantity']
-            if quantity_col in self.df.columns:
-                try:
-                    self.df[quantity_col] = pd.to_numeric(self.df[quantity_col], errors='coerce')
-                    avg_quantity = self.df[quantity_col].mean()
-                    kpis['avg_quantity'] = {
-                        'value': avg_quantity,
-                        'formatted': f"{avg_quantity:.1f}",
-                        'label': TranslationSystem.t('kpi_avg_quantity'),
-                        'icon': '⚖️',
-                        'trend': 'positive' if avg_quantity > 1 else 'neutral'
-                    }
-                except:
-                    pass
-        
-        # معدل الخصم
-        if 'discount' in self.mapping and 'total_amount' in self.mapping:
-            discount_col = self.mapping['discount']
-            amount_col = self.mapping['total_amount']
-            if discount_col in self.df.columns and amount_col in self.df.columns:
-                try:
-                    self.df[discount_col] = pd.to_numeric(self.df[discount_col], errors='coerce')
-                    total_discount = self.df[discount_col].sum()
-                    discount_rate = (total_discount / total_sales * 100) if total_sales > 0 else 0
-                    
-                    kpis['discount_rate'] = {
-                        'value': discount_rate,
-                        'formatted': f"{discount_rate:.1f}%",
-                        'label': TranslationSystem.t('kpi_discount_rate'),
-                        'icon': '🎯',
-                        'trend': 'positive' if discount_rate < 10 else 'neutral'
-                    }
-                except:
-                    pass
-        
-        return kpis
+        for field in FILTER_FIELDS:
+            if prepared.has(field):
+                selected = st.multiselect(
+                    TranslationSystem.t(f'field_{field}'),
+                    list(prepared.codes(field)[1]),
+                    key=f'filter_{field}'
+                )
+                if selected:
+                    filters[field] = selected
     
-    def _check_data_quality(self):
-        """فحص جودة بيانات المبيعات"""
-        warnings = []
-        lang = st.session_state.get('language', 'ar')
-        
-        # 1. فحص القيم المفقودة
-        missing_percentage = (self.df.isnull().sum() / len(self.df)) * 100
-        high_missing = missing_percentage[missing_percentage > 20].index.tolist()
-        
-        if high_missing:
-            if lang == 'ar':
-                warnings.append(f"⚠️ أعمدة بها قيم مفقودة >20%: {', '.join(high_missing[:3])}")
-            else:
-                warnings.append(f"⚠️ Columns with missing values >20%: {', '.join(high_missing[:3])}")
-        
-        # 2. فحص التكرارات
-        duplicates = self.df.duplicated().sum()
-        if duplicates > 0:
-            if lang == 'ar':
-                warnings.append(f"⚠️ يوجد {duplicates} سجل مكرر")
-            else:
-                warnings.append(f"⚠️ Found {duplicates} duplicate records")
-        
-        # 3. فحص القيم السلبية في المبالغ
-        if 'total_amount' in self.mapping:
-            amount_col = self.mapping['total_amount']
-            if amount_col in self.df.columns:
-                try:
-                    amount_data = pd.to_numeric(self.df[amount_col], errors='coerce')
-                    negative_amounts = (amount_data < 0).sum()
-                    if negative_amounts > 0:
-                        if lang == 'ar':
-                            warnings.append(f"⚠️ يوجد {negative_amounts} معاملة بمبلغ سالب")
-                        else:
-                            warnings.append(f"⚠️ Found {negative_amounts} transactions with negative amounts")
-                except:
-                    pass
-        
-        return warnings
+    return date_from, date_to, filters
+
+def render_kpi_cards(kpis, cols_per_row=3):
+    """بطاقات المؤشرات في أعمدة - لون الأيقونة من اتجاه المؤشر (trend)"""
+    kpi_keys = list(kpis.keys())
     
-    def _extract_insights(self):
-        """استخلاص رؤى من بيانات المبيعات"""
-        insights = []
-        lang = st.session_state.get('language', 'ar')
-        
-        if 'region' in self.mapping and 'total_amount' in self.mapping:
-            region_col = self.mapping['region']
-            amount_col = self.mapping['total_amount']
-            
-            if region_col in self.df.columns and amount_col in self.df.columns:
-                try:
-                    self.df[amount_col] = pd.to_numeric(self.df[amount_col], errors='coerce')
-                    region_sales = self.df.groupby(region_col)[amount_col].sum().sort_values(ascending=False)
+    for i in range(0, len(kpi_keys), cols_per_row):
+        cols = st.columns(cols_per_row)
+        for j in range(cols_per_row):
+            if i + j < len(kpi_keys):
+                kpi_key = kpi_keys[i + j]
+                with cols[j]:
+                    kpi_info = kpis[kpi_key]
+                    trend_color = {
+                        'positive': '#10B981',
+                        'negative': '#EF4444',
+                        'neutral': '#6B7280'
+                    }.get(kpi_info.get('trend', 'neutral'), '#6B7280')
                     
-                    if len(region_sales) > 0:
-                        top_region = region_sales.index[0]
-                        top_sales = region_sales.iloc[0]
-                        if lang == 'ar':
-                            insights.append(f"🏆 **أفضل منطقة مبيعات**: {top_region} (${top_sales:,.0f})")
-                        else:
-                            insights.append(f"🏆 **Top Sales Region**: {top_region} (${top_sales:,.0f})")
-                except:
-                    pass
-        
-        if 'product_name' in self.mapping and 'quantity' in self.mapping:
-            product_col = self.mapping['product_name']
-            quantity_col = self.mapping['quantity']
-            
-            if product_col in self.df.columns and quantity_col in self.df.columns:
-                try:
-                    self.df[quantity_col] = pd.to_numeric(self.df[quantity_col], errors='coerce')
-                    product_sales = self.df.groupby(product_col)[quantity_col].sum().sort_values(ascending=False)
-                    
-                    if len(product_sales) > 0:
-                        top_product = product_sales.index[0]
-                        top_qty = product_sales.iloc[0]
-                        if lang == 'ar':
-                            insights.append(f"📦 **أكثر منتج مبيعاً**: {top_product} ({top_qty:,} وحدة)")
-                        else:
-                            insights.append(f"📦 **Top Selling Product**: {top_product} ({top_qty:,} units)")
-                except:
-                    pass
+                    st.markdown(f"""
+                    <div class="kpi-card">
+                        <div style="font-size: 2.5rem; margin-bottom: 10px; color: {trend_color};">
+                            {kpi_info.get('icon', '📊')}
+                        </div>
+                        <div style="font-size: 1.8rem; font-weight: bold; color: #60A5FA;">
+                            {kpi_info['formatted']}
+                        </div>
+                        <div style="color: #D1D5DB; font-size: 1rem; font-weight: 600;">
+                            {kpi_info['label']}
+                        </div>
+                        <div class="definition-text">
+                            {kpi_info.get('definition', '')}
+                        </div>
+                    </div>
+                    """, unsafe_allow_html=True)
+
+@st.cache_resource
+def get_dataset_store():
+    """المخزن المحلي الدائم للبيانات (Feather) المشترك بين الجلسات"""
+    max_mb = os.environ.get('SALES_DATASET_STORE_MAX_MB')
+    return LocalDatasetStore(
+        os.environ.get('SALES_DATASET_STORE_DIR', '.sales_store'),
+        max_bytes=int(max_mb) * 1024 * 1024 if max_mb else DEFAULT_STORE_MAX_BYTES
+    )
+
+def load_multiple_files(uploaded_files, parallel=True, backend='pandas', streaming=False, cache=None, store=None):
+    """تحميل عدة ملفات Excel/CSV ثم ضغط أنواع بياناتها"""
+    dataframes = []
+    file_info_list = []
+    pending_files = []
+    
+    for uploaded_file in uploaded_files:
+        if not is_supported_file(uploaded_file.name):
+            st.error(f"نوع الملف غير مدعوم: {uploaded_file.name.lower()}")
+            continue
+        pending_files.append((uploaded_file.name, uploaded_file.getvalue()))
+    
+    # تحليل الملفات (بالتوازي عند تعددها) مع قياس زمن كل ملف
+    csv_nrows = STREAM_PREVIEW_ROWS if streaming else None
+    results = load_files(pending_files, parallel=parallel, backend=backend, csv_nrows=csv_nrows,
+                         cache=cache, store=store)
+    for result in results:
+        if result['error'] is not None:
+            st.error(f"{TranslationSystem.t('upload_error')} {result['name']}: {result['error']}")
+            continue
         
-        if 'salesperson' in self.mapping and 'total_amount' in self.mapping:
-            salesperson_col = self.mapping['salesperson']
-            amount_col = self.mapping['total_amount']
-            
-            if salesperson_col in self.df.columns and amount_col in self.df.columns:
-                try:
-                    self.df[amount_col] = pd.to_numeric(self.df[amount_col], errors='coerce')
-                    salesperson_performance = self.df.groupby(salesperson_col)[amount_col].sum().sort_values(ascending=False)
-                    
-                    if len(salesperson_performance) > 0:
-                        top_salesperson = salesperson_performance.index[0]
-                        top_sales = salesperson_performance.iloc[0]
-                        if lang == 'ar':
-                            insights.append(f"👤 **أفضل مندوب مبيعات**: {top_salesperson} (${top_sales:,.0f})")
-                        else:
-                            insights.append(f"👤 **Top Salesperson**: {top_salesperson} (${top_sales:,.0f})")
-                except:
-                    pass
+        # ضغط الأنواع مرة واحدة لكل ملف، والنسخة المضغوطة (لا تعتمد على التعيين) هي التي تبقى في الذاكرة المشتركة
+        if 'memory_before' not in result:
+            memory_before = int(result['dataframe'].memory_usage(deep=True).sum())
+            compacted = compact_frame(result['dataframe'])
+            result.update(
+                dataframe=compacted,
+                memory_before=memory_before,
+                memory_after=int(compacted.memory_usage(deep=True).sum())
+            )
+            if cache is not None:
+                cache.put(result['key'], result)
         
-        # تحليل هامش الربح
-        if 'gross_margin' in self._calculate_kpis():
-            margin = self._calculate_kpis()['gross_margin']['value']
-            if lang == 'ar':
-                if margin > 20:
-                    insights.append(f"✅ **هامش ربح ممتاز**: {margin:.1f}% (أعلى من المتوسط)")
-                elif margin > 10:
-                    insights.append(f"⚠️ **هامش ربح متوسط**: {margin:.1f}% (بحاجة للتحسين)")
-                else:
-                    insights.append(f"❌ **هامش ربح منخفض**: {margin:.1f}% (تحتاج مراجعة)")
-            else:
-                if margin > 20:
-                    insights.append(f"✅ **Excellent Profit Margin**: {margin:.1f}% (Above average)")
-                elif margin > 10:
-                    insights.append(f"⚠️ **Average Profit Margin**: {margin:.1f}% (Needs improvement)")
-                else:
-                    insights.append(f"❌ **Low Profit Margin**: {margin:.1f}% (Review needed)")
+        df = result['dataframe']
+        file_info = {
+            'name': result['name'],
+            'size': result['size'],
+            'rows': len(df),
+            'columns': len(df.columns),
+            'load_time': result['load_time'],
+            'encoding': result['encoding'],
+            'preview_only': result['preview_only'],
+            'source': result['source'],
+            'key': result['key'],
+            'memory_before': result['memory_before'],
+            'memory_after': result['memory_after'],
+            'dataframe': df
+        }
         
-        return insights[:5]  # تقليل النقاط إلى 5 فقط
+        file_info_list.append(file_info)
+        dataframes.append(df)
     
-    def generate_professional_report(self, analysis_results):
-        """إنشاء تقرير احترافي مختصر"""
-        lang = st.session_state.get('language', 'ar')
-        current_date = datetime.now().strftime('%Y-%m-%d')
-        
-        if lang == 'ar':
-            report = f"""
-{'='*80}
-تقرير تحليل المبيعات
-{'='*80}
-
-📅 تاريخ التقرير: {current_date}
-📊 فترة التحليل: {self._get_date_range()}
-👥 الجمهور المستهدف: {TranslationSystem.t('audience_target')}
-
-{'-'*80}
-الملخص التنفيذي
-{'-'*80}
-
-تم إجراء تحليل شامل لبيانات المبيعات لاستخلاص رؤى قابلة للتنفيذ.
-
-• إجمالي المبيعات: {analysis_results['kpis'].get('total_sales', {}).get('formatted', 'غير متوفر')}
-• عدد المعاملات: {analysis_results['kpis'].get('total_transactions', {}).get('formatted', 'غير متوفر')}
-• هامش الربح الإجمالي: {analysis_results['kpis'].get('gross_margin', {}).get('formatted', 'غير متوفر')}
-
-{'-'*80}
-النقاط الرئيسية
-{'-'*80}
-
-"""
-            for insight in analysis_results['insights']:
-                report += f"• {insight.replace('**', '')}\n"
-            
-            report += f"""
-{'-'*80}
-تحليل هامش الربح
-{'-'*80}
-
-"""
-            if 'gross_margin' in analysis_results['kpis']:
-                margin = analysis_results['kpis']['gross_margin']['value']
-                if margin > 20:
-                    report += f"✅ هامش الربح ممتاز ({margin:.1f}%)\n"
-                    report += "   (أعلى من متوسط الصناعة - حافظ على هذا الأداء)\n"
-                elif margin > 10:
-                    report += f"⚠️ هامش الربح متوسط ({margin:.1f}%)\n"
-                    report += "   (بحاجة للتحسين - راجع تكاليف البضاعة)\n"
-                else:
-                    report += f"❌ هامش الربح منخفض ({margin:.1f}%)\n"
-                    report += "   (يتطلب مراجعة عاجلة - راجع التسعير والتكاليف)\n"
-            
-            report += f"""
-{'-'*80}
-التوصيات الاستراتيجية
-{'-'*80}
-
-1. **تحسين هامش الربح**
-   • راجع تكاليف البضاعة
-   • عدل استراتيجية التسعير
-   • قلل الخصومات غير الضرورية
-
-2. **تعزيز المناطق عالية الأداء**
-   • ركز التسويق على المناطق الرابحة
-   • زود المخزون فيها
-
-3. **استثمار أفضل المنتجات**
-   • زد إنتاجية المنتجات الأكثر مبيعاً
-   • طور منتجات مشابهة لها
-
-{'-'*80}
-جودة البيانات
-{'-'*80}
+    return dataframes, file_info_list
 
-"""
-            if analysis_results['warnings']:
-                report += "⚠️ تم اكتشاف بعض المشاكل:\n"
-                for warning in analysis_results['warnings']:
-                    report += f"• {warning}\n"
-            else:
-                report += "✅ جودة البيانات ممتازة - لا توجد مشاكل رئيسية\n"
-            
-            report += f"""
-{'='*80}
-نهاية التقرير
-{'='*80}
-"""
+def analyze_files_streaming(uploaded_files, file_info_list, column_mapping, distinct_mode='auto'):
+    """حساب المؤشرات والاتجاه الشهري على دفعات دون تحميل ملفات CSV كاملة"""
+    accumulator = SalesKPIAccumulator(column_mapping, distinct_mode)
+    uploads_by_name = {uploaded_file.name: uploaded_file for uploaded_file in uploaded_files}
+    
+    warnings = []
+    for file_info in file_info_list:
+        if not file_info['preview_only']:
+            # ملفات Excel محمّلة كاملة أصلاً: تُضاف كدفعة واحدة
+            accumulator.update(file_info['dataframe'])
+        elif file_info['name'] in uploads_by_name:
+            stream_csv(uploads_by_name[file_info['name']].getvalue(), column_mapping, accumulator=accumulator)
         else:
-            report = f"""
-{'='*80}
-SALES ANALYSIS REPORT
-{'='*80}
-
-📅 Report Date: {current_date}
-📊 Analysis Period: {self._get_date_range()}
-👥 Target Audience: {TranslationSystem.t('audience_target')}
-
-{'-'*80}
-EXECUTIVE SUMMARY
-{'-'*80}
-
-Comprehensive sales data analysis conducted to extract actionable insights.
-
-• Total Sales: {analysis_results['kpis'].get('total_sales', {}).get('formatted', 'N/A')}
-• Total Transactions: {analysis_results['kpis'].get('total_transactions', {}).get('formatted', 'N/A')}
-• Gross Margin: {analysis_results['kpis'].get('gross_margin', {}).get('formatted', 'N/A')}
-
-{'-'*80}
-KEY FINDINGS
-{'-'*80}
-
-"""
-            for insight in analysis_results['insights']:
-                report += f"• {insight.replace('**', '')}\n"
-            
-            report += f"""
-{'-'*80}
-GROSS MARGIN ANALYSIS
-{'-'*80}
-
-"""
-            if 'gross_margin' in analysis_results['kpis']:
-                margin = analysis_results['kpis']['gross_margin']['value']
-                if margin > 20:
-                    report += f"✅ Excellent Profit Margin ({margin:.1f}%)\n"
-                    report += "   (Above industry average - Maintain this performance)\n"
-                elif margin > 10:
-                    report += f"⚠️ Average Profit Margin ({margin:.1f}%)\n"
-                    report += "   (Needs improvement - Review cost of goods)\n"
-                else:
-                    report += f"❌ Low Profit Margin ({margin:.1f}%)\n"
-                    report += "   (Requires urgent review - Check pricing and costs)\n"
-            
-            report += f"""
-{'-'*80}
-STRATEGIC RECOMMENDATIONS
-{'-'*80}
-
-1. **Improve Profit Margin**
-   • Review cost of goods
-   • Adjust pricing strategy
-   • Reduce unnecessary discounts
-
-2. **Enhance High-Performing Regions**
-   • Focus marketing on profitable regions
-   • Increase stock availability
-
-3. **Invest in Top Products**
-   • Increase production of best-selling products
-   • Develop similar products
-
-{'-'*80}
-DATA QUALITY
-{'-'*80}
+            # الملف الكامل لم يعد مرفوعاً: لا تُحسب صفوف المعاينة وحدها كأنها الملف
+            warnings.append(TranslationSystem.t('streaming_missing_file', name=file_info['name']))
+    
+    return {
+        'kpis': SalesDataAnalyzer._format_kpis(accumulator.totals()),
+        'distributions': {},
+        'trends': {'monthly': accumulator.monthly_trend()},
+        'group_totals': accumulator.group_totals(),
+        'percentiles': accumulator.percentiles(),
+        'date_range': SalesDataAnalyzer.format_date_range(accumulator.first_date, accumulator.last_date),
+        'insights': [],
+        'warnings': warnings
+    }
 
-"""
-            if analysis_results['warnings']:
-                report += "⚠️ Some issues detected:\n"
-                for warning in analysis_results['warnings']:
-                    report += f"• {warning}\n"
-            else:
-                report += "✅ Excellent data quality - No major issues found\n"
-            
-            report += f"""
-{'='*80}
-END OF REPORT
-{'='*80}
-"""
-        
-        return report
-    
-    def _get_date_range(self):
-        """الحصول على نطاق التاريخ من البيانات"""
-        if 'order_date' in self.mapping:
-            date_col = self.mapping['order_date']
-            if date_col in self.df.columns:
-                try:
-                    dates = pd.to_datetime(self.df[date_col], errors='coerce')
-                    min_date = dates.min()
-                    max_date = dates.max()
-                    
-                    if pd.notna(min_date) and pd.notna(max_date):
-                        if st.session_state.get('language', 'ar') == 'ar':
-                            return f"{min_date.strftime('%Y-%m-%d')} إلى {max_date.strftime('%Y-%m-%d')}"
-                        else:
-                            return f"{min_date.strftime('%Y-%m-%d')} to {max_date.strftime('%Y-%m-%d')}"
-                except:
-                    pass
-        
-        if st.session_state.get('language', 'ar') == 'ar':
-            return "غير متوفر"
-        else:
-            return "Not available"
+def analyze_files_incremental(file_info_list, column_mapping, distinct_mode='auto'):
+    """إلحاق الملفات الجديدة فقط بالبيانات المدمجة السابقة - يعيد (البيانات, عدد الملفات الجديدة)"""
+    dataset = st.session_state.incremental_dataset
+    if dataset is None or dataset.mapping != column_mapping or dataset.accumulator.distinct_mode != distinct_mode:
+        dataset = IncrementalSalesDataset(column_mapping, distinct_mode)
+        st.session_state.incremental_dataset = dataset
+    
+    # الملفات المُلحقة سابقاً تُتجاهل حسب بصمة محتواها
+    new_files = sum(
+        dataset.append(file_info['dataframe'], file_info['key'], file_info['name'])
+        for file_info in file_info_list
+    )
+    
+    return dataset, new_files
 
-# ==================== 3. وحدات مساعدة ====================
+def merge_files_with_store(dataframes, file_info_list, store):
+    """دمج الملفات مع إعادة استخدام نتيجة دمج سابقة محفوظة لنفس الملفات - يعيد (المفتاح, البيانات)"""
+    key = merged_dataset_key([file_info['key'] for file_info in file_info_list])
+    
+    if key in store:
+        merged_df = store.get(key)
+        if merged_df is not None:
+            st.session_state.merge_report = store.entry(key)['meta'].get('merge_report')
+            return key, merged_df
+    
+    merged_df = merge_dataframes(dataframes)
+    if merged_df is not None:
+        name = ' + '.join(file_info['name'] for file_info in file_info_list)
+        store.put(key, merged_df, name, kind='merged',
+                  meta={'merge_report': st.session_state.merge_report})
+    return key, merged_df
 
-def load_multiple_files(uploaded_files):
-    """تحميل عدة ملفات Excel/CSV"""
-    dataframes = []
-    file_info_list = []
+def open_stored_dataset(store, key):
+    """فتح بيانات محفوظة كبيانات الجلسة الحالية دون رفع الملف من جديد"""
+    entry = store.entry(key)
+    df = store.get(key)
+    if entry is None or df is None:
+        return False
     
-    for uploaded_file in uploaded_files:
-        try:
-            file_name = uploaded_file.name.lower()
-            
-            if file_name.endswith('.csv'):
-                content = uploaded_file.getvalue()
-                encodings = ['utf-8', 'utf-8-sig', 'latin1', 'cp1256', 'windows-1256']
-                
-                for encoding in encodings:
-                    try:
-                        df = pd.read_csv(BytesIO(content), encoding=encoding)
-                        break
-                    except:
-                        continue
-                else:
-                    df = pd.read_csv(BytesIO(content), encoding='utf-8', errors='ignore')
-                    
-            elif file_name.endswith('.xlsx') or file_name.endswith('.xls'):
-                df = pd.read_excel(uploaded_file, engine='openpyxl')
-            else:
-                st.error(f"نوع الملف غير مدعوم: {file_name}")
-                continue
-            
-            file_info = {
-                'name': uploaded_file.name,
-                'size': len(uploaded_file.getvalue()),
-                'rows': len(df),
-                'columns': len(df.columns),
-                'dataframe': df
-            }
-            
-            file_info_list.append(file_info)
-            dataframes.append(df)
-            
-        except Exception as e:
-            st.error(f"{TranslationSystem.t('upload_error')} {uploaded_file.name}: {str(e)}")
+    registry = st.session_state.dataset_registry
+    df = registry.register(key, df)
+    registry.retain([key])
     
-    return dataframes, file_info_list
+    file_info = {
+        'name': entry['name'],
+        'size': entry['bytes'],
+        'rows': len(df),
+        'columns': len(df.columns),
+        'load_time': 0.0,
+        'encoding': None,
+        'preview_only': False,
+        'source': 'store',
+        'key': key,
+        'memory_before': None,
+        'memory_after': None,
+        'dataframe': df
+    }
+    st.session_state.dataframes = [df]
+    st.session_state.file_info_list = [file_info]
+    st.session_state.merged_df = None
+    st.session_state.merged_key = None
+    st.session_state.current_df = df
+    st.session_state.current_key = key
+    st.session_state.use_merged = False
+    st.session_state.files_uploaded = True
+    st.session_state.analysis_ready = False
+    return True
 
 def merge_dataframes(dataframes):
-    """دمج عدة dataframes في dataframe واحد"""
+    """دمج عدة dataframes في dataframe واحد بعد مواءمة أسماء الأعمدة وأنواعها"""
     if dataframes is None or len(dataframes) == 0:
         return None
     
     try:
-        merged_df = pd.concat(dataframes, ignore_index=True, sort=False)
+        merged_df, report = align_and_merge(dataframes)
+        st.session_state.merge_report = report
         return merged_df
     except Exception as e:
         st.error(f"خطأ في دمج الملفات: {str(e)}")
@@ -1129,8 +489,21 @@ if 'file_info_list' not in st.session_state:
     st.session_state.file_info_list = []
 if 'merged_df' not in st.session_state:
     st.session_state.merged_df = None
+if 'merge_report' not in st.session_state:
+    st.session_state.merge_report = None
 if 'current_df' not in st.session_state:
     st.session_state.current_df = None
+if 'dataset_registry' not in st.session_state:
+    st.session_state.dataset_registry = DatasetRegistry()
+if 'section_cache' not in st.session_state:
+    st.session_state.section_cache = SectionCache()
+if 'filter_section_cache' not in st.session_state:
+    # نتائج التحليل المُصفّى منفصلة حتى لا يُفرّغ تغيير المرشحات نتائج البيانات الكاملة
+    st.session_state.filter_section_cache = SectionCache()
+if 'merged_key' not in st.session_state:
+    st.session_state.merged_key = None
+if 'current_key' not in st.session_state:
+    st.session_state.current_key = None
 if 'column_mapping' not in st.session_state:
     st.session_state.column_mapping = {}
 if 'analysis_results' not in st.session_state:
@@ -1141,6 +514,20 @@ if 'text_report' not in st.session_state:
     st.session_state.text_report = ""
 if 'analysis_ready' not in st.session_state:
     st.session_state.analysis_ready = False
+if 'parallel_loading' not in st.session_state:
+    st.session_state.parallel_loading = True
+if 'duplicate_key' not in st.session_state:
+    st.session_state.duplicate_key = 'all'
+if 'reader_backend' not in st.session_state:
+    st.session_state.reader_backend = 'pandas'
+if 'streaming_mode' not in st.session_state:
+    st.session_state.streaming_mode = False
+if 'distinct_mode' not in st.session_state:
+    st.session_state.distinct_mode = 'auto'
+if 'append_mode' not in st.session_state:
+    st.session_state.append_mode = False
+if 'incremental_dataset' not in st.session_state:
+    st.session_state.incremental_dataset = None
 
 # تحميل CSS
 load_css()
@@ -1172,6 +559,62 @@ with st.sidebar:
     
     st.divider()
     
+    # وضع التحميل المتوازي
+    st.session_state.parallel_loading = st.checkbox(
+        TranslationSystem.t('parallel_loading'),
+        value=st.session_state.parallel_loading,
+        key="parallel_loading_toggle"
+    )
+    
+    # محرك القراءة (pyarrow أسرع ويستهلك ذاكرة أقل للنصوص)
+    st.session_state.reader_backend = st.selectbox(
+        TranslationSystem.t('reader_backend'),
+        options=list(READER_BACKENDS),
+        index=list(READER_BACKENDS).index(st.session_state.reader_backend),
+        key="reader_backend_select"
+    )
+    
+    # وضع التحليل المتدفق للملفات الأكبر من الذاكرة
+    st.session_state.streaming_mode = st.checkbox(
+        TranslationSystem.t('streaming_mode'),
+        value=st.session_state.streaming_mode,
+        key="streaming_mode_toggle"
+    )
+    
+    # وضع الإلحاق: كل ملف جديد يُضاف إلى البيانات والمجاميع السابقة
+    st.session_state.append_mode = st.checkbox(
+        TranslationSystem.t('append_mode'),
+        value=st.session_state.append_mode,
+        disabled=st.session_state.streaming_mode,
+        key="append_mode_toggle"
+    )
+    
+    # مفتاح كشف التكرارات
+    duplicate_keys = list(DUPLICATE_KEYS)
+    st.session_state.duplicate_key = st.selectbox(
+        TranslationSystem.t('duplicate_key'),
+        options=duplicate_keys,
+        index=duplicate_keys.index(st.session_state.duplicate_key),
+        format_func=lambda key: TranslationSystem.t(f'duplicate_key_{key}'),
+        key="duplicate_key_select"
+    )
+    
+    # عدّ العملاء والمنتجات الفريدة: دقيق أو ملخص HyperLogLog قابل للدمج بين الملفات
+    st.session_state.distinct_mode = st.selectbox(
+        TranslationSystem.t('distinct_mode'),
+        options=list(DISTINCT_MODES),
+        index=list(DISTINCT_MODES).index(st.session_state.distinct_mode),
+        format_func=lambda mode: TranslationSystem.t(f'distinct_mode_{mode}'),
+        key="distinct_mode_select"
+    )
+    if st.session_state.append_mode and st.session_state.incremental_dataset is not None:
+        if st.button(TranslationSystem.t('append_reset'), use_container_width=True, key="append_reset"):
+            st.session_state.incremental_dataset = None
+            st.session_state.analysis_ready = False
+            st.rerun()
+    
+    st.divider()
+    
     # تحميل الإعدادات السابقة
     if st.button(TranslationSystem.t('load_settings'), use_container_width=True, icon="📥", key="load_settings"):
         if os.path.exists('sales_config.json'):
@@ -1198,6 +641,29 @@ with st.sidebar:
                 json.dump(config, f, ensure_ascii=False, indent=2)
             st.success(TranslationSystem.t('settings_saved'))
     
+    # البيانات المحفوظة في المخزن المحلي
+    dataset_store = get_dataset_store()
+    with st.expander(TranslationSystem.t('dataset_store')):
+        st.caption(TranslationSystem.t(
+            'dataset_store_usage',
+            used=f"{dataset_store.total_bytes() / 1024 ** 2:,.1f}",
+            quota=f"{dataset_store.max_bytes / 1024 ** 2:,.0f}"
+        ))
+        stored_datasets = dataset_store.list_datasets()
+        if not stored_datasets:
+            st.info(TranslationSystem.t('dataset_store_empty'))
+        for entry in stored_datasets:
+            st.markdown(f"**{entry['name']}** — {entry['rows']:,} {TranslationSystem.t('rows')}, {entry['bytes'] / 1024 ** 2:,.1f} MB")
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button(TranslationSystem.t('open_dataset'), key=f"open_dataset_{entry['key']}", use_container_width=True):
+                    if open_stored_dataset(dataset_store, entry['key']):
+                        st.rerun()
+            with col2:
+                if st.button(TranslationSystem.t('delete_dataset'), key=f"delete_dataset_{entry['key']}", use_container_width=True):
+                    dataset_store.evict(entry['key'])
+                    st.rerun()
+    
     # إعادة التعيين
     if st.button(TranslationSystem.t('reset'), use_container_width=True, icon="🔄", key="reset"):
         for key in list(st.session_state.keys()):
@@ -1230,27 +696,82 @@ uploaded_files = st.file_uploader(
 if uploaded_files and len(uploaded_files) > 0:
     try:
         with st.spinner("جاري تحميل الملفات..." if st.session_state.language == 'ar' else "Loading files..."):
-            dataframes, file_info_list = load_multiple_files(uploaded_files)
+            dataframes, file_info_list = load_multiple_files(
+                uploaded_files,
+                parallel=st.session_state.parallel_loading,
+                backend=st.session_state.reader_backend,
+                streaming=st.session_state.streaming_mode,
+                cache=get_upload_cache(),
+                store=get_dataset_store()
+            )
         
         if dataframes and file_info_list:
+            # كل جدول يُحفظ مرة واحدة في سجل الجلسة وبقية الحالة تحمل مراجع للقراءة فقط
+            registry = st.session_state.dataset_registry
+            for file_info in file_info_list:
+                file_info['dataframe'] = registry.register(file_info['key'], file_info['dataframe'])
+            dataframes = [file_info['dataframe'] for file_info in file_info_list]
+            
+            # بيانات مدمجة أو مختارة من ملفات لم تعد مرفوعة لم تعد صالحة
+            file_keys = [file_info['key'] for file_info in file_info_list]
+            if st.session_state.merged_key != merged_dataset_key(file_keys):
+                st.session_state.merged_df = None
+                st.session_state.merged_key = None
+            if st.session_state.current_key not in file_keys + [st.session_state.merged_key]:
+                st.session_state.current_df = None
+                st.session_state.current_key = None
+            registry.retain(file_keys + [st.session_state.merged_key])
+            
             st.session_state.dataframes = dataframes
             st.session_state.file_info_list = file_info_list
             st.session_state.files_uploaded = True
             
             st.success(TranslationSystem.t('upload_success', count=len(dataframes)))
             
+            compacted_files = [info for info in file_info_list if info['memory_before']]
+            if compacted_files:
+                memory_before = sum(info['memory_before'] for info in compacted_files)
+                memory_saved = memory_before - sum(info['memory_after'] for info in compacted_files)
+                st.caption(TranslationSystem.t(
+                    'memory_compaction_total',
+                    saved=f"{memory_saved / 1024 ** 2:,.1f}",
+                    percent=f"{memory_saved / memory_before * 100:.0f}"
+                ))
+            
             # عرض معلومات الملفات
             st.markdown(f"### 📁 {TranslationSystem.t('file_info')}")
             
             for i, file_info in enumerate(file_info_list):
                 with st.expander(f"{file_info['name']} ({file_info['rows']} {TranslationSystem.t('rows')}, {file_info['columns']} {TranslationSystem.t('columns')})"):
-                    col1, col2, col3 = st.columns(3)
+                    col1, col2, col3, col4 = st.columns(4)
                     with col1:
                         st.metric(TranslationSystem.t('file_size'), f"{file_info['size']:,} bytes")
                     with col2:
                         st.metric(TranslationSystem.t('rows'), file_info['rows'])
                     with col3:
                         st.metric(TranslationSystem.t('columns'), file_info['columns'])
+                    with col4:
+                        st.metric(TranslationSystem.t('load_time'), f"{file_info['load_time']:.2f} s")
+                    
+                    if file_info['source'] == 'cache':
+                        st.caption(TranslationSystem.t('loaded_from_cache'))
+                    elif file_info['source'] == 'store':
+                        st.caption(TranslationSystem.t('loaded_from_store'))
+                    
+                    if file_info['memory_before']:
+                        st.caption(TranslationSystem.t(
+                            'memory_compaction',
+                            before=f"{file_info['memory_before'] / 1024 ** 2:,.2f}",
+                            after=f"{file_info['memory_after'] / 1024 ** 2:,.2f}",
+                            saved=f"{(1 - file_info['memory_after'] / file_info['memory_before']) * 100:.0f}"
+                        ))
+                    
+                    if file_info['preview_only']:
+                        st.caption(TranslationSystem.t('streaming_preview_note', rows=f"{STREAM_PREVIEW_ROWS:,}"))
+                    
+                    if file_info['encoding']:
+                        encoding_info = file_info['encoding']
+                        st.caption(f"{TranslationSystem.t('encoding')}: {encoding_info['encoding']} ({encoding_info['method']}, {encoding_info['sniffed_bytes']:,} bytes)")
                     
                     if st.checkbox(f"{TranslationSystem.t('preview')} {i+1}", key=f"preview_{i}"):
                         st.dataframe(file_info['dataframe'].head(), use_container_width=True)
@@ -1262,26 +783,47 @@ if uploaded_files and len(uploaded_files) > 0:
                 col1, col2 = st.columns(2)
                 with col1:
                     if st.button(TranslationSystem.t('merge_files'), use_container_width=True, icon="🔗", key="merge_button"):
-                        merged_df = merge_dataframes(dataframes)
+                        merged_key, merged_df = merge_files_with_store(dataframes, file_info_list, get_dataset_store())
                         if merged_df is not None:
+                            merged_df = st.session_state.dataset_registry.register(merged_key, merged_df)
                             st.session_state.merged_df = merged_df
+                            st.session_state.merged_key = merged_key
                             st.session_state.use_merged = True
                             st.session_state.current_df = merged_df
+                            st.session_state.current_key = merged_key
                             st.success(TranslationSystem.t('merged_success'))
                 
                 with col2:
                     if st.button(TranslationSystem.t('use_single'), use_container_width=True, icon="📄", key="single_button"):
                         st.session_state.use_merged = False
                         st.session_state.current_df = dataframes[0]
+                        st.session_state.current_key = file_keys[0]
                         st.info(f"📄 {TranslationSystem.t('individual_file')}")
+                
+                # مخطط البيانات المدمجة
+                merge_report = st.session_state.merge_report
+                if st.session_state.merged_df is not None and merge_report:
+                    with st.expander(TranslationSystem.t('merge_schema')):
+                        st.caption(TranslationSystem.t(
+                            'merge_memory',
+                            before=f"{merge_report['memory_before'] / 1024**2:.1f}",
+                            after=f"{merge_report['memory_after'] / 1024**2:.1f}"
+                        ))
+                        if merge_report['zero_copy']:
+                            st.caption(f"⚡ {TranslationSystem.t('merge_zero_copy')}")
+                        schema_df = pd.DataFrame(merge_report['columns'])
+                        schema_df['aliases'] = schema_df['aliases'].apply(', '.join)
+                        st.dataframe(schema_df, use_container_width=True, hide_index=True)
             
             # تحديد البيانات التي سيتم استخدامها
-            if not st.session_state.current_df:
+            if st.session_state.current_df is None:
                 if st.session_state.merged_df is not None:
                     st.session_state.current_df = st.session_state.merged_df
+                    st.session_state.current_key = st.session_state.merged_key
                     st.session_state.use_merged = True
                 else:
                     st.session_state.current_df = dataframes[0]
+                    st.session_state.current_key = file_keys[0]
                     st.session_state.use_merged = False
             
             # عرض إحصائيات
@@ -1378,14 +920,125 @@ if st.session_state.files_uploaded and st.session_state.current_df is not None:
 if st.session_state.get('analysis_ready', False):
     st.markdown(f"## 📊 {TranslationSystem.t('step_3')}")
     
-    analyzer = SalesDataAnalyzer(
-        st.session_state.current_df, 
-        st.session_state.column_mapping
-    )
+    append_mode = st.session_state.append_mode and not st.session_state.streaming_mode
     
-    # التحليل الذكي للبيانات
-    with st.spinner(TranslationSystem.t('loading_analysis')):
-        analysis = analyzer.analyze_all()
+    if st.session_state.streaming_mode:
+        # وضع الدفعات: النتائج والتقرير من المجمّع على الملفات كاملة، ولا محلل على صفوف المعاينة
+        analyzer = None
+        with st.spinner(TranslationSystem.t('loading_analysis')):
+            analysis = analyze_files_streaming(
+                uploaded_files or [],
+                st.session_state.file_info_list,
+                st.session_state.column_mapping,
+                st.session_state.distinct_mode
+            )
+    else:
+        if append_mode:
+            # وضع الإلحاق: الملفات الجديدة فقط تُسقط وتُضاف إلى البيانات المدمجة السابقة،
+            # ثم يمر التحليل والمرشحات على البيانات المدمجة كما في الوضع العادي
+            with st.spinner(TranslationSystem.t('loading_analysis')):
+                dataset, new_files = analyze_files_incremental(
+                    st.session_state.file_info_list,
+                    st.session_state.column_mapping,
+                    st.session_state.distinct_mode
+                )
+            st.caption(TranslationSystem.t(
+                'append_status',
+                files=len(dataset.member_keys),
+                rows=f"{len(dataset):,}",
+                new=new_files
+            ))
+            dataset_key = ('append',) + tuple(dataset.member_keys)
+            projection_key = (dataset_key, tuple(sorted(dataset.mapping.items())))
+            if st.session_state.get('analysis_projection_key') != projection_key:
+                st.session_state.analysis_df = dataset.dataframe
+                st.session_state.prepared_data = PreparedSalesDataset(dataset.dataframe, dataset.mapping, dataset.coercion)
+                st.session_state.analysis_projection_key = projection_key
+            sources = list(zip(dataset.member_names, dataset.member_rows))
+        else:
+            # إسقاط البيانات على الأعمدة المعيّنة فقط (يُعاد بناؤه عند تغيّر البيانات أو التعيين)
+            dataset_key = st.session_state.current_key
+            projection_key = (dataset_key, tuple(sorted(st.session_state.column_mapping.items())))
+            if st.session_state.get('analysis_projection_key') != projection_key:
+                coercion = {}
+                analysis_df = build_analysis_frame(st.session_state.current_df, st.session_state.column_mapping, coercion)
+                st.session_state.analysis_df = analysis_df
+                # الحقول تُحوَّل مرة واحدة لكل بيانات وتعيين وتُعاد مع كل إعادة تشغيل للواجهة
+                st.session_state.prepared_data = PreparedSalesDataset(analysis_df, st.session_state.column_mapping, coercion)
+                st.session_state.analysis_projection_key = projection_key
+                st.session_state.analysis_projection_sizes = (
+                    st.session_state.current_df.memory_usage(deep=True).sum(),
+                    analysis_df.memory_usage(deep=True).sum()
+                )
+            
+            original_size, projected_size = st.session_state.analysis_projection_sizes
+            st.caption(TranslationSystem.t(
+                'analysis_projection',
+                columns=len(st.session_state.analysis_df.columns),
+                size=f"{projected_size / 1024 ** 2:,.1f}",
+                original=f"{original_size / 1024 ** 2:,.1f}"
+            ))
+            
+            sources = get_analysis_sources(
+                st.session_state.analysis_df,
+                st.session_state.file_info_list,
+                st.session_state.use_merged
+            )
+        
+        # المرشحات: تقاطع فهارس الصفوف، والبيانات المقتطعة تُبنى فقط عند تغيّر المرشحات
+        date_from, date_to, filters = render_filter_panel(st.session_state.prepared_data)
+        filter_key = (date_from, date_to, tuple((field, tuple(values)) for field, values in sorted(filters.items())))
+        if st.session_state.get('filter_state_key') != (projection_key, filter_key):
+            rows = st.session_state.prepared_data.select_rows(date_from, date_to, filters)
+            st.session_state.filtered_data = None if rows is None else st.session_state.prepared_data.subset(rows)
+            st.session_state.filter_state_key = (projection_key, filter_key)
+        filtered_data = st.session_state.filtered_data
+        
+        if filtered_data is None:
+            analyzer = SalesDataAnalyzer(
+                st.session_state.analysis_df, 
+                st.session_state.column_mapping,
+                sources=sources,
+                duplicate_key=st.session_state.duplicate_key,
+                max_fingerprints=get_duplicate_max_fingerprints(),
+                prepared=st.session_state.prepared_data,
+                dataset_key=dataset_key,
+                section_cache=st.session_state.section_cache,
+                distinct_mode=st.session_state.distinct_mode,
+                profile_budget=PROFILE_TIME_BUDGET
+            )
+        else:
+            if len(filtered_data):
+                st.caption(TranslationSystem.t(
+                    'filter_status',
+                    rows=f"{len(filtered_data):,}",
+                    total=f"{len(st.session_state.prepared_data):,}"
+                ))
+            else:
+                st.warning(TranslationSystem.t('filter_empty'))
+            analyzer = SalesDataAnalyzer(
+                filtered_data.df,
+                st.session_state.column_mapping,
+                sources=get_filtered_sources(sources, filtered_data.rows),
+                duplicate_key=st.session_state.duplicate_key,
+                max_fingerprints=get_duplicate_max_fingerprints(),
+                prepared=filtered_data,
+                dataset_key=st.session_state.filter_state_key,
+                section_cache=st.session_state.filter_section_cache,
+                distinct_mode=st.session_state.distinct_mode,
+                profile_budget=PROFILE_TIME_BUDGET
+            )
+        
+        # التحليل الذكي للبيانات
+        with st.spinner(TranslationSystem.t('loading_analysis')):
+            analysis = analyzer.analyze_all()
+    
+    if analyzer is not None:
+        for level, message in analyzer.notices:
+            getattr(st, level)(message)
+        
+        cache_stats = analyzer.section_cache.stats()
+        st.caption(TranslationSystem.t('section_cache_stats', hits=cache_stats['hits'], misses=cache_stats['misses']))
     
     st.session_state.analysis_results = analysis
     
@@ -1393,41 +1046,133 @@ if st.session_state.get('analysis_ready', False):
     st.markdown(f"### 📈 {TranslationSystem.t('kpis_title')}")
     
     # بطاقات KPIs مع تعريفات
-    kpis = analysis.get('kpis', {})
-    if kpis:
-        kpi_keys = list(kpis.keys())
-        
-        # عرض KPIs في أعمدة
-        cols_per_row = 3
-        for i in range(0, len(kpi_keys), cols_per_row):
-            cols = st.columns(cols_per_row)
-            for j in range(cols_per_row):
-                if i + j < len(kpi_keys):
-                    kpi_key = kpi_keys[i + j]
-                    with cols[j]:
-                        kpi_info = kpis[kpi_key]
-                        trend_color = {
-                            'positive': '#10B981',
-                            'negative': '#EF4444',
-                            'neutral': '#6B7280'
-                        }.get(kpi_info.get('trend', 'neutral'), '#6B7280')
-                        
-                        st.markdown(f"""
-                        <div class="kpi-card">
-                            <div style="font-size: 2.5rem; margin-bottom: 10px; color: {trend_color};">
-                                {kpi_info.get('icon', '📊')}
-                            </div>
-                            <div style="font-size: 1.8rem; font-weight: bold; color: #60A5FA;">
-                                {kpi_info['formatted']}
-                            </div>
-                            <div style="color: #D1D5DB; font-size: 1rem; font-weight: 600;">
-                                {kpi_info['label']}
-                            </div>
-                            <div class="definition-text">
-                                {kpi_info.get('definition', '')}
-                            </div>
-                        </div>
-                        """, unsafe_allow_html=True)
+    render_kpi_cards(analysis.get('kpis', {}))
+    
+    # بطاقات النمو (شهري، ربعي، سنوي، آخر 7/30/90/365 يوماً) والنمو لكل منطقة ومندوب
+    growth = analysis.get('growth_metrics', {})
+    if growth.get('kpis'):
+        st.markdown(f"### 📈 {TranslationSystem.t('growth_title')}")
+        render_kpi_cards(growth['kpis'])
+        if any(growth.get(field) for field in GROWTH_GROUP_FIELDS):
+            with st.expander(f"📊 {TranslationSystem.t('growth_by_group')}"):
+                cols = st.columns(len(GROWTH_GROUP_FIELDS))
+                for col, field in zip(cols, GROWTH_GROUP_FIELDS):
+                    if growth.get(field):
+                        col.markdown(f"**{TranslationSystem.t(f'field_{field}')}**")
+                        col.dataframe(pd.DataFrame(growth[field]).set_index('value'), use_container_width=True)
+    
+    # لوحات الصدارة: الأعلى والأدنى لكل بعد
+    performers = analysis.get('top_performers', {})
+    if performers:
+        with st.expander(f"🏅 {TranslationSystem.t('top_performers')}"):
+            field = st.selectbox(
+                TranslationSystem.t('top_performers'), list(performers),
+                format_func=lambda name: TranslationSystem.t(f'field_{name}'), key='leaderboard_field'
+            )
+            board = performers[field]
+            cols = st.columns(2)
+            for col, side in zip(cols, ('top', 'bottom')):
+                col.markdown(f"**{TranslationSystem.t(f'leaderboard_{side}')}**")
+                col.dataframe(pd.DataFrame(board[side]).set_index('value'), use_container_width=True)
+    
+    # شرائح العملاء RFM: عدد العملاء وحصة الإيرادات لكل شريحة
+    segments = analysis.get('customer_analysis', {}).get('segments')
+    if segments:
+        with st.expander(f"👥 {TranslationSystem.t('segments_title')}"):
+            segments_df = pd.DataFrame(segments)
+            segments_df['segment'] = segments_df['segment'].map(lambda name: TranslationSystem.t(f'segment_{name}'))
+            fig = px.bar(
+                segments_df, x='segment', y=['customer_share', 'revenue_share'], barmode='group',
+                labels={'segment': '', 'value': '%', 'variable': ''}
+            )
+            st.plotly_chart(fig, use_container_width=True)
+            st.dataframe(
+                segments_df.set_index('segment')[['customers', 'revenue', 'revenue_share']].rename(columns={
+                    'customers': TranslationSystem.t('segment_customers'),
+                    'revenue': TranslationSystem.t('kpi_sales'),
+                    'revenue_share': TranslationSystem.t('segment_revenue_share')
+                }),
+                use_container_width=True
+            )
+    
+    # محفظة المنتجات ABC: الفئات ومنحنى باريتو والمنتجات الخاسرة في الذيل
+    portfolio = analysis.get('product_analysis', {})
+    if portfolio.get('classes'):
+        with st.expander(f"📦 {TranslationSystem.t('portfolio_title')}"):
+            classes_df = pd.DataFrame(portfolio['classes']).set_index('class')
+            classes_df.index.name = TranslationSystem.t('portfolio_class')
+            st.dataframe(classes_df.rename(columns={'products': TranslationSystem.t('portfolio_products')}), use_container_width=True)
+            
+            fig = px.line(pd.DataFrame(portfolio['pareto']), x='product_share', y='revenue_share',
+                          title=TranslationSystem.t('portfolio_pareto'), labels={'product_share': '%', 'revenue_share': '%'})
+            st.plotly_chart(fig, use_container_width=True)
+            
+            tail = portfolio.get('long_tail_loss')
+            if tail and tail['products']:
+                st.warning(TranslationSystem.t('portfolio_long_tail', count=f"{tail['products']:,}", loss=f"{-tail['margin']:,.0f}"))
+                st.dataframe(pd.DataFrame(tail['worst']).set_index('product'), use_container_width=True)
+    
+    # مئينات قيمة المعاملة لكل منطقة ومندوب
+    percentiles = analysis.get('percentiles', {})
+    if any(percentiles.get(field) for field in QUANTILE_GROUP_FIELDS):
+        with st.expander(f"📐 {TranslationSystem.t('percentiles_title')}"):
+            cols = st.columns(len(QUANTILE_GROUP_FIELDS))
+            for col, field in zip(cols, QUANTILE_GROUP_FIELDS):
+                if percentiles.get(field):
+                    col.markdown(f"**{TranslationSystem.t(f'field_{field}')}**")
+                    col.dataframe(pd.DataFrame(percentiles[field]).set_index('value'), use_container_width=True)
+    
+    # التقطيع السريع من مكعب المبيعات (بدون إعادة التحليل على الصفوف)
+    # (مكعب البيانات المُصفّاة عند وجود مرشحات في الشريط الجانبي)
+    if not st.session_state.streaming_mode:
+        with st.expander(f"⚡ {TranslationSystem.t('cube_title')}"):
+            # نطاق التاريخ يأتي من لوحة المرشحات (المكعب مبني على البيانات المُصفّاة)
+            cube = (st.session_state.prepared_data if filtered_data is None else filtered_data).cube()
+            
+            slice_filters = {}
+            if cube.dimensions:
+                filter_cols = st.columns(len(cube.dimensions))
+                for col, field in zip(filter_cols, cube.dimensions):
+                    with col:
+                        slice_filters[field] = st.multiselect(
+                            TranslationSystem.t(f'field_{field}'), cube.values(field), key=f'cube_{field}'
+                        ) or None
+                breakdown = st.selectbox(
+                    TranslationSystem.t('cube_breakdown'),
+                    list(cube.dimensions),
+                    format_func=lambda field: TranslationSystem.t(f'field_{field}'),
+                    key='cube_breakdown'
+                )
+            
+            started = time.perf_counter()
+            slice_kpis = SalesDataAnalyzer._format_kpis(cube.totals(filters=slice_filters))
+            slice_trend = cube.trend(filters=slice_filters)
+            measure = 'sales' if 'sales' in cube.cells else 'transactions'
+            slice_distribution = cube.distribution(breakdown, measure, filters=slice_filters) if cube.dimensions else None
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            
+            metric_keys = [key for key in ('total_transactions', 'total_sales', 'avg_transaction', 'gross_margin') if key in slice_kpis]
+            for col, key in zip(st.columns(len(metric_keys)), metric_keys):
+                col.metric(slice_kpis[key]['label'], slice_kpis[key]['formatted'])
+            
+            if slice_distribution is not None and len(slice_distribution):
+                fig = px.bar(
+                    x=slice_distribution.index.astype(str),
+                    y=slice_distribution.values,
+                    labels={'x': TranslationSystem.t(f'field_{breakdown}'), 'y': slice_kpis.get('total_sales', slice_kpis['total_transactions'])['label']}
+                )
+                st.plotly_chart(fig, use_container_width=True)
+            if slice_trend:
+                trend_df = pd.DataFrame(slice_trend)
+                fig = px.line(trend_df, x='year_month', y='sum', markers=True, title=TranslationSystem.t('cube_trend'))
+                st.plotly_chart(fig, use_container_width=True)
+            
+            st.caption(TranslationSystem.t(
+                'cube_stats',
+                cells=f"{len(cube):,}",
+                size=f"{cube.memory_bytes / 1024:,.0f}",
+                ms=f"{elapsed_ms:,.1f}"
+            ))
     
     # جودة البيانات
     if analysis.get('warnings'):
@@ -1435,6 +1180,19 @@ if st.session_state.get('analysis_ready', False):
         for warning in analysis['warnings']:
             st.warning(warning)
     
+    # ملف تعريف الأعمدة: جدول الجودة لكل عمود
+    profile = analysis.get('quality_profile', {})
+    if profile.get('columns'):
+        with st.expander(f"🧪 {TranslationSystem.t('quality_table_title')}"):
+            if profile['sampled']:
+                st.caption(TranslationSystem.t(
+                    'quality_sampled',
+                    rows=f"{profile['profiled_rows']:,}",
+                    total=f"{profile['rows']:,}",
+                    ms=f"{profile['elapsed'] * 1000:,.0f}"
+                ))
+            st.dataframe(pd.DataFrame(profile['columns']).set_index('column'), use_container_width=True)
+    
     # النقاط الرئيسية
     if analysis.get('insights'):
         st.markdown(f"### 🎯 {TranslationSystem.t('key_findings')}")
@@ -1446,7 +1204,10 @@ if st.session_state.get('analysis_ready', False):
     
     # زر إنشاء التقرير
     if st.button(TranslationSystem.t('generate_report'), use_container_width=True, icon="📋", type="primary", key="generate_report"):
-        st.session_state.text_report = analyzer.generate_professional_report(analysis)
+        if analyzer is not None:
+            st.session_state.text_report = analyzer.generate_professional_report(analysis)
+        else:
+            st.session_state.text_report = SalesDataAnalyzer.format_report(analysis)
     
     # عرض التقرير إذا كان موجوداً
     if st.session_state.text_report:
@@ -0,0 +1,251 @@
+"""
+وحدة تحميل ملفات المبيعات (Excel/CSV) مع دعم التحميل المتوازي
+"""
+
+import os
+import re
+import time
+import codecs
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+import pandas as pd
+
+from sales_upload_cache import upload_key
+
+SUPPORTED_EXTENSIONS = ('.csv', '.xlsx', '.xls')
+
+# محركات القراءة: pandas الافتراضي أو pyarrow متعدد الخيوط مع أنواع بيانات Arrow
+READER_BACKENDS = ('pandas', 'pyarrow')
+
+# حدود فحص الترميز: يتم فك ترميز بداية الملف فقط بدلاً من تجربة قراءته كاملاً بكل ترميز
+ENCODING_SNIFF_BYTES = 64 * 1024
+ENCODING_FALLBACK_BYTES = 4 * 1024 * 1024
+
+_HIGH_BYTE = re.compile(rb'[\x80-\xff]')
+_HIGH_BYTES = bytes(range(0x80, 0x100))
+# بايتات cp1256 التي تقابل حروفاً عربية (U+0600 - U+06FF)
+_CP1256_ARABIC_BYTES = bytes(
+    b for b in _HIGH_BYTES
+    if '\u0600' <= bytes([b]).decode('cp1256', errors='replace') <= '\u06ff'
+)
+
+# لا فائدة من تشغيل عمليات منفصلة لملفات صغيرة: تكلفة بدء العمليات أكبر من التحليل نفسه
+PARALLEL_MIN_BYTES = 2 * 1024 * 1024
+
+
+def is_supported_file(file_name):
+    """فحص إذا كان امتداد الملف مدعوماً"""
+    return file_name.lower().endswith(SUPPORTED_EXTENSIONS)
+
+
+def _sniff_sample(sample, is_complete):
+    """تحديد ترميز عينة من البايتات - يعيد None إذا كانت العينة ASCII فقط"""
+    if not _HIGH_BYTE.search(sample):
+        return None
+
+    # UTF-8: فك ترميز تدريجي حتى لا يفشل حرف مقطوع في نهاية العينة
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=is_complete)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+
+    # cp1256: أغلب البايتات العالية يجب أن تكون حروفاً عربية
+    high_count = len(sample) - len(sample.translate(None, _HIGH_BYTES))
+    arabic_count = len(sample) - len(sample.translate(None, _CP1256_ARABIC_BYTES))
+    if arabic_count / high_count >= 0.6:
+        return 'cp1256'
+
+    return 'latin1'
+
+
+def detect_csv_encoding(content, sample_size=ENCODING_SNIFF_BYTES, fallback_size=ENCODING_FALLBACK_BYTES):
+    """
+    تحديد ترميز ملف CSV من بدايته فقط.
+
+    يعيد قاموساً فيه الترميز المختار وطريقة تحديده وعدد البايتات المفحوصة.
+    """
+    if content.startswith(codecs.BOM_UTF8):
+        return {'encoding': 'utf-8-sig', 'method': 'bom', 'sniffed_bytes': len(codecs.BOM_UTF8)}
+    if content.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return {'encoding': 'utf-16', 'method': 'bom', 'sniffed_bytes': 2}
+
+    encoding = _sniff_sample(content[:sample_size], len(content) <= sample_size)
+    if encoding is not None:
+        return {'encoding': encoding, 'method': 'prefix', 'sniffed_bytes': min(len(content), sample_size)}
+
+    # بداية الملف ASCII فقط: نبحث عن أول بايت عالٍ ضمن ميزانية محددة ونفحص ما حوله
+    match = _HIGH_BYTE.search(content, 0, fallback_size)
+    if match is None:
+        return {'encoding': 'utf-8', 'method': 'ascii', 'sniffed_bytes': min(len(content), fallback_size)}
+
+    end = min(match.start() + sample_size, fallback_size)
+    encoding = _sniff_sample(content[match.start():end], end >= len(content))
+    return {'encoding': encoding, 'method': 'fallback', 'sniffed_bytes': end}
+
+
+def _read_csv(content, encoding, backend, encoding_errors='strict', nrows=None, usecols=None):
+    """قراءة CSV بالمحرك المطلوب"""
+    if usecols is not None:
+        # نقاطع مع رأس الملف حتى لا يفشل ملف ينقصه أحد الأعمدة المطلوبة
+        header = pd.read_csv(BytesIO(content), encoding=encoding, encoding_errors='replace', nrows=0).columns
+        wanted = set(usecols)
+        usecols = [column for column in header if column in wanted]
+
+    if backend == 'pyarrow' and encoding_errors == 'strict' and nrows is None:
+        return pd.read_csv(BytesIO(content), encoding=encoding, engine='pyarrow', dtype_backend='pyarrow',
+                           usecols=usecols)
+    if backend == 'pyarrow':
+        # محرك pyarrow لا يدعم encoding_errors ولا nrows: نستخدم محرك C مع الحفاظ على أنواع Arrow
+        return pd.read_csv(BytesIO(content), encoding=encoding, encoding_errors=encoding_errors,
+                           nrows=nrows, usecols=usecols, dtype_backend='pyarrow')
+    return pd.read_csv(BytesIO(content), encoding=encoding, encoding_errors=encoding_errors,
+                       nrows=nrows, usecols=usecols)
+
+
+def read_csv_content(content, backend='pandas', nrows=None, usecols=None):
+    """قراءة محتوى CSV مرة واحدة بالترميز المكتشف"""
+    encoding_info = detect_csv_encoding(content)
+
+    try:
+        df = _read_csv(content, encoding_info['encoding'], backend, nrows=nrows, usecols=usecols)
+        # pyarrow لا يفشل عند بايتات غير صالحة بل يعيد عموداً ثنائياً
+        if any(str(dtype) == 'binary[pyarrow]' for dtype in df.dtypes):
+            raise UnicodeDecodeError(encoding_info['encoding'], b'', 0, 1, 'binary column')
+    except UnicodeDecodeError:
+        # الملف يحتوي بعد حدود الفحص على بايتات لا تطابق الترميز المختار
+        encoding_info = {
+            'encoding': encoding_info['encoding'],
+            'method': 'replace',
+            'sniffed_bytes': encoding_info['sniffed_bytes']
+        }
+        df = _read_csv(content, encoding_info['encoding'], backend, encoding_errors='replace',
+                       nrows=nrows, usecols=usecols)
+
+    return df, encoding_info
+
+
+def read_sales_file(file_name, content, backend='pandas', nrows=None, usecols=None):
+    """
+    قراءة ملف مبيعات واحد من محتواه الخام - يعيد (البيانات, معلومات الترميز)
+
+    nrows يحدد عدد صفوف المعاينة لملفات CSV في وضع التحليل المتدفق،
+    و usecols يقصر القراءة على أعمدة محددة (الأعمدة غير الموجودة في الملف تُتجاهل).
+    """
+    if backend not in READER_BACKENDS:
+        raise ValueError(f"محرك قراءة غير معروف: {backend}")
+
+    name = file_name.lower()
+
+    if name.endswith('.csv'):
+        return read_csv_content(content, backend, nrows, usecols)
+
+    if name.endswith('.xlsx') or name.endswith('.xls'):
+        excel_usecols = None
+        if usecols is not None:
+            wanted = set(usecols)
+            excel_usecols = lambda column: column in wanted
+        if backend == 'pyarrow':
+            return pd.read_excel(BytesIO(content), engine='openpyxl', usecols=excel_usecols,
+                                 dtype_backend='pyarrow'), None
+        return pd.read_excel(BytesIO(content), engine='openpyxl', usecols=excel_usecols), None
+
+    raise ValueError(f"نوع الملف غير مدعوم: {file_name}")
+
+
+def _load_one(file_name, content, backend='pandas', csv_nrows=None):
+    """تحميل ملف واحد مع قياس الزمن - تعمل داخل عملية منفصلة"""
+    start = time.perf_counter()
+    try:
+        df, encoding_info = read_sales_file(file_name, content, backend, csv_nrows)
+        error = None
+    except Exception as e:
+        df, encoding_info = None, None
+        error = str(e)
+
+    return {
+        'name': file_name,
+        'size': len(content),
+        'dataframe': df,
+        'encoding': encoding_info,
+        'error': error,
+        'backend': backend,
+        'preview_only': csv_nrows is not None and file_name.lower().endswith('.csv'),
+        'source': 'parsed',
+        'load_time': time.perf_counter() - start
+    }
+
+
+def _load_many(files, parallel, max_workers, backend, csv_nrows):
+    """تحليل قائمة ملفات تسلسلياً أو على مجموعة عمليات"""
+    total_bytes = sum(len(content) for _, content in files)
+
+    if not parallel or len(files) < 2 or total_bytes < PARALLEL_MIN_BYTES:
+        return [_load_one(name, content, backend, csv_nrows) for name, content in files]
+
+    workers = min(len(files), max_workers or os.cpu_count() or 1)
+    if workers < 2:
+        return [_load_one(name, content, backend, csv_nrows) for name, content in files]
+
+    try:
+        # spawn بدلاً من fork لأن خادم Streamlit متعدد الخيوط
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            futures = [executor.submit(_load_one, name, content, backend, csv_nrows) for name, content in files]
+            return [future.result() for future in futures]
+    except Exception:
+        # إذا تعذر إنشاء العمليات (بيئة مقيدة مثلاً) نعود للتحميل التسلسلي
+        return [_load_one(name, content, backend, csv_nrows) for name, content in files]
+
+
+def load_files(files, parallel=True, max_workers=None, backend='pandas', csv_nrows=None, cache=None, store=None):
+    """
+    تحميل قائمة ملفات [(الاسم, المحتوى)] مع الحفاظ على ترتيبها.
+
+    في الوضع المتوازي يتم تحليل كل ملف في عملية مستقلة لأن قراءة Excel
+    عبر openpyxl تستهلك المعالج وتحتجز الـ GIL.
+    عند تمرير cache (ParsedUploadCache) لا يُعاد تحليل ملف سبق تحليله بنفس المحتوى والخيارات،
+    وعند تمرير store (LocalDatasetStore) يُفتح الملف من المخزن المحلي إن وُجد ويُحفظ فيه بعد تحليله.
+    """
+    files = list(files)
+    results = [None] * len(files)
+    pending = []
+    use_store = store is not None and csv_nrows is None
+
+    for index, (name, content) in enumerate(files):
+        start = time.perf_counter()
+        key = upload_key(content, backend=backend, csv_nrows=csv_nrows)
+
+        result = cache.get(key) if cache is not None else None
+        source = 'cache'
+
+        if result is None and use_store and key in store:
+            df = store.get(key, arrow_dtypes=(backend == 'pyarrow'))
+            if df is not None:
+                result = dict(store.entry(key)['meta'], dataframe=df)
+                source = 'store'
+                if cache is not None:
+                    cache.put(key, result)
+
+        if result is not None:
+            results[index] = dict(result, name=name, key=key, source=source,
+                                  load_time=time.perf_counter() - start)
+            continue
+        pending.append((index, key))
+
+    loaded = _load_many([files[index] for index, _ in pending], parallel, max_workers, backend, csv_nrows)
+
+    for (index, key), result in zip(pending, loaded):
+        result['key'] = key
+        if result['error'] is None:
+            if cache is not None:
+                cache.put(key, result)
+            if use_store:
+                meta = {field: value for field, value in result.items()
+                        if field not in ('dataframe', 'name', 'key', 'source', 'load_time')}
+                store.put(key, result['dataframe'], result['name'], kind='file', meta=meta)
+        results[index] = result
+
+    return results
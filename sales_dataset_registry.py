@@ -0,0 +1,41 @@
+"""
+سجل بيانات الجلسة - كل جدول يُحفظ مرة واحدة وتحصل الواجهات والتحليل على مراجع للقراءة فقط
+"""
+
+def read_only_view(df):
+    """مرجع يشارك بيانات الجدول دون نسخها - مع النسخ عند الكتابة (pandas 3) أي كتابة عليه تنسخ العمود المعني فقط"""
+    return df.copy(deep=False)
+
+
+class DatasetRegistry:
+    """جداول الجلسة مفهرسة بمفتاح المحتوى، كل جدول مرة واحدة مهما تعددت مراجعه"""
+
+    def __init__(self):
+        self._tables = {}
+
+    def __contains__(self, key):
+        return key in self._tables
+
+    def __len__(self):
+        return len(self._tables)
+
+    def register(self, key, df):
+        """تسجيل جدول (إن لم يكن مسجلاً) وإرجاع مرجع له"""
+        if key not in self._tables:
+            self._tables[key] = df
+        return self.view(key)
+
+    def view(self, key):
+        """مرجع للقراءة فقط على جدول مسجل"""
+        table = self._tables.get(key)
+        return None if table is None else read_only_view(table)
+
+    def retain(self, keys):
+        """تحرير الجداول التي لم تعد مستخدمة في الجلسة"""
+        keys = set(keys)
+        for key in list(self._tables):
+            if key not in keys:
+                del self._tables[key]
+
+    def total_bytes(self):
+        return int(sum(df.memory_usage(deep=True).sum() for df in self._tables.values()))
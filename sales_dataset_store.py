@@ -0,0 +1,191 @@
+"""
+مخزن محلي دائم للبيانات بصيغة Feather (Arrow IPC) مفهرس ببصمة المحتوى - يُفتح بالذاكرة المعيّنة (memory-map)
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: القفل داخل العملية فقط
+    fcntl = None
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from sales_upload_cache import content_hash
+
+DEFAULT_STORE_MAX_BYTES = 2 * 1024 * 1024 * 1024
+INDEX_FILE = 'index.json'
+LOCK_FILE = 'index.lock'
+
+
+def merged_dataset_key(member_keys):
+    """مفتاح البيانات المدمجة: بصمة مفاتيح الملفات المكوِّنة بترتيبها"""
+    return 'merged-' + content_hash('\n'.join(member_keys).encode('utf-8'))
+
+
+class LocalDatasetStore:
+    """
+    مخزن بيانات على القرص مع فهرس وحد أقصى للحجم.
+
+    الملفات تُحفظ بدون ضغط حتى يمكن فتحها بـ memory-map بدلاً من قراءتها كاملة،
+    وعند تجاوز الحد يُحذف الأقدم استخداماً أولاً.
+
+    كل تعديل للفهرس يتم تحت قفل ملف (بين العمليات) وقفل خيوط، ويبدأ بإعادة قراءة الفهرس من القرص
+    حتى لا تضيع مدخلات كتبتها جلسة أخرى. القراءة لا تعيد كتابة الفهرس: وقت آخر استخدام يُحفظ
+    في الذاكرة ويُدمج في الفهرس مع الكتابة التالية.
+    """
+
+    def __init__(self, root_dir, max_bytes=DEFAULT_STORE_MAX_BYTES):
+        self.root_dir = root_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._accessed = {}
+        os.makedirs(root_dir, exist_ok=True)
+        self._index = self._read_index()
+
+    # ---------- الفهرس ----------
+
+    def _index_path(self):
+        return os.path.join(self.root_dir, INDEX_FILE)
+
+    def _read_index(self):
+        """قراءة الفهرس مع تجاهل المدخلات التي حُذفت ملفاتها"""
+        try:
+            with open(self._index_path(), 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return {key: entry for key, entry in index.items()
+                if os.path.exists(os.path.join(self.root_dir, entry['file']))}
+
+    @contextmanager
+    def _locked_index(self):
+        """تعديل الفهرس: قفل ثم إعادة قراءته من القرص ودمج أوقات الاستخدام، والكتابة عند الخروج"""
+        with self._lock, open(os.path.join(self.root_dir, LOCK_FILE), 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._index = self._read_index()
+                for key, last_access in self._accessed.items():
+                    entry = self._index.get(key)
+                    if entry is not None and last_access > entry['last_access']:
+                        entry['last_access'] = last_access
+                self._accessed = {}
+                yield self._index
+                self._write_index()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write_index(self):
+        temp_path = self._index_path() + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self._index_path())
+
+    # ---------- الواجهة ----------
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def put(self, key, df, name, kind='file', meta=None):
+        """حفظ جدول في المخزن - يعيد False إذا تعذر تحويله إلى Arrow"""
+        file_name = content_hash(key.encode('utf-8')) + '.feather'
+        path = os.path.join(self.root_dir, file_name)
+
+        try:
+            # بدون ضغط: شرط لفتح الملف بالذاكرة المعيّنة دون نسخ
+            feather.write_feather(df, path, compression='uncompressed')
+        except Exception:
+            if os.path.exists(path):
+                os.remove(path)
+            return False
+
+        now = datetime.now().isoformat()
+        with self._locked_index():
+            self._index[key] = {
+                'file': file_name,
+                'name': name,
+                'kind': kind,
+                'rows': len(df),
+                'columns': len(df.columns),
+                'bytes': os.path.getsize(path),
+                'created_at': now,
+                'last_access': now,
+                'meta': meta or {}
+            }
+            self._enforce_quota(keep=key)
+        return True
+
+    def get(self, key, arrow_dtypes=False):
+        """
+        فتح جدول محفوظ بالذاكرة المعيّنة.
+
+        مع arrow_dtypes=True تبقى الأعمدة مدعومة بـ Arrow (بدون نسخ للبيانات الرقمية)،
+        وإلا تُستعاد أنواع pandas الأصلية المحفوظة في البيانات الوصفية.
+        """
+        entry = self._index.get(key)
+        if entry is None:
+            return None
+
+        try:
+            with pa.memory_map(os.path.join(self.root_dir, entry['file']), 'r') as source:
+                table = pa.ipc.open_file(source).read_all()
+            df = table.to_pandas(types_mapper=pd.ArrowDtype) if arrow_dtypes else table.to_pandas()
+        except Exception:
+            return None
+
+        with self._lock:
+            self._accessed[key] = datetime.now().isoformat()
+        return df
+
+    def entry(self, key):
+        """البيانات الوصفية لمدخل"""
+        return self._index.get(key)
+
+    def list_datasets(self):
+        """قائمة البيانات المحفوظة من الأحدث استخداماً إلى الأقدم"""
+        entries = [dict(entry, key=key, last_access=max(entry['last_access'], self._accessed.get(key, '')))
+                   for key, entry in self._index.items()]
+        return sorted(entries, key=lambda entry: entry['last_access'], reverse=True)
+
+    def total_bytes(self):
+        return sum(entry['bytes'] for entry in self._index.values())
+
+    def evict(self, key):
+        """حذف مدخل وملفه"""
+        with self._locked_index():
+            self._remove(key)
+
+    def clear(self):
+        """حذف جميع البيانات المحفوظة"""
+        with self._locked_index():
+            for key in list(self._index):
+                self._remove(key)
+
+    # ---------- داخلي ----------
+
+    def _remove(self, key):
+        entry = self._index.pop(key, None)
+        if entry is not None:
+            path = os.path.join(self.root_dir, entry['file'])
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _enforce_quota(self, keep=None):
+        """حذف الأقدم استخداماً حتى يعود الحجم تحت الحد"""
+        by_age = sorted(self._index.items(), key=lambda item: item[1]['last_access'])
+        total = sum(entry['bytes'] for entry in self._index.values())
+        for key, entry in by_age:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= entry['bytes']
+            self._remove(key)
@@ -0,0 +1,157 @@
+"""
+وحدة كشف التكرارات ببصمات الصفوف (64-bit) - داخل الملف الواحد وبين الملفات المدمجة مع تحديد الملف الأصلي
+"""
+
+import numpy as np
+import pandas as pd
+
+# مفاتيح التكرار المتاحة: كل الأعمدة، رقم الطلب، أو رقم الطلب + المنتج
+# (التحليل يمر على إسقاط الأعمدة المعيّنة، فـ 'all' تعني كل الأعمدة المعيّنة: صفان يختلفان
+# في عمود غير معيّن فقط يُعدّان مكررين)
+DUPLICATE_KEYS = {
+    'all': None,
+    'order_id': ('order_id',),
+    'order_product': ('order_id', 'product_id'),
+}
+
+DEFAULT_HASH_CHUNK_ROWS = 500_000
+
+_HASH_SPACE = float(2 ** 64)
+
+
+def resolve_key_columns(df, column_mapping, key='all'):
+    """أعمدة مفتاح التكرار - يعود إلى كل أعمدة البيانات (المعيّنة بعد الإسقاط) إذا كانت حقول المفتاح غير معيّنة"""
+    fields = DUPLICATE_KEYS.get(key)
+    if fields:
+        columns = [column_mapping.get(field) for field in fields]
+        if all(column in df.columns for column in columns):
+            return list(dict.fromkeys(columns))
+    return df.columns.tolist()
+
+
+def row_fingerprints(df, columns=None):
+    """بصمة 64-bit لكل صف محسوبة بشكل متجه على أعمدة المفتاح"""
+    frame = df if columns is None else df[columns]
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+
+class DuplicateDetector:
+    """
+    كاشف تكرارات يمر على الملفات مرة واحدة دفعة بعد دفعة.
+
+    يحتفظ بمصفوفة مرتبة من البصمات التي رآها ومصدر أول ظهور لكل منها، فيميّز
+    التكرار داخل الملف عن التكرار مع ملف سابق. مع max_fingerprints يعمل بذاكرة
+    محدودة: يحتفظ فقط بالبصمات الواقعة تحت عتبة تُنصَّف كلما امتلأت الذاكرة،
+    وتُقدَّر الأعداد من هذه العينة.
+    """
+
+    def __init__(self, max_fingerprints=None, chunk_rows=DEFAULT_HASH_CHUNK_ROWS):
+        self.max_fingerprints = max_fingerprints
+        self.chunk_rows = chunk_rows
+        self.threshold = None
+        self.sources = []
+        self.total_rows = 0
+        self._seen = np.empty(0, dtype=np.uint64)
+        self._seen_source = np.empty(0, dtype=np.int32)
+        self._within = []
+        self._cross = {}
+
+    @property
+    def sample_rate(self):
+        return 1.0 if self.threshold is None else self.threshold / _HASH_SPACE
+
+    def add(self, df, name, columns=None):
+        """تمرير ملف (أو جزء من البيانات المدمجة) كمصدر جديد"""
+        source = len(self.sources)
+        self.sources.append(name)
+        self._within.append(0)
+        self.total_rows += len(df)
+
+        for start in range(0, len(df), self.chunk_rows):
+            chunk = df.iloc[start:start + self.chunk_rows]
+            self._add_fingerprints(row_fingerprints(chunk, columns), source)
+        return self
+
+    def _add_fingerprints(self, fingerprints, source):
+        # كل تكرار في العينة يمثل 1/sample_rate تكراراً في البيانات الكاملة
+        weight = 1.0 / self.sample_rate
+        if self.threshold is not None:
+            fingerprints = fingerprints[fingerprints < np.uint64(self.threshold)]
+
+        unique, counts = np.unique(fingerprints, return_counts=True)
+
+        # تكرار مع دفعات سابقة (من نفس الملف أو من ملف آخر)
+        insert_at = np.searchsorted(self._seen, unique)
+        if len(self._seen):
+            positions = np.minimum(insert_at, len(self._seen) - 1)
+            found = self._seen[positions] == unique
+        else:
+            positions = insert_at
+            found = np.zeros(len(unique), dtype=bool)
+
+        # كل ظهور لبصمة رآها الكاشف من قبل يُنسب لمصدر أول ظهور، والبصمات الجديدة تُحسب
+        # تكراراتها داخل الدفعة - فالنتيجة لا تعتمد على حدود الدفعات
+        self._within[source] += int((counts[~found] - 1).sum()) * weight
+        origins = self._seen_source[positions[found]]
+        repeats = counts[found]
+        self._within[source] += int(repeats[origins == source].sum()) * weight
+        cross = origins != source
+        for origin in np.unique(origins[cross]):
+            count = int(repeats[cross & (origins == origin)].sum())
+            self._cross[(source, int(origin))] = self._cross.get((source, int(origin)), 0) + count * weight
+
+        # دمج البصمات الجديدة (مرتبة من np.unique) في مواضعها دون إعادة ترتيب المصفوفة كلها
+        new = ~found
+        if new.any():
+            self._seen = np.insert(self._seen, insert_at[new], unique[new])
+            self._seen_source = np.insert(self._seen_source, insert_at[new], np.int32(source))
+
+        self._shrink()
+
+    def _shrink(self):
+        """تنصيف عتبة العينة حتى يعود عدد البصمات تحت الحد"""
+        if not self.max_fingerprints:
+            return
+        while len(self._seen) > self.max_fingerprints:
+            self.threshold = (2 ** 63) if self.threshold is None else self.threshold // 2
+            keep = self._seen < np.uint64(self.threshold)
+            self._seen, self._seen_source = self._seen[keep], self._seen_source[keep]
+
+    @staticmethod
+    def _estimate(count):
+        return int(round(count))
+
+    def report(self):
+        """ملخص التكرارات: الإجمالي، لكل ملف، وبين الملفات مع الملف الأصلي"""
+        within_file = {name: self._estimate(count) for name, count in zip(self.sources, self._within)}
+        cross_file = [
+            {'file': self.sources[source], 'origin': self.sources[origin], 'count': self._estimate(count)}
+            for (source, origin), count in sorted(self._cross.items())
+        ]
+        return {
+            'total_rows': self.total_rows,
+            'duplicate_rows': sum(within_file.values()) + sum(item['count'] for item in cross_file),
+            'within_file': within_file,
+            'cross_file': cross_file,
+            'exact': self.threshold is None,
+            'sample_rate': self.sample_rate
+        }
+
+
+def find_duplicates(df, columns=None, sources=None, max_fingerprints=None):
+    """
+    كشف التكرارات في بيانات (مدمجة) بتمريرة واحدة.
+
+    sources: قائمة (اسم الملف, عدد الصفوف) بترتيب الصفوف في البيانات المدمجة.
+    """
+    detector = DuplicateDetector(max_fingerprints=max_fingerprints)
+    if not sources:
+        sources = [('data', len(df))]
+
+    start = 0
+    for name, rows in sources:
+        detector.add(df.iloc[start:start + rows], name, columns)
+        start += rows
+    if start < len(df):
+        detector.add(df.iloc[start:], 'data', columns)
+    return detector.report()
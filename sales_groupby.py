@@ -0,0 +1,133 @@
+"""
+محرك التجميع - مجاميع كل الأبعاد المعيّنة بتمريرة np.bincount واحدة على رموز كل بعد
+"""
+
+import numpy as np
+import pandas as pd
+
+from sales_streaming import GROUP_FIELDS
+
+# المقاييس المجمّعة لكل بعد: اسم المقياس ← الحقل الرقمي
+GROUP_MEASURES = {
+    'sales': 'total_amount',
+    'quantity': 'quantity',
+    'discount': 'discount',
+}
+
+# الأبعاد المجمّعة في البيانات المُجهّزة: أبعاد التوزيعات ومعها العملاء للوحات الصدارة
+AGGREGATE_FIELDS = GROUP_FIELDS + ('customer_id',)
+
+# أبعاد لوحات الصدارة (الأعلى والأدنى) وعدد القيم في كل طرف
+LEADERBOARD_FIELDS = ('product_name', 'salesperson', 'region', 'customer_id', 'city')
+LEADERBOARD_SIZE = 10
+
+
+def select_top(values, k, largest=True):
+    """
+    مواضع أكبر (أو أصغر) k قيمة مرتبة - اختيار جزئي بـ np.partition ثم ترتيب المرشحين فقط بدل ترتيب الكل.
+    كل القيم المساوية للحد تدخل المرشحين فيُحسم التعادل بالموضع (الأول أولاً) كما في الترتيب المستقر،
+    والقيم المفقودة (NaN) في النهاية كما في sort_values.
+    """
+    values = np.asarray(values)
+    k = min(k, len(values))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    keys = -values if largest else values
+    if k < len(keys):
+        threshold = np.partition(keys, k - 1)[k - 1]
+        # الحد NaN: كل القيم الموجودة تدخل ومعها بعض المفقودة (ولا يطابق <= أي قيمة)
+        candidates = np.arange(len(keys)) if np.isnan(threshold) else np.flatnonzero(keys <= threshold)
+    else:
+        candidates = np.arange(len(keys))
+    return candidates[np.lexsort((candidates, keys[candidates]))[:k]]
+
+
+class GroupAggregates:
+    """
+    جدول لكل بعد (المنطقة، الفئة، المنتج...) فيه عدد الصفوف ومجاميع المقاييس لكل قيمة.
+
+    يُبنى مرة واحدة من البيانات المُجهّزة ويقرأ منه المحلل والرؤى والرسوم.
+    """
+
+    def __init__(self, tables):
+        self.tables = tables
+
+    def __contains__(self, field):
+        return field in self.tables
+
+    def table(self, field):
+        """جدول البعد: الفهرس قيم البعد والأعمدة rows ثم المقاييس المتاحة"""
+        return self.tables[field]
+
+    def top(self, field, measure='rows', n=None):
+        """قيم البعد مرتبة تنازلياً حسب المقياس (أعلى n فقط باختيار جزئي إذا مُرّر n)"""
+        column = self.tables[field][measure]
+        if n is None:
+            return column.sort_values(ascending=False, kind='stable')
+        return column.iloc[select_top(column.to_numpy(), n)]
+
+    def bottom(self, field, measure='rows', n=10):
+        """أدنى n قيمة للبعد مرتبة تصاعدياً حسب المقياس"""
+        column = self.tables[field][measure]
+        return column.iloc[select_top(column.to_numpy(), n, largest=False)]
+
+    def leaderboards(self, k=LEADERBOARD_SIZE, fields=LEADERBOARD_FIELDS):
+        """
+        الأعلى والأدنى k لكل بعد متاح حسب المبيعات (أو عدد الصفوف بدون مبالغ):
+        {البعد: {'measure', 'top', 'bottom'}} والطرفان جداول البعد بكل مقاييسه
+        """
+        boards = {}
+        for field in fields:
+            if field not in self.tables:
+                continue
+            table = self.tables[field]
+            measure = 'sales' if 'sales' in table else 'rows'
+            values = table[measure].to_numpy()
+            boards[field] = {
+                'measure': measure,
+                'top': table.iloc[select_top(values, k)],
+                'bottom': table.iloc[select_top(values, k, largest=False)],
+            }
+        return boards
+
+
+def _measure_arrays(prepared):
+    """مصفوفات المقاييس مرة واحدة (القيم المفقودة صفر كما في groupby.sum)"""
+    measures = {}
+    for name, field in GROUP_MEASURES.items():
+        if prepared.has(field):
+            values = prepared.numeric(field)
+            array = values.to_numpy(dtype=np.float64, na_value=np.nan)
+            if np.isnan(array).any():
+                array = np.nan_to_num(array)
+            measures[name] = (array, pd.api.types.is_integer_dtype(values))
+    return measures
+
+
+def build_group_aggregates(prepared, dimensions=AGGREGATE_FIELDS):
+    """تجميع كل الأبعاد المعيّنة: لكل بعد bincount على رموزه لكل مقياس"""
+    measures = _measure_arrays(prepared)
+    tables = {}
+
+    for field in dimensions:
+        if not prepared.has(field):
+            continue
+
+        codes, uniques = prepared.codes(field)
+        valid = codes >= 0
+        if valid.all():
+            keys, rows = codes, slice(None)
+        else:
+            keys, rows = codes[valid], valid
+        size = len(uniques)
+
+        table = {'rows': np.bincount(keys, minlength=size)}
+        for name, (values, integer) in measures.items():
+            sums = np.bincount(keys, weights=values[rows], minlength=size)
+            table[name] = sums.round().astype(np.int64) if integer else sums
+
+        frame = pd.DataFrame(table, index=pd.Index(uniques, name=prepared.mapping[field]))
+        # قيم لا تظهر في الصفوف (بيانات مقتطعة أو فئات غير مستخدمة) لا تدخل في التوزيعات
+        tables[field] = frame if frame['rows'].all() else frame[frame['rows'] > 0]
+
+    return GroupAggregates(tables)
@@ -0,0 +1,128 @@
+"""
+محرك النمو - مبيعات يومية كثيفة بمجاميع تراكمية (prefix sums) لحساب نمو الفترات
+والنوافذ المتحركة بعمليات على المصفوفات بدل تجميع متكرر
+"""
+
+import numpy as np
+import pandas as pd
+
+# النوافذ المتحركة بالأيام (المجموع الأخير مقابل النافذة السابقة بنفس الطول)
+GROWTH_WINDOWS = (7, 30, 90, 365)
+
+# نمو الفترات: (عدد الأشهر في الفترة, الإزاحة بالفترات) - آخر فترة كاملة مقابل الفترة المزاحة
+GROWTH_PERIODS = {
+    'mom': (1, 1),
+    'qoq': (3, 1),
+    'yoy': (1, 12),
+}
+
+# الأبعاد التي يُحسب لها النمو لكل قيمة
+GROWTH_GROUP_FIELDS = ('region', 'salesperson')
+
+# أقصى عدد خلايا (قيم × أيام) للمصفوفة المجمّعة - بعده لا يُحسب النمو لكل قيمة
+GROWTH_MAX_CELLS = 20_000_000
+
+
+def growth_rate(current, previous):
+    """نسبة النمو % (NaN إذا كانت الفترة السابقة صفراً أو سالبة)"""
+    current = np.asarray(current, dtype=np.float64)
+    previous = np.asarray(previous, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(previous > 0, (current - previous) / previous * 100, np.nan)
+
+
+class DailySales:
+    """
+    مبيعات كل يوم من أول تاريخ إلى آخره (الأيام بلا مبيعات صفر) كمجاميع تراكمية:
+    prefix[g, d] = مبيعات المجموعة g قبل اليوم d، فمجموع أي نطاق طرحٌ واحد.
+
+    بدون تجميع يكون صف واحد للكل، ومع بعد (منطقة، مندوب) صف لكل قيمة.
+    """
+
+    def __init__(self, first_day, prefix, groups=None):
+        self.first_day = first_day
+        self.prefix = prefix
+        self.groups = groups
+
+    @property
+    def days(self):
+        return self.prefix.shape[1] - 1
+
+    @property
+    def last_day(self):
+        return self.first_day + self.days - 1
+
+    def _offset(self, day):
+        """موضع يوم (رقم يوم منذ 1970) في المصفوفة محصوراً في النطاق"""
+        return min(max(int(day) - self.first_day, 0), self.days)
+
+    def total(self, date_from=None, date_to=None):
+        """مجموع المبيعات في [من, إلى] شاملاً لكل صف - طرح واحد من المجاميع التراكمية"""
+        start = 0 if date_from is None else self._offset(np.datetime64(date_from, 'D').astype(np.int64))
+        end = self.days if date_to is None else self._offset(np.datetime64(date_to, 'D').astype(np.int64) + 1)
+        return self.prefix[:, max(start, end)] - self.prefix[:, start]
+
+    def trailing(self, days):
+        """آخر days يوماً حتى آخر تاريخ مقابل الأيام التي قبلها (السابقة None إذا لم تغطها البيانات)"""
+        end = self.days
+        current = self.prefix[:, end] - self.prefix[:, max(end - days, 0)]
+        if end < 2 * days:
+            return current, None
+        return current, self.prefix[:, end - days] - self.prefix[:, end - 2 * days]
+
+    def calendar_totals(self, months):
+        """
+        مجاميع الفترات التقويمية (شهر، ربع، سنة حسب months) من حدودها في المصفوفة:
+        (أول شهر في كل فترة, المجاميع [صفوف × فترات], هل الفترة كاملة ضمن البيانات)
+        """
+        first_month = np.datetime64(self.first_day, 'D').astype('datetime64[M]').astype(np.int64)
+        last_month = np.datetime64(self.last_day, 'D').astype('datetime64[M]').astype(np.int64)
+        # حدود كل الفترات حتى الفترة التي تحتوي آخر شهر مع الحد الذي يغلقها
+        starts = np.arange(first_month - first_month % months, last_month + months + 1, months)
+        bounds = starts.astype('datetime64[M]').astype('datetime64[D]').astype(np.int64)
+        offsets = np.clip(bounds - self.first_day, 0, self.days)
+        totals = self.prefix[:, offsets[1:]] - self.prefix[:, offsets[:-1]]
+        complete = (bounds[:-1] >= self.first_day) & (bounds[1:] <= self.last_day + 1)
+        return starts[:-1], totals, complete
+
+    def period_growth(self, months, shift=1):
+        """آخر فترة كاملة مقابل الفترة المزاحة عنها: (تسمية الحالية, تسمية السابقة, الحالية, السابقة) أو None"""
+        starts, totals, complete = self.calendar_totals(months)
+        full = np.flatnonzero(complete)
+        if not len(full) or full[-1] < shift or not complete[full[-1] - shift]:
+            return None
+        current, previous = full[-1], full[-1] - shift
+        freq = 'M' if months == 1 else ('Q' if months == 3 else 'Y')
+        label = lambda i: str(pd.Period(np.datetime64(int(starts[i]), 'M'), freq=freq))
+        return label(current), label(previous), totals[:, current], totals[:, previous]
+
+
+def build_daily_sales(prepared, field=None):
+    """بناء المبيعات اليومية بتمريرة np.bincount واحدة (لكل قيمة من الحقل إذا مُرّر)"""
+    if not (prepared.has('order_date') and prepared.has('total_amount')):
+        return None
+
+    days = prepared.dates('order_date').to_numpy().astype('datetime64[D]')
+    amounts = prepared.numeric('total_amount').to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = ~np.isnat(days) & ~np.isnan(amounts)
+    codes, groups = None, None
+    if field is not None:
+        codes, groups = prepared.codes(field)
+        valid &= codes >= 0
+    if not valid.any():
+        return None
+
+    day_numbers = days[valid].astype(np.int64)
+    first_day = int(day_numbers.min())
+    span = int(day_numbers.max()) - first_day + 1
+    rows = 1 if field is None else len(groups)
+    if rows * span > GROWTH_MAX_CELLS:
+        return None
+    cells = day_numbers - first_day
+    if field is not None:
+        cells = codes[valid].astype(np.int64) * span + cells
+
+    daily = np.bincount(cells, weights=amounts[valid], minlength=rows * span).reshape(rows, span)
+    prefix = np.zeros((rows, span + 1))
+    np.cumsum(daily, axis=1, out=prefix[:, 1:])
+    return DailySales(first_day, prefix, groups)
@@ -0,0 +1,66 @@
+"""
+وحدة الإلحاق التدريجي - إضافة ملف جديد إلى بيانات مدمجة سابقة وتحديث مجاميعها دون إعادة التحليل من البداية
+"""
+
+from sales_projection import build_analysis_frame
+from sales_schema import align_and_merge, append_aligned, rename_to_schema
+from sales_streaming import SalesKPIAccumulator
+
+
+class IncrementalSalesDataset:
+    """
+    بيانات مدمجة تنمو ملفاً بعد ملف مع مجمّع تراكمي للمؤشرات.
+
+    كل ملف تُواءم أسماء أعمدته مع أعمدة التعيين ثم يُسقط عليها، والمجمّع يُغذّى بصفوف
+    الملف الجديد فقط، فتبقى كلفة الإلحاق بحجم البيانات الجديدة. البيانات المدمجة كاملة
+    تُبنى عند طلبها فقط (dataframe): الملفات المُلحقة بعد آخر طلب تُواءم وحدها ثم تُضاف إلى الدمج السابق.
+    """
+
+    def __init__(self, column_mapping, distinct_mode='auto'):
+        self.mapping = dict(column_mapping)
+        self.accumulator = SalesKPIAccumulator(self.mapping, distinct_mode)
+        self.member_keys = []
+        self.member_names = []
+        self.member_rows = []
+        self._merged = None
+        self._pending = []
+        # إحصائيات التحويل لكل حقل مجمّعة عبر الملفات المُلحقة
+        self.coercion = {}
+
+    def __contains__(self, key):
+        return key in self.member_keys
+
+    def __len__(self):
+        return sum(self.member_rows)
+
+    @property
+    def dataframe(self):
+        """البيانات المدمجة (None قبل أول ملف) - الملفات المُلحقة منذ آخر طلب تُدمج الآن"""
+        if self._pending:
+            new = self._pending[0] if len(self._pending) == 1 else align_and_merge(self._pending)[0]
+            self._merged = new if self._merged is None else append_aligned(self._merged, new)
+            self._pending = []
+        return self._merged
+
+    def append(self, df, key, name=None):
+        """إلحاق ملف جديد - يعيد False إذا كان الملف مُلحقاً من قبل"""
+        if key in self.member_keys:
+            return False
+
+        # الملف الجديد وحده: صيغ أسماء الأعمدة المختلفة تأخذ أسماء التعيين قبل الإسقاط
+        stats = {}
+        new_rows = build_analysis_frame(rename_to_schema(df, list(self.mapping.values())), self.mapping, stats)
+        for field, entry in stats.items():
+            if field in self.coercion:
+                total = self.coercion[field]
+                for count in ('rows', 'missing', 'failed'):
+                    total[count] += entry[count]
+            else:
+                self.coercion[field] = entry
+
+        self._pending.append(new_rows)
+        self.accumulator.update(new_rows)
+        self.member_keys.append(key)
+        self.member_names.append(name or key)
+        self.member_rows.append(len(new_rows))
+        return True
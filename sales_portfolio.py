@@ -0,0 +1,155 @@
+"""
+محفظة المنتجات ABC/Pareto - مساهمة كل منتج في الإيرادات والربح بترتيب واحد ومجموع تراكمي
+"""
+
+import numpy as np
+import pandas as pd
+
+# حدود الفئات حسب الحصة التراكمية من الإيرادات (%): A حتى 80، B حتى 95، والباقي C
+ABC_THRESHOLDS = (('A', 80.0), ('B', 95.0))
+ABC_CLASSES = ('A', 'B', 'C')
+
+# عدد نقاط منحنى باريتو المعروض (بدل نقطة لكل منتج)
+PARETO_POINTS = 101
+
+
+def _owner_values(prepared, field, product_codes, rows, size):
+    """قيمة الحقل لكل منتج (من آخر صف له) بكتابة واحدة بدل حلقة على المنتجات"""
+    codes, uniques = prepared.codes(field)
+    owner = np.full(size, -1, dtype=np.int64)
+    owner[product_codes] = codes[rows]
+    return pd.Series(uniques).reindex(owner).to_numpy()
+
+
+def build_portfolio_table(prepared):
+    """
+    جدول المنتجات مرتباً تنازلياً حسب الإيرادات: الإيرادات والتكلفة والربح والكمية وعدد المعاملات،
+    والحصة التراكمية وفئة ABC وعلامة long_tail_loss (منتج من الفئة C بربح سالب).
+    المفتاح product_id إن وُجد وإلا product_name - None إذا لم يتوفر المنتج والمبلغ.
+    """
+    key = 'product_id' if prepared.has('product_id') else 'product_name'
+    if not (prepared.has(key) and prepared.has('total_amount')):
+        return None
+
+    codes, products = prepared.codes(key)
+    valid = codes >= 0
+    if not valid.any():
+        return None
+    codes = codes[valid].astype(np.int64)
+    size = len(products)
+
+    def measure(field):
+        return np.nan_to_num(prepared.numeric(field).to_numpy(dtype=np.float64, na_value=np.nan)[valid])
+
+    amounts = measure('total_amount')
+    columns = {
+        'transactions': np.bincount(codes, minlength=size),
+        'revenue': np.bincount(codes, weights=amounts, minlength=size),
+    }
+    if prepared.has('quantity'):
+        quantities = measure('quantity')
+        columns['quantity'] = np.bincount(codes, weights=quantities, minlength=size)
+    if prepared.has('cost'):
+        # نفس تعريف تكلفة البضاعة في المؤشرات: التكلفة × الكمية إن وُجدت
+        costs = measure('cost')
+        cogs = costs * quantities if prepared.has('quantity') else costs
+        columns['cogs'] = np.bincount(codes, weights=cogs, minlength=size)
+        columns['margin'] = columns['revenue'] - columns['cogs']
+    for field in ('product_name', 'category'):
+        if field != key and prepared.has(field):
+            columns[field] = _owner_values(prepared, field, codes, valid, size)
+
+    table = pd.DataFrame(columns, index=pd.Index(products, name=prepared.mapping[key]))
+    table = table[table['transactions'] > 0]
+
+    # ترتيب واحد تنازلي حسب الإيرادات ثم مجاميع تراكمية
+    order = np.argsort(-table['revenue'].to_numpy(), kind='stable')
+    table = table.iloc[order]
+    revenue = table['revenue'].to_numpy()
+    total_revenue = revenue.sum()
+    cumulative = np.cumsum(revenue)
+    if total_revenue > 0:
+        table['revenue_share'] = revenue / total_revenue * 100
+        table['cumulative_share'] = cumulative / total_revenue * 100
+    else:
+        table['revenue_share'] = 0.0
+        table['cumulative_share'] = 0.0
+
+    # المنتج الذي يعبر الحد يبقى في الفئة الأعلى (الحصة قبله أقل من الحد)
+    before = table['cumulative_share'].to_numpy() - table['revenue_share'].to_numpy()
+    classes = np.full(len(table), len(ABC_CLASSES) - 1, dtype=np.int8)
+    for position, (_, threshold) in reversed(list(enumerate(ABC_THRESHOLDS))):
+        classes[before < threshold] = position
+    table['abc'] = pd.Categorical.from_codes(classes, categories=ABC_CLASSES)
+
+    if 'margin' in table:
+        margin = table['margin'].to_numpy()
+        total_margin = margin.sum()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            table['margin_rate'] = np.where(revenue != 0, margin / revenue * 100, np.nan)
+        table['margin_share'] = margin / total_margin * 100 if total_margin > 0 else np.nan
+        table['cumulative_margin_share'] = np.cumsum(margin) / total_margin * 100 if total_margin > 0 else np.nan
+        table['long_tail_loss'] = (classes == len(ABC_CLASSES) - 1) & (margin < 0)
+
+    table.attrs['key'] = key
+    return table
+
+
+def _records(frame, columns):
+    return [
+        {'product': product, **{column: row[column] for column in columns if column in frame}}
+        for product, row in frame.iterrows()
+    ]
+
+
+def summarize_portfolio(table, top=10):
+    """ملخص المحفظة: الفئات (عدد وحصة وإيرادات وربح)، أعلى المنتجات، الذيل الخاسر، ومنحنى باريتو مختصر"""
+    products = len(table)
+    total_revenue = table['revenue'].sum()
+    has_margin = 'margin' in table
+    total_margin = table['margin'].sum() if has_margin else None
+
+    aggregations = {'products': ('revenue', 'size'), 'revenue': ('revenue', 'sum')}
+    if has_margin:
+        aggregations['margin'] = ('margin', 'sum')
+    grouped = table.groupby('abc', observed=False).agg(**aggregations)
+
+    classes = []
+    for name, row in grouped.iterrows():
+        entry = {
+            'class': name,
+            'products': int(row['products']),
+            'product_share': float(row['products'] / products * 100),
+            'revenue': float(row['revenue']),
+            'revenue_share': float(row['revenue'] / total_revenue * 100) if total_revenue > 0 else 0.0,
+        }
+        if has_margin:
+            entry['margin'] = float(row['margin'])
+            entry['margin_share'] = float(row['margin'] / total_margin * 100) if total_margin > 0 else None
+        classes.append(entry)
+
+    columns = ['product_name', 'category', 'revenue', 'revenue_share', 'cumulative_share', 'margin', 'margin_rate', 'abc']
+    summary = {
+        'key': table.attrs.get('key'),
+        'products': products,
+        'classes': classes,
+        'top_products': _records(table.head(top), columns),
+    }
+
+    if has_margin:
+        tail = table[table['long_tail_loss']]
+        summary['long_tail_loss'] = {
+            'products': len(tail),
+            'revenue': float(tail['revenue'].sum()),
+            'margin': float(tail['margin'].sum()),
+            'worst': _records(tail.nsmallest(top, 'margin'), columns),
+        }
+
+    # منحنى باريتو: حصة الإيرادات التراكمية عند كل نسبة من المنتجات
+    positions = np.unique(np.linspace(0, products - 1, min(PARETO_POINTS, products)).round().astype(np.int64))
+    cumulative = table['cumulative_share'].to_numpy()
+    summary['pareto'] = [
+        {'product_share': float((position + 1) / products * 100), 'revenue_share': float(cumulative[position])}
+        for position in positions
+    ]
+    return summary
@@ -0,0 +1,312 @@
+"""
+طبقة البيانات المُجهّزة - تحويل كل حقل معيّن إلى نوعه مرة واحدة (أرقام، تواريخ، رموز للمفاتيح الفئوية)
+"""
+
+import numpy as np
+import pandas as pd
+
+from sales_projection import NUMERIC_FIELDS, DATE_FIELDS, coercion_entry, to_dates
+from sales_groupby import build_group_aggregates
+from sales_cube import build_sales_cube
+from sales_growth import build_daily_sales
+from sales_rfm import build_rfm_table
+from sales_portfolio import build_portfolio_table
+from sales_sketches import HyperLogLog, HLL_PRECISION, QuantileSketch, hash_values
+
+# الحقول المتاحة في لوحة المرشحات (إلى جانب نطاق التاريخ)
+FILTER_FIELDS = ('region', 'city', 'category', 'salesperson', 'status')
+
+
+class PreparedSalesDataset:
+    """
+    البيانات المعيّنة بأنواعها النهائية، يُحوَّل كل حقل عند أول طلب ثم يُعاد استخدامه.
+
+    تحفظ لكل حقل إحصائيات التحويل (القيم التي تعذر تحويلها) حتى لا يعاد حسابها في فحص الجودة.
+    إذا حُوّلت الحقول أثناء الإسقاط (build_analysis_frame) تُمرَّر إحصائياته في stats
+    لأن القيم الفاشلة تظهر بعده كقيم مفقودة فقط.
+    """
+
+    def __init__(self, df, column_mapping, stats=None):
+        self.df = df
+        self.mapping = column_mapping
+        self._numeric = {}
+        self._dates = {}
+        self._codes = {}
+        self._aggregates = None
+        self._cubes = {}
+        self._row_indexes = {}
+        self._date_index = None
+        self._unique_hashes = {}
+        self._sketches = {}
+        self._quantiles = {}
+        self._daily = {}
+        self._rfm = None
+        self._portfolio = None
+        # البيانات الأصل وأرقام الصفوف عند الاقتطاع (subset)
+        self._parent = None
+        self._rows = None
+        self.stats = dict(stats or {})
+
+    def __len__(self):
+        return len(self.df)
+
+    @property
+    def rows(self):
+        """أرقام الصفوف في البيانات الأصل (None إذا لم تكن البيانات مقتطعة)"""
+        return self._rows
+
+    def has(self, field):
+        """هل الحقل معيّن وموجود في البيانات"""
+        return self.mapping.get(field) in self.df.columns
+
+    def column(self, field):
+        """العمود الأصلي للحقل"""
+        return self.df[self.mapping[field]]
+
+    def _record(self, field, kind, raw, converted):
+        if field not in self.stats:
+            self.stats[field] = coercion_entry(self.mapping[field], kind, raw, converted)
+
+    def numeric(self, field):
+        """الحقل كأرقام (القيم غير الرقمية تصبح NaN)"""
+        if field not in self._numeric and self._parent is not None:
+            self._numeric[field] = self._parent.numeric(field).iloc[self._rows]
+        if field not in self._numeric:
+            raw = self.column(field)
+            values = raw if pd.api.types.is_numeric_dtype(raw) else pd.to_numeric(raw, errors='coerce')
+            self._record(field, 'numeric', raw, values)
+            self._numeric[field] = values
+        return self._numeric[field]
+
+    def dates(self, field):
+        """الحقل كتواريخ (القيم غير الصالحة تصبح NaT)"""
+        if field not in self._dates and self._parent is not None:
+            self._dates[field] = self._parent.dates(field).iloc[self._rows]
+        if field not in self._dates:
+            raw = self.column(field)
+            values = to_dates(raw)
+            self._record(field, 'datetime', raw, values)
+            self._dates[field] = values
+        return self._dates[field]
+
+    def codes(self, field):
+        """رموز صحيحة للمفتاح الفئوي مع قيمه الفريدة - (codes, uniques) والقيم المفقودة رمزها -1"""
+        if field not in self._codes and self._parent is not None:
+            # نفس قيم الأصل الفريدة (قد لا تظهر كلها في الصفوف المختارة)
+            codes, uniques = self._parent.codes(field)
+            self._codes[field] = (codes[self._rows], uniques)
+        if field not in self._codes:
+            raw = self.column(field)
+            if isinstance(raw.dtype, pd.CategoricalDtype):
+                # الفئات مرمّزة أصلاً: رموز category نفسها (int8 غالباً) دون نسخ،
+                # ونستبعد الفئات غير المستخدمة فقط (بدون ترتيب كما في remove_unused_categories)
+                codes, uniques = raw.cat.codes.to_numpy(), raw.cat.categories
+                used = np.bincount(codes[codes >= 0], minlength=len(uniques)) > 0
+                if not used.all():
+                    remap = np.full(len(uniques), -1, dtype=codes.dtype)
+                    remap[used] = np.arange(used.sum())
+                    codes = np.where(codes >= 0, remap[codes], -1).astype(codes.dtype)
+                    uniques = uniques[used]
+            else:
+                codes, uniques = pd.factorize(raw)
+                codes = codes.astype(np.int32)
+            self._codes[field] = (codes, uniques)
+        return self._codes[field]
+
+    def distinct_count(self, field):
+        """عدد القيم الفريدة (بدون المفقودة) الظاهرة في الصفوف من الرموز المحسوبة"""
+        codes, uniques = self.codes(field)
+        if self._parent is None:
+            return len(uniques)
+        return int(np.count_nonzero(np.bincount(codes[codes >= 0], minlength=len(uniques))))
+
+    def unique_hashes(self, field):
+        """بصمات 64 بت لقيم الحقل الفريدة (بترتيب uniques) - تُحسب مرة واحدة وتشاركها البيانات المقتطعة"""
+        if self._parent is not None:
+            return self._parent.unique_hashes(field)
+        if field not in self._unique_hashes:
+            self._unique_hashes[field] = hash_values(pd.Series(self.codes(field)[1]))
+        return self._unique_hashes[field]
+
+    def distinct_sketch(self, field, precision=HLL_PRECISION):
+        """
+        ملخص HyperLogLog للقيم الظاهرة في الصفوف - من بصمات القيم الفريدة لا من كل الصفوف،
+        فملخص أي مرشح يُبنى باختيار بصمات قيمه، وملخصات الملفات تُدمج بـ merge.
+        """
+        if (field, precision) not in self._sketches:
+            hashes = self.unique_hashes(field)
+            if self._parent is not None:
+                codes = self.codes(field)[0]
+                hashes = hashes[np.bincount(codes[codes >= 0], minlength=len(hashes)) > 0]
+            self._sketches[(field, precision)] = HyperLogLog(precision).update_hashes(hashes)
+        return self._sketches[(field, precision)]
+
+    def quantile_sketch(self, field=None):
+        """ملخص مئينات قيمة المعاملة (QuantileSketch) - لكل قيمة من الحقل إذا مُرّر، ويُبنى مرة واحدة"""
+        if field not in self._quantiles:
+            values = self.numeric('total_amount').to_numpy(dtype=np.float64, na_value=np.nan)
+            if field is None:
+                self._quantiles[field] = QuantileSketch.from_values(values)
+            else:
+                codes, uniques = self.codes(field)
+                self._quantiles[field] = QuantileSketch.from_values(values, codes, uniques)
+        return self._quantiles[field]
+
+    def row_index(self, field):
+        """
+        فهرس الصفوف لكل قيمة (إزاحات مرتبة): (offsets, bounds) وصفوف القيمة i
+        هي offsets[bounds[i]:bounds[i + 1]] بترتيب تصاعدي. يُبنى مرة واحدة لكل حقل.
+        """
+        if field not in self._row_indexes:
+            codes, uniques = self.codes(field)
+            offsets = np.argsort(codes, kind='stable').astype(np.int64)
+            bounds = np.searchsorted(codes[offsets], np.arange(len(uniques) + 1))
+            self._row_indexes[field] = (offsets, bounds)
+        return self._row_indexes[field]
+
+    def rows_for_values(self, field, values):
+        """أرقام الصفوف (مرتبة) التي قيمة الحقل فيها إحدى القيم المختارة"""
+        offsets, bounds = self.row_index(field)
+        positions = self.codes(field)[1].get_indexer(list(values))
+        parts = [offsets[bounds[i]:bounds[i + 1]] for i in positions if i >= 0]
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        return parts[0] if len(parts) == 1 else np.sort(np.concatenate(parts), kind='stable')
+
+    def date_index(self):
+        """فهرس التاريخ: (أرقام الصفوف مرتبة حسب التاريخ, التواريخ المرتبة, تاريخ كل صف) بدون التواريخ المفقودة"""
+        if self._date_index is None:
+            values = self.dates('order_date').to_numpy(dtype='datetime64[ns]')
+            valid = np.flatnonzero(~np.isnat(values))
+            order = valid[np.argsort(values[valid], kind='stable')]
+            self._date_index = (order, values[order], values)
+        return self._date_index
+
+    def date_bounds(self):
+        """أول وآخر تاريخ طلب (None إذا لا توجد تواريخ)"""
+        if not self.has('order_date'):
+            return None, None
+        sorted_dates = self.date_index()[1]
+        if not len(sorted_dates):
+            return None, None
+        return pd.Timestamp(sorted_dates[0]), pd.Timestamp(sorted_dates[-1])
+
+    @staticmethod
+    def _date_limits(date_from=None, date_to=None):
+        """حدود النطاق [من, إلى + يوم) كـ datetime64[ns] - None للطرف المفتوح"""
+        low = None if date_from is None else np.datetime64(pd.Timestamp(date_from), 'ns')
+        high = None if date_to is None else np.datetime64(pd.Timestamp(date_to).normalize() + pd.Timedelta(days=1), 'ns')
+        return low, high
+
+    def _date_slice(self, date_from=None, date_to=None):
+        """موضع النطاق في فهرس التاريخ المرتب"""
+        order, sorted_dates, _ = self.date_index()
+        low, high = self._date_limits(date_from, date_to)
+        start = 0 if low is None else np.searchsorted(sorted_dates, low, 'left')
+        end = len(order) if high is None else np.searchsorted(sorted_dates, high, 'left')
+        return start, max(start, end)
+
+    def rows_for_dates(self, date_from=None, date_to=None):
+        """أرقام الصفوف (مرتبة) التي يقع تاريخ الطلب فيها ضمن النطاق (يشمل يوم النهاية)"""
+        start, end = self._date_slice(date_from, date_to)
+        return np.sort(self.date_index()[0][start:end])
+
+    @staticmethod
+    def _intersect_sorted(small, large):
+        """تقاطع مصفوفتين مرتبتين بلا تكرار: بحث ثنائي لكل عنصر من الصغرى في الكبرى"""
+        if not len(small) or not len(large):
+            return small[:0]
+        positions = np.minimum(np.searchsorted(large, small), len(large) - 1)
+        return small[large[positions] == small]
+
+    def select_rows(self, date_from=None, date_to=None, filters=None):
+        """
+        تقاطع فهارس المرشحات - filters: {الحقل: قائمة القيم}.
+        يعيد أرقام الصفوف مرتبة، أو None إذا لم يكن هناك أي مرشح فعّال (كل الصفوف).
+        """
+        selections = [
+            self.rows_for_values(field, values)
+            for field, values in (filters or {}).items()
+            if values and self.has(field)
+        ]
+        by_date = (date_from is not None or date_to is not None) and self.has('order_date')
+        if not selections and not by_date:
+            return None
+
+        # البدء بأصغر مجموعة يجعل كل تقاطع بحجمها على الأكثر
+        selections.sort(key=len)
+        if by_date:
+            start, end = self._date_slice(date_from, date_to)
+            if not selections or end - start <= len(selections[0]):
+                selections.insert(0, self.rows_for_dates(date_from, date_to))
+                by_date = False
+
+        rows = selections[0]
+        for other in selections[1:]:
+            rows = self._intersect_sorted(rows, other)
+
+        if by_date:
+            # نطاق التاريخ أوسع من باقي المرشحات: فحص تاريخ الصفوف المرشحة فقط بدل ترتيب النطاق
+            low, high = self._date_limits(date_from, date_to)
+            dates = self.date_index()[2][rows]
+            keep = ~np.isnat(dates)
+            if low is not None:
+                keep &= dates >= low
+            if high is not None:
+                keep &= dates < high
+            rows = rows[keep]
+        return rows
+
+    def subset(self, rows):
+        """البيانات المُجهّزة لصفوف مختارة - الحقول المحوّلة تُقتطع من هذه البيانات دون إعادة تحويل"""
+        child = PreparedSalesDataset(self.df.iloc[rows], self.mapping)
+        child._parent = self
+        child._rows = rows
+        return child
+
+    def aggregates(self):
+        """مجاميع كل الأبعاد المعيّنة (GroupAggregates) - تُحسب مرة واحدة ويشاركها المحلل والرسوم"""
+        if self._aggregates is None:
+            self._aggregates = build_group_aggregates(self)
+        return self._aggregates
+
+    def cube(self, granularity='month'):
+        """مكعب المبيعات (SalesCube) بدقة شهر أو يوم - يُبنى مرة واحدة لكل دقة"""
+        if granularity not in self._cubes:
+            self._cubes[granularity] = build_sales_cube(self, granularity)
+        return self._cubes[granularity]
+
+    def daily_sales(self, field=None):
+        """المبيعات اليومية بمجاميع تراكمية (DailySales) للكل أو لكل قيمة من الحقل - None بدون تواريخ ومبالغ"""
+        if field not in self._daily:
+            self._daily[field] = build_daily_sales(self, field)
+        return self._daily[field]
+
+    def rfm(self):
+        """جدول RFM للعملاء (درجات وشريحة لكل عميل) - يُبنى مرة واحدة، None بدون العميل والتاريخ والمبلغ"""
+        if self._rfm is None:
+            self._rfm = build_rfm_table(self)
+        return self._rfm
+
+    def portfolio(self):
+        """جدول محفظة المنتجات (إيرادات وربح وفئة ABC لكل منتج) - يُبنى مرة واحدة، None بدون المنتج والمبلغ"""
+        if self._portfolio is None:
+            self._portfolio = build_portfolio_table(self)
+        return self._portfolio
+
+    def prepare_all(self, keys=True):
+        """تحويل كل الحقول المعيّنة دفعة واحدة (keys=False: الأرقام والتواريخ فقط)"""
+        for field in self.mapping:
+            if not self.has(field):
+                continue
+            if field in NUMERIC_FIELDS:
+                self.numeric(field)
+            elif field in DATE_FIELDS:
+                self.dates(field)
+            elif keys:
+                self.codes(field)
+        return self
+
+    def coercion_stats(self):
+        """إحصائيات تحويل الحقول الرقمية والتواريخ المحوّلة حتى الآن"""
+        return dict(self.stats)
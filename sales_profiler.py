@@ -0,0 +1,163 @@
+"""
+ملف تعريف الأعمدة لفحص الجودة - لكل عمود بتمريرة واحدة: المفقود، القيم الفريدة، أصغر وأكبر قيمة،
+السالب والصفر، ما تعذر تحويله والقيم الشاذة، مع عيّنة عشوائية عند تحديد مهلة زمنية
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from sales_projection import NUMERIC_FIELDS, DATE_FIELDS, to_dates
+
+# حدود القيم الشاذة (Tukey): خارج [Q1 - k×IQR, Q3 + k×IQR]
+PROFILE_OUTLIER_IQR = 1.5
+
+# نسبة القيم الشاذة في حقل رقمي التي يظهر بعدها تحذير في فحص الجودة
+PROFILE_OUTLIER_WARN_RATIO = 0.05
+
+# المهلة الافتراضية لفحص الجودة في الواجهة (ثوانٍ) - البيانات الأكبر تُفحص من عيّنة
+PROFILE_TIME_BUDGET = 1.0
+
+# صفوف العيّنة الأولية التي يُقدّر منها زمن الصف الواحد
+PROFILE_PILOT_ROWS = 20_000
+
+
+def _column_kind(field, series):
+    """نوع العمود المتوقع: من الحقل المعيّن أولاً ثم من نوع البيانات"""
+    if field in NUMERIC_FIELDS:
+        return 'numeric'
+    if field in DATE_FIELDS:
+        return 'datetime'
+    if pd.api.types.is_bool_dtype(series):
+        return 'text'
+    if pd.api.types.is_numeric_dtype(series):
+        return 'numeric'
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return 'datetime'
+    return 'text'
+
+
+def _converted(prepared, field, kind, raw, rows):
+    """قيم العمود بعد التحويل - كاملة من البيانات المُجهّزة (تُحفظ وتشاركها بقية التحليل) أو للعيّنة فقط"""
+    if rows is None and field is not None:
+        return prepared.numeric(field) if kind == 'numeric' else prepared.dates(field)
+    if kind == 'numeric':
+        return raw if pd.api.types.is_numeric_dtype(raw) else pd.to_numeric(raw, errors='coerce')
+    return to_dates(raw)
+
+
+def _profile_column(prepared, column, field, rows):
+    """إحصائيات عمود واحد على كل الصفوف أو على صفوف العيّنة (الأعداد غير مقيّسة)"""
+    raw = prepared.df[column]
+    if rows is not None:
+        raw = raw.iloc[rows]
+    kind = _column_kind(field, raw)
+    missing = raw.isna().to_numpy()
+    # الحقول النصية المعيّنة تُعدّ من رموز المفاتيح (تُحسب مرة واحدة وتشاركها التجميعات)
+    if rows is None and field is not None and kind == 'text':
+        distinct = prepared.distinct_count(field)
+    else:
+        distinct = int(raw.nunique())
+    profile = {
+        'column': column,
+        'field': field,
+        'kind': kind,
+        'nulls': int(missing.sum()),
+        'distinct': distinct,
+        'min': None,
+        'max': None,
+        'first_date': None,
+        'last_date': None,
+        'negative': None,
+        'zero': None,
+        'parse_failures': 0,
+        'outliers': None,
+    }
+    if kind == 'text':
+        return profile
+
+    converted = _converted(prepared, field, kind, raw, rows)
+    if kind == 'numeric':
+        values = converted.to_numpy(dtype=np.float64, na_value=np.nan)
+        invalid = np.isnan(values)
+    else:
+        values = converted.to_numpy().astype('datetime64[ns]')
+        invalid = np.isnat(values)
+    # القيم المحوّلة أثناء الإسقاط تظهر هنا كمفقودة - إحصائيات التحويل هي المرجع إن وُجدت
+    failed = prepared.stats.get(field, {}).get('failed') if rows is None else None
+    profile['parse_failures'] = failed if failed is not None else int(np.count_nonzero(invalid & ~missing))
+
+    present = values[~invalid]
+    if not len(present):
+        return profile
+    if kind == 'datetime':
+        # أعمدة التواريخ في عمودين منفصلين حتى يبقى min/max رقمياً فقط (جدول بنوع واحد لكل عمود)
+        profile['first_date'] = str(present.min().astype('datetime64[D]'))
+        profile['last_date'] = str(present.max().astype('datetime64[D]'))
+        return profile
+
+    q1, q3 = np.quantile(present, [0.25, 0.75])
+    spread = (q3 - q1) * PROFILE_OUTLIER_IQR
+    profile.update({
+        'min': float(present.min()),
+        'max': float(present.max()),
+        'negative': int(np.count_nonzero(present < 0)),
+        'zero': int(np.count_nonzero(present == 0)),
+        'outliers': int(np.count_nonzero((present < q1 - spread) | (present > q3 + spread))),
+    })
+    return profile
+
+
+def _profile_rows(prepared, rows):
+    """ملف تعريف كل الأعمدة لصفوف محددة (None = كل الصفوف)"""
+    fields = {column: field for field, column in reversed(list(prepared.mapping.items()))}
+    return [_profile_column(prepared, column, fields.get(column), rows) for column in prepared.df.columns]
+
+
+def _scale(profiles, factor, stats):
+    """تقدير الأعداد للبيانات كلها من العيّنة - وما تعذر تحويله من إحصائيات التحويل الكاملة إن وُجدت"""
+    for profile in profiles:
+        for key in ('nulls', 'negative', 'zero', 'parse_failures', 'outliers'):
+            if profile[key] is not None:
+                profile[key] = int(round(profile[key] * factor))
+        if profile['field'] in stats:
+            profile['parse_failures'] = stats[profile['field']]['failed']
+    return profiles
+
+
+def profile_columns(prepared, time_budget=None, sample_rows=None, seed=0):
+    """
+    ملف تعريف جودة كل أعمدة البيانات المُجهّزة: {'rows', 'profiled_rows', 'sampled', 'elapsed', 'columns'}
+    وكل عنصر في columns قاموس لعمود واحد (null_ratio نسبة مئوية، min/max للأرقام و first_date/last_date للتواريخ).
+
+    بدون مهلة أو حد للعيّنة تُفحص كل الصفوف. مع مهلة بالثواني يُقدّر زمن الصف من عيّنة أولية صغيرة
+    ثم تُختار عيّنة عشوائية بحجم ما يتسع له الباقي من المهلة، وتُقدّر الأعداد منها للبيانات كلها
+    (القيم الفريدة وأصغر وأكبر قيمة وتاريخ للعيّنة فقط).
+    """
+    start = time.perf_counter()
+    total = len(prepared)
+    rng = np.random.default_rng(seed)
+    size = total if sample_rows is None else min(sample_rows, total)
+
+    if time_budget is not None and size > PROFILE_PILOT_ROWS:
+        pilot = np.sort(rng.choice(total, PROFILE_PILOT_ROWS, replace=False))
+        _profile_rows(prepared, pilot)
+        elapsed = time.perf_counter() - start
+        capacity = int((time_budget - elapsed) / (elapsed / PROFILE_PILOT_ROWS))
+        size = min(size, max(capacity, PROFILE_PILOT_ROWS))
+
+    rows = None if size >= total else np.sort(rng.choice(total, size, replace=False))
+    profiles = _profile_rows(prepared, rows)
+    if rows is not None:
+        profiles = _scale(profiles, total / size, prepared.stats)
+    for profile in profiles:
+        profile['null_ratio'] = profile['nulls'] / total * 100 if total else 0.0
+
+    return {
+        'rows': total,
+        'profiled_rows': size,
+        'sampled': rows is not None,
+        'elapsed': time.perf_counter() - start,
+        'columns': profiles,
+    }
@@ -0,0 +1,157 @@
+"""
+وحدة إسقاط الأعمدة للتحليل - الاحتفاظ بالأعمدة المعيّنة فقط بأنواع بيانات مضغوطة
+"""
+
+import numpy as np
+import pandas as pd
+
+from sales_data_loader import read_sales_file
+
+NUMERIC_FIELDS = ('quantity', 'unit_price', 'total_amount', 'discount', 'cost')
+DATE_FIELDS = ('order_date',)
+
+# أقصى نسبة للقيم الفريدة حتى يُحوَّل العمود النصي إلى category
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+
+def mapped_columns(column_mapping, available_columns=None):
+    """الأعمدة المعيّنة بدون تكرار وبترتيب ظهورها في الملف إن وُجد"""
+    wanted = list(dict.fromkeys(column_mapping.values()))
+    if available_columns is None:
+        return wanted
+    wanted_set = set(wanted)
+    return [column for column in available_columns if column in wanted_set]
+
+
+def _full_precision(values):
+    """
+    المقاييس بدقة كاملة (int64 أو float64) حتى لو وصلت مصغّرة - حاصل ضرب مقياسين
+    (التكلفة × الكمية) بنوع int16 أو int32 يفيض دون أي خطأ
+    """
+    dtype = values.dtype
+    if isinstance(dtype, pd.ArrowDtype):
+        return values
+    nullable = pd.api.types.is_extension_array_dtype(dtype)
+    if pd.api.types.is_integer_dtype(dtype):
+        return values.astype('Int64' if nullable else np.int64)
+    if pd.api.types.is_float_dtype(dtype):
+        return values.astype('Float64' if nullable else np.float64)
+    return values
+
+
+def to_dates(raw):
+    """
+    تحويل عمود إلى تواريخ numpy (القيم غير الصالحة NaT) مهما كان نوعه.
+
+    category تُحوَّل فئاتها فقط ثم تُوزَّع بالرموز (to_datetime عليها مباشرة يعيد category من
+    Timestamp في pandas 2)، وتواريخ Arrow (date32 / timestamp) تُحوَّل إلى datetime64[ns]
+    لأن date32 لا يدعم .dt.to_period ولا تجميع الفترات.
+    """
+    if isinstance(raw.dtype, pd.CategoricalDtype):
+        categories = pd.to_datetime(pd.Series(raw.cat.categories.astype(object)), errors='coerce')
+        # الرمز -1 (قيمة مفقودة) يقع على NaT في آخر الجدول
+        lookup = np.append(categories.to_numpy(dtype='datetime64[ns]'), np.datetime64('NaT', 'ns'))
+        return pd.Series(lookup[raw.cat.codes.to_numpy()], index=raw.index, name=raw.name)
+    if isinstance(raw.dtype, pd.ArrowDtype):
+        if not pd.api.types.is_datetime64_any_dtype(raw):
+            raw = pd.to_datetime(raw, errors='coerce')
+        return raw if not isinstance(raw.dtype, pd.ArrowDtype) else raw.astype('datetime64[ns]')
+    if pd.api.types.is_datetime64_any_dtype(raw):
+        return raw
+    return pd.to_datetime(raw, errors='coerce')
+
+
+def _is_low_cardinality(series):
+    return len(series) > 0 and series.nunique() / len(series) <= CATEGORY_MAX_UNIQUE_RATIO
+
+
+def compact_frame(df):
+    """
+    ضغط أنواع أعمدة ملف محمّل دون فقدان أي قيمة: category للنصوص قليلة التنوع (عدا أعمدة Arrow).
+
+    النتيجة لا تعتمد على تعيين الأعمدة فتُشارك في ذاكرة الملفات بين الجلسات. الأرقام تبقى بنوعها
+    (المقاييس المصغّرة تفيض عند ضربها ببعضها)، والتواريخ تُحوَّل في build_analysis_frame
+    حيث تُعدّ القيم التي تعذر تحويلها.
+    """
+    compacted = {}
+
+    for column in df.columns:
+        series = df[column]
+        # أعمدة Arrow تبقى كما هي حتى تُدمج الملفات في Arrow دون نسخ (align_and_merge)
+        if isinstance(series.dtype, pd.ArrowDtype):
+            continue
+        if pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+            if not isinstance(series.dtype, pd.CategoricalDtype) and _is_low_cardinality(series):
+                compacted[column] = series.astype('category')
+
+    if not compacted:
+        return df
+    df = df.copy(deep=False)
+    for column, values in compacted.items():
+        df[column] = values
+    return df
+
+
+def coercion_entry(column, kind, raw, converted):
+    """إحصائيات تحويل حقل: عدد الصفوف، المفقودة أصلاً، والقيم التي تعذر تحويلها"""
+    missing = int(raw.isna().sum())
+    return {
+        'column': column,
+        'kind': kind,
+        'rows': len(raw),
+        'missing': missing,
+        'failed': int(converted.isna().sum()) - missing
+    }
+
+
+def compact_dtypes(df, column_mapping, stats=None):
+    """
+    تحويل الأعمدة المعيّنة إلى أنواع مضغوطة: أرقام بدقة كاملة (المقاييس لا تُصغَّر لأنها تُضرب ببعضها)،
+    تواريخ محوّلة مرة واحدة، و category للنصوص قليلة التنوع.
+
+    stats: قاموس اختياري تُسجَّل فيه إحصائيات تحويل كل حقل رقمي أو تاريخ (coercion_entry).
+    """
+    converted = set()
+
+    for field in NUMERIC_FIELDS:
+        column = column_mapping.get(field)
+        if column in df.columns and column not in converted:
+            raw = df[column]
+            values = pd.to_numeric(raw, errors='coerce')
+            if stats is not None:
+                stats[field] = coercion_entry(column, 'numeric', raw, values)
+            df[column] = _full_precision(values)
+            converted.add(column)
+
+    for field in DATE_FIELDS:
+        column = column_mapping.get(field)
+        if column in df.columns and column not in converted:
+            raw = df[column]
+            df[column] = to_dates(raw)
+            if stats is not None:
+                stats[field] = coercion_entry(column, 'datetime', raw, df[column])
+            converted.add(column)
+
+    for column in mapped_columns(column_mapping, df.columns):
+        if column in converted:
+            continue
+        series = df[column]
+        if pd.api.types.is_numeric_dtype(series) or isinstance(series.dtype, pd.CategoricalDtype):
+            continue
+        if _is_low_cardinality(series):
+            df[column] = series.astype('category')
+
+    return df
+
+
+def build_analysis_frame(df, column_mapping, stats=None):
+    """إسقاط بيانات محمّلة على الأعمدة المعيّنة فقط"""
+    columns = mapped_columns(column_mapping, df.columns)
+    # بدون copy(): مع النسخ عند الكتابة لا يُنسخ إلا العمود الذي يتغير نوعه
+    return compact_dtypes(df[columns], column_mapping, stats)
+
+
+def read_projected_file(file_name, content, column_mapping, backend='pandas', stats=None):
+    """إعادة قراءة ملف بالأعمدة المعيّنة فقط (usecols) ثم ضغط أنواعها"""
+    df, _ = read_sales_file(file_name, content, backend, usecols=mapped_columns(column_mapping))
+    return compact_dtypes(df, column_mapping, stats)
@@ -0,0 +1,137 @@
+"""
+تقسيم العملاء RFM - الحداثة والتكرار والقيمة لكل عميل بتجميع واحد على رموز العملاء
+ثم درجات 1-5 من حدود المئينات وشرائح مسمّاة
+"""
+
+import numpy as np
+import pandas as pd
+
+# الشرائح بترتيب العرض
+RFM_SEGMENTS = ('champions', 'loyal', 'potential', 'need_attention', 'at_risk', 'hibernating', 'lost')
+
+# عدد الدرجات لكل بُعد (خُمسيات)
+RFM_SCORES = 5
+
+
+def score(values, higher_is_better=True):
+    """
+    درجة 1-5 لكل قيمة = 1 + عدد حدود الخُمسيات (np.quantile) الأصغر منها - القيم المتساوية تأخذ نفس الدرجة
+    (فقد تكون الخُمسيات غير متساوية عند كثرة التكرار، مثل عملاء بطلب واحد).
+    """
+    values = values if higher_is_better else -values
+    edges = np.quantile(values, np.arange(1, RFM_SCORES) / RFM_SCORES)
+    return (np.searchsorted(edges, values, side='left') + 1).astype(np.int8)
+
+
+def segment(recency_score, value_score):
+    """الشريحة لكل عميل (رقمها في RFM_SEGMENTS) من درجة الحداثة ومتوسط درجتي التكرار والقيمة"""
+    r, fm = recency_score, value_score
+    conditions = [
+        (r >= 4) & (fm >= 4),   # champions
+        (r >= 3) & (fm >= 3),   # loyal
+        r >= 4,                 # potential
+        r == 3,                 # need_attention
+        fm >= 3,                # at_risk
+        r == 2,                 # hibernating
+    ]
+    return np.select(conditions, np.arange(len(conditions), dtype=np.int8), default=np.int8(len(conditions)))
+
+
+def build_rfm_table(prepared):
+    """
+    جدول العملاء: recency (أيام منذ آخر طلب حتى آخر تاريخ في البيانات)، frequency (عدد الطلبات)،
+    monetary (مجموع المبيعات)، والدرجات والشريحة - أو None إذا لم تتوفر الحقول.
+    """
+    if not all(prepared.has(field) for field in ('customer_id', 'order_date', 'total_amount')):
+        return None
+
+    codes, customers = prepared.codes('customer_id')
+    days = prepared.dates('order_date').to_numpy().astype('datetime64[D]')
+    valid = (codes >= 0) & ~np.isnat(days)
+    if not valid.any():
+        return None
+
+    codes = codes[valid].astype(np.int64)
+    day_numbers = days[valid].astype(np.int64)
+    amounts = prepared.numeric('total_amount').to_numpy(dtype=np.float64, na_value=np.nan)[valid]
+    size = len(customers)
+
+    # التكرار: الطلبات المختلفة لكل عميل إذا عُيّن رقم الطلب (الطلب قد يكون عدة صفوف) وإلا الصفوف
+    if prepared.has('order_id'):
+        order_codes, orders = prepared.codes('order_id')
+        order_codes = order_codes[valid]
+        has_order = order_codes >= 0
+        # عميل كل طلب (آخر كتابة تفوز) - إذا كان لكل طلب عميل واحد يكفي عدّ الطلبات لكل عميل
+        owner = np.full(len(orders), -1, dtype=np.int64)
+        owner[order_codes[has_order]] = codes[has_order]
+        if (owner[order_codes[has_order]] == codes[has_order]).all():
+            frequency = np.bincount(owner[owner >= 0], minlength=size)
+        else:
+            radix = len(orders) + 1
+            pairs = pd.unique(codes[has_order] * radix + order_codes[has_order] + 1)
+            frequency = np.bincount(pairs // radix, minlength=size)
+        # الصفوف بلا رقم طلب تُعد طلبات مستقلة
+        frequency += np.bincount(codes[~has_order], minlength=size)
+    else:
+        frequency = np.bincount(codes, minlength=size)
+
+    monetary = np.bincount(codes, weights=np.nan_to_num(amounts), minlength=size)
+    last_day = np.full(size, np.iinfo(np.int64).min)
+    np.maximum.at(last_day, codes, day_numbers)
+
+    seen = np.bincount(codes, minlength=size) > 0
+    as_of = int(day_numbers.max())
+    recency = (as_of - last_day[seen]).astype(np.int64)
+    frequency, monetary = frequency[seen], monetary[seen]
+
+    r = score(recency, higher_is_better=False)
+    f = score(frequency)
+    m = score(monetary)
+    fm = np.floor((f.astype(np.int16) + m + 1) / 2).astype(np.int8)
+
+    table = pd.DataFrame({
+        'recency': recency,
+        'frequency': frequency,
+        'monetary': monetary,
+        'r': r,
+        'f': f,
+        'm': m,
+        'segment': pd.Categorical.from_codes(segment(r, fm), categories=RFM_SEGMENTS),
+    }, index=pd.Index(customers[seen], name=prepared.mapping['customer_id']))
+    table.attrs['as_of'] = str(np.datetime64(as_of, 'D'))
+    return table
+
+
+def summarize_rfm(table):
+    """حجم كل شريحة وحصتها من العملاء والإيرادات ومتوسطات RFM فيها (بترتيب RFM_SEGMENTS)"""
+    total_customers = len(table)
+    total_revenue = table['monetary'].sum()
+    grouped = table.groupby('segment', observed=True).agg(
+        customers=('monetary', 'size'),
+        revenue=('monetary', 'sum'),
+        avg_recency=('recency', 'mean'),
+        avg_frequency=('frequency', 'mean'),
+        avg_monetary=('monetary', 'mean'),
+    )
+
+    segments = []
+    for name in RFM_SEGMENTS:
+        if name not in grouped.index:
+            continue
+        row = grouped.loc[name]
+        segments.append({
+            'segment': name,
+            'customers': int(row['customers']),
+            'customer_share': float(row['customers'] / total_customers * 100),
+            'revenue': float(row['revenue']),
+            'revenue_share': float(row['revenue'] / total_revenue * 100) if total_revenue > 0 else 0.0,
+            'avg_recency': float(row['avg_recency']),
+            'avg_frequency': float(row['avg_frequency']),
+            'avg_monetary': float(row['avg_monetary']),
+        })
+
+    return {
+        'as_of': table.attrs.get('as_of'),
+        'customers': total_customers,
+        'segments': segments,
+    }
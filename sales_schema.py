@@ -0,0 +1,271 @@
+"""
+وحدة مواءمة مخطط الملفات قبل الدمج - توحيد أسماء الأعمدة وأنواعها دون التحول إلى object
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# أسماء شائعة بالعربية والإنجليزية لنفس الحقل في ملفات المبيعات
+HEADER_SYNONYMS = {
+    'order_id': ['order id', 'order no', 'transaction id', 'رقم الطلب', 'معرف الطلب'],
+    'order_date': ['order date', 'transaction date', 'date', 'تاريخ الطلب', 'التاريخ'],
+    'customer_id': ['customer id', 'client id', 'رقم العميل', 'معرف العميل'],
+    'customer_name': ['customer name', 'client name', 'customer', 'اسم العميل', 'العميل'],
+    'product_id': ['product id', 'item id', 'sku', 'رقم المنتج', 'معرف المنتج'],
+    'product_name': ['product name', 'item name', 'product', 'اسم المنتج', 'المنتج'],
+    'category': ['category', 'product category', 'الفئة', 'التصنيف'],
+    'quantity': ['quantity', 'qty', 'الكمية'],
+    'unit_price': ['unit price', 'price', 'سعر الوحدة', 'السعر'],
+    'total_amount': ['total amount', 'total', 'amount', 'revenue', 'المبلغ الإجمالي', 'الإجمالي', 'المبلغ'],
+    'discount': ['discount', 'الخصم'],
+    'cost': ['cost', 'unit cost', 'التكلفة'],
+    'region': ['region', 'area', 'المنطقة'],
+    'city': ['city', 'المدينة'],
+    'country': ['country', 'البلد', 'الدولة'],
+    'salesperson': ['salesperson', 'sales person', 'sales rep', 'مندوب المبيعات', 'المندوب'],
+    'payment_method': ['payment method', 'payment type', 'طريقة الدفع'],
+    'status': ['status', 'order status', 'حالة الطلب', 'الحالة'],
+}
+
+# أقل نسبة نجاح لتحويل الأجزاء النصية إلى أرقام أو تواريخ عند اختلاف الأنواع
+CONVERSION_MIN_SUCCESS = 0.9
+
+_ARABIC_DIACRITICS = re.compile('[ً-ْـ]')
+_ARABIC_LETTER_VARIANTS = str.maketrans({'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ة': 'ه', 'ى': 'ي'})
+_SEPARATORS = re.compile(r'[\s_\-\.]+')
+
+
+def normalize_header(name):
+    """توحيد اسم العمود: حالة الأحرف، المسافات، وصور الحروف العربية"""
+    text = _ARABIC_DIACRITICS.sub('', str(name)).translate(_ARABIC_LETTER_VARIANTS)
+    return _SEPARATORS.sub(' ', text).strip().lower()
+
+
+_SYNONYM_INDEX = {
+    normalize_header(alias): field
+    for field, aliases in HEADER_SYNONYMS.items()
+    for alias in aliases
+}
+
+
+def header_key(name):
+    """مفتاح المواءمة: اسم الحقل المعروف أو الاسم الموحّد"""
+    normalized = normalize_header(name)
+    return _SYNONYM_INDEX.get(normalized, normalized)
+
+
+def rename_to_schema(df, columns):
+    """
+    أسماء أعمدة ملف جديد بأسماء مخطط موجود: كل عمود يأخذ اسم عمود المخطط الذي له نفس مفتاح المواءمة
+    (مثل Unit Cost ← Cost) - الأعمدة التي لا تقابل المخطط تبقى كما هي
+    """
+    targets = {}
+    for column in columns:
+        targets.setdefault(header_key(column), column)
+    used = set(df.columns) & set(columns)
+    rename = {}
+    for column in df.columns:
+        if column in used:
+            continue
+        target = targets.get(header_key(column))
+        if target is not None and target not in used:
+            rename[column] = target
+            used.add(target)
+    return df.rename(columns=rename) if rename else df
+
+
+def _value_kind(series):
+    """تصنيف نوع العمود لأغراض التوحيد"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return 'category'
+    if pd.api.types.is_bool_dtype(series):
+        return 'bool'
+    if pd.api.types.is_numeric_dtype(series):
+        return 'numeric'
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return 'datetime'
+    return 'string'
+
+
+def _parses_as(parts, converter):
+    """فحص إذا كانت الأجزاء النصية تتحول بنسبة نجاح كافية"""
+    valid = converted = 0
+    for part in parts:
+        if _value_kind(part) != 'string':
+            continue
+        valid += int(part.notna().sum())
+        converted += int(converter(part).notna().sum())
+    return valid == 0 or converted / valid >= CONVERSION_MIN_SUCCESS
+
+
+def _to_text(series):
+    return series.astype(object).where(series.notna(), None)
+
+
+def _unify_parts(parts):
+    """توحيد نوع عمود واحد عبر الملفات - يعيد (الأجزاء المحوّلة, نوع التحويل أو None)"""
+    present = [part for part in parts if part is not None and part.notna().any()]
+    kinds = {_value_kind(part) for part in present}
+
+    if len(kinds) <= 1 and kinds != {'category'}:
+        return parts, None
+
+    to_numeric = lambda part: pd.to_numeric(part, errors='coerce')
+    to_datetime = lambda part: pd.to_datetime(part, errors='coerce')
+
+    if kinds <= {'numeric', 'string'} and _parses_as(present, to_numeric):
+        target, converter = 'numeric', to_numeric
+    elif kinds <= {'datetime', 'string'} and _parses_as(present, to_datetime):
+        target, converter = 'datetime', to_datetime
+    elif kinds <= {'category', 'string'}:
+        # توحيد قواميس الفئات بدلاً من التحول إلى نصوص عادية
+        categoricals = [part.astype('category') for part in present]
+        categories = pd.api.types.union_categoricals(categoricals, ignore_order=True).categories
+        dtype = pd.CategoricalDtype(categories)
+        return [None if part is None else part.astype(dtype) for part in parts], 'category'
+    else:
+        target, converter = 'string', _to_text
+
+    unified = []
+    for part in parts:
+        if part is None or _value_kind(part) == target:
+            unified.append(part)
+        else:
+            unified.append(converter(part))
+    return unified, target
+
+
+def _empty_like(dtype, length):
+    """
+    عمود فارغ بنفس النوع لملف لا يحتوي العمود - الأعداد الصحيحة والمنطقية بنظيرها القابل للفراغ
+    (Int64 / boolean) بدل NaN العشري الذي يحوّل العمود المدمج كله إلى float64
+    """
+    if isinstance(dtype, np.dtype):
+        if dtype.kind in 'iu':
+            dtype = pd.api.types.pandas_dtype(dtype.name.capitalize().replace('Uint', 'UInt'))
+        elif dtype.kind == 'b':
+            dtype = pd.BooleanDtype()
+        elif dtype.kind == 'f':
+            return pd.Series(np.nan, index=range(length), dtype=dtype)
+    return pd.Series(pd.array([None] * length, dtype=dtype))
+
+
+def _concat_arrow(frames):
+    """دمج جداول Arrow بدون نسخ البيانات (مجرد ربط للأجزاء)"""
+    tables = [pa.Table.from_pandas(frame, preserve_index=False) for frame in frames]
+    try:
+        table = pa.concat_tables(tables, promote_options='permissive')
+    except TypeError:
+        # pyarrow < 14
+        table = pa.concat_tables(tables, promote=True)
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def align_and_merge(dataframes):
+    """
+    مواءمة مخطط عدة ملفات ثم دمجها.
+
+    يعيد (البيانات المدمجة, تقرير المخطط والذاكرة قبل وبعد الدمج).
+    """
+    memory_before = int(sum(df.memory_usage(deep=True).sum() for df in dataframes))
+
+    # 1. مواءمة أسماء الأعمدة
+    output_names = {}
+    aliases = {}
+    renamed_frames = []
+    for df in dataframes:
+        rename = {}
+        used_keys = set()
+        for column in df.columns:
+            key = header_key(column)
+            if key in used_keys:
+                # عمودان في نفس الملف يقابلان نفس الحقل: نبقيهما منفصلين
+                key = normalize_header(column)
+            used_keys.add(key)
+            output_names.setdefault(key, column)
+            aliases.setdefault(output_names[key], set()).add(column)
+            rename[column] = output_names[key]
+        renamed_frames.append(df.rename(columns=rename))
+
+    columns = list(dict.fromkeys(output_names.values()))
+
+    # 2. مسار Arrow بدون نسخ عندما تكون كل الأعمدة مدعومة بـ Arrow
+    all_arrow = all(
+        isinstance(dtype, pd.ArrowDtype)
+        for frame in renamed_frames for dtype in frame.dtypes
+    )
+    conversions = {}
+    merged = None
+    if all_arrow:
+        try:
+            merged = _concat_arrow(renamed_frames)[columns]
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            merged = None
+    # بدون نسخ فقط إذا نجح مسار Arrow فعلاً (وإلا دُمجت البيانات بنسخها في مسار pandas)
+    zero_copy = merged is not None
+
+    # 3. توحيد الأنواع عموداً بعمود ثم الدمج
+    if merged is None:
+        aligned = [{} for _ in renamed_frames]
+        for column in columns:
+            parts = [frame[column].reset_index(drop=True) if column in frame.columns else None
+                     for frame in renamed_frames]
+            parts, conversion = _unify_parts(parts)
+            if conversion:
+                conversions[column] = conversion
+
+            reference = next((part for part in parts if part is not None), None)
+            for index, (frame, part) in enumerate(zip(renamed_frames, parts)):
+                aligned[index][column] = part if part is not None else _empty_like(reference.dtype, len(frame))
+
+        merged = pd.concat(
+            [pd.DataFrame(frame_columns, columns=columns) for frame_columns in aligned],
+            ignore_index=True, sort=False
+        )
+
+    report = {
+        'columns': [
+            {
+                'column': column,
+                'dtype': str(merged[column].dtype),
+                'files': sum(1 for frame in renamed_frames if column in frame.columns),
+                'aliases': sorted(str(alias) for alias in aliases.get(column, set()) if alias != column),
+                'conversion': conversions.get(column)
+            }
+            for column in columns
+        ],
+        'zero_copy': zero_copy,
+        'memory_before': memory_before,
+        'memory_after': int(merged.memory_usage(deep=True).sum())
+    }
+    return merged, report
+
+
+def append_aligned(merged, new):
+    """
+    إلحاق بيانات جديدة ببيانات مدمجة سابقاً بمخططها - توحيد الأنواع يفحص الجزء الجديد فقط،
+    وأعمدة category تُدمج قواميسها (union_categoricals) حتى لا يتحول العمود المدمج إلى object
+    """
+    new = rename_to_schema(new, list(merged.columns))
+    columns = list(merged.columns) + [column for column in new.columns if column not in merged.columns]
+    combined = {}
+    for column in columns:
+        old = merged[column].reset_index(drop=True) if column in merged.columns else None
+        part = new[column].reset_index(drop=True) if column in new.columns else None
+        if old is None:
+            old = _empty_like(part.dtype, len(merged))
+        elif part is None:
+            part = _empty_like(old.dtype, len(new))
+
+        kinds = {_value_kind(old), _value_kind(part)}
+        if 'category' in kinds and kinds <= {'category', 'string'}:
+            combined[column] = pd.Series(pd.api.types.union_categoricals(
+                [old.astype('category'), part.astype('category')], ignore_order=True))
+            continue
+        if len(kinds) > 1 and part.notna().any():
+            (old, part), _ = _unify_parts([old, part])
+        combined[column] = pd.concat([old, part], ignore_index=True)
+    return pd.DataFrame(combined, columns=columns)
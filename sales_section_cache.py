@@ -0,0 +1,57 @@
+"""
+ذاكرة نتائج أقسام التحليل - كل قسم يُحسب مرة واحدة لكل بيانات وتعيين أعمدة
+"""
+
+
+def mapping_key(column_mapping):
+    """مفتاح ثابت لتعيين الأعمدة"""
+    return tuple(sorted(column_mapping.items()))
+
+
+class SectionCache:
+    """
+    نتائج الأقسام (المؤشرات، الاتجاهات، الجودة...) مفهرسة باسم القسم وخياراته.
+
+    الذاكرة مرتبطة بمفتاح واحد (هوية البيانات + التعيين)، وربطها بمفتاح مختلف
+    يفرّغها. عدادات الإصابة والإخفاق لكل قسم تكشف أي قسم حُسب أكثر من مرة.
+    """
+
+    def __init__(self):
+        self.key = None
+        self.hits = 0
+        self.misses = 0
+        self.sections = {}
+        self._entries = {}
+
+    def bind(self, key):
+        """ربط الذاكرة ببيانات وتعيين - تُفرَّغ إذا تغيّر أي منهما"""
+        if key != self.key:
+            self._entries.clear()
+            self.key = key
+
+    def get(self, section, options=()):
+        """إرجاع (موجود, النتيجة) مع تحديث العدادات"""
+        counters = self.sections.setdefault(section, {'hits': 0, 'misses': 0})
+        entry_key = (section,) + tuple(options)
+        if entry_key in self._entries:
+            self.hits += 1
+            counters['hits'] += 1
+            return True, self._entries[entry_key]
+        self.misses += 1
+        counters['misses'] += 1
+        return False, None
+
+    def put(self, section, result, options=()):
+        self._entries[(section,) + tuple(options)] = result
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        """إحصائيات الاستخدام لكل قسم"""
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'sections': {name: dict(counters) for name, counters in self.sections.items()}
+        }
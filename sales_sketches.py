@@ -0,0 +1,251 @@
+"""
+ملخصات تقريبية قابلة للدمج - عدّ القيم الفريدة (HyperLogLog) ومئينات قيم المعاملات
+بذاكرة ثابتة لكل ملف أو جزء
+"""
+
+import numpy as np
+import pandas as pd
+
+# دقة HyperLogLog: 2^14 سجلاً (16 كيلوبايت) والخطأ المعياري النسبي 1.04 / √2^14 ≈ 0.8%
+HLL_PRECISION = 14
+
+# أوضاع عدّ القيم الفريدة: auto = دقيق حتى الحد ثم تقريبي
+DISTINCT_MODES = ('auto', 'exact', 'sketch')
+
+# الحد الذي يتحول بعده الوضع auto إلى الملخص (عدد الصفوف في المحلل أو القيم الفريدة في المجمّع)
+EXACT_DISTINCT_LIMIT = 1_000_000
+
+# دقة ملخص المئينات: الخطأ النسبي في القيمة المُقدّرة لا يتجاوز 1%
+QUANTILE_ACCURACY = 0.01
+
+# المئينات المحسوبة لقيمة المعاملة
+QUANTILES = {'p50': 0.5, 'p90': 0.9, 'p99': 0.99}
+
+# الأبعاد التي تُحسب لها المئينات لكل قيمة
+QUANTILE_GROUP_FIELDS = ('region', 'salesperson')
+
+# القيم المطلقة الأصغر من هذا الحد تُعامل كصفر
+QUANTILE_MIN_VALUE = 1e-6
+
+
+def hash_values(values):
+    """
+    بصمة 64 بت ثابتة لكل قيمة (نفس القيمة تعطي نفس البصمة في كل ملف وعملية).
+    الأرقام العشرية الصحيحة تُعامل كأعداد صحيحة حتى يتطابق 1001 و 1001.0 بين الملفات.
+    """
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    if pd.api.types.is_float_dtype(series) and len(series):
+        array = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        if np.array_equal(array, np.round(array)):
+            series = pd.Series(array.astype(np.int64))
+    return pd.util.hash_pandas_object(series, index=False).to_numpy()
+
+
+class HyperLogLog:
+    """
+    ملخص HyperLogLog: لكل سجل أكبر رتبة (عدد الأصفار البادئة + 1) بين البصمات التي تقع فيه.
+
+    الدمج = أكبر قيمة لكل سجل، فملخص البيانات المدمجة أو أي جزء منها يُبنى من ملخصات
+    الملفات دون المرور على الصفوف مرة أخرى.
+    """
+
+    def __init__(self, precision=HLL_PRECISION, registers=None):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8) if registers is None else registers
+
+    def update(self, values):
+        """إضافة قيم (يُفضّل تمرير القيم الفريدة فقط - التكرار لا يغيّر الملخص)"""
+        series = values if isinstance(values, pd.Series) else pd.Series(values)
+        series = series.dropna()
+        if len(series):
+            self.update_hashes(hash_values(series))
+        return self
+
+    def update_hashes(self, hashes):
+        """إضافة بصمات 64 بت محسوبة مسبقاً"""
+        bits = 64 - self.precision
+        index = (hashes >> np.uint64(bits)).astype(np.intp)
+        rest = hashes & np.uint64((1 << bits) - 1)
+        # طول الجزء الباقي بالبتات من أس الفاصلة العائمة (frexp) بدل حلقة على البتات
+        rank = (bits + 1 - np.frexp(rest.astype(np.float64))[1]).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other):
+        """دمج ملخص آخر بنفس الدقة"""
+        if other.precision != self.precision:
+            raise ValueError('HyperLogLog precision mismatch')
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def copy(self):
+        return HyperLogLog(self.precision, self.registers.copy())
+
+    @property
+    def relative_error(self):
+        """الخطأ المعياري النسبي للتقدير"""
+        return float(1.04 / np.sqrt(len(self.registers)))
+
+    def count(self):
+        """تقدير عدد القيم الفريدة (مع تصحيح العدّ الخطي للأعداد الصغيرة)"""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.ldexp(1.0, -self.registers.astype(np.int64)).sum()
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+
+class DistinctCounter:
+    """
+    عدّاد قيم فريدة قابل للدمج: مجموعة دقيقة أو ملخص HyperLogLog.
+
+    في الوضع auto يبدأ دقيقاً ويتحول إلى الملخص عندما تتجاوز القيم الفريدة الحد،
+    فتبقى البيانات الصغيرة دقيقة والذاكرة ثابتة للبيانات الكبيرة.
+    """
+
+    def __init__(self, mode='auto', limit=EXACT_DISTINCT_LIMIT, precision=HLL_PRECISION):
+        self.mode = mode
+        self.limit = limit
+        self.precision = precision
+        self.values = None if mode == 'sketch' else set()
+        self.sketch = HyperLogLog(precision) if mode == 'sketch' else None
+
+    @property
+    def approximate(self):
+        return self.sketch is not None
+
+    def _promote(self):
+        """التحول من المجموعة الدقيقة إلى الملخص"""
+        self.sketch = HyperLogLog(self.precision).update(list(self.values))
+        self.values = None
+
+    def update(self, values):
+        """إضافة القيم الفريدة لدفعة"""
+        if self.sketch is not None:
+            self.sketch.update(values)
+            return self
+        self.values.update(pd.Series(values).dropna().tolist())
+        if self.mode == 'auto' and len(self.values) > self.limit:
+            self._promote()
+        return self
+
+    def merge(self, other):
+        """دمج عدّاد ملف أو جزء آخر"""
+        if self.sketch is None and other.sketch is None:
+            self.values |= other.values
+            if self.mode == 'auto' and len(self.values) > self.limit:
+                self._promote()
+            return self
+        if self.sketch is None:
+            self._promote()
+        if other.sketch is not None:
+            self.sketch.merge(other.sketch)
+        else:
+            self.sketch.update(list(other.values))
+        return self
+
+    def count(self):
+        return self.sketch.count() if self.sketch is not None else len(self.values)
+
+    @property
+    def relative_error(self):
+        """الخطأ المعياري النسبي (صفر للعدّ الدقيق)"""
+        return self.sketch.relative_error if self.sketch is not None else 0.0
+
+
+def _log_gamma(accuracy):
+    return np.log((1 + accuracy) / (1 - accuracy))
+
+
+def quantile_keys(values, accuracy=QUANTILE_ACCURACY):
+    """
+    مفتاح الدلو لكل قيمة: ±ceil(log_γ(|x| / الحد الأدنى)) والصفر مفتاحه 0،
+    فترتيب المفاتيح هو ترتيب القيم (السالبة قبل الصفر قبل الموجبة).
+    """
+    magnitude = np.abs(values)
+    keys = np.zeros(len(values), dtype=np.int64)
+    large = magnitude > QUANTILE_MIN_VALUE
+    keys[large] = np.ceil(np.log(magnitude[large] / QUANTILE_MIN_VALUE) / _log_gamma(accuracy))
+    return np.where(values < 0, -keys, keys)
+
+
+def key_values(keys, accuracy=QUANTILE_ACCURACY):
+    """القيمة الممثلة لكل دلو (ضمن الخطأ النسبي من كل قيمة فيه)"""
+    gamma = (1 + accuracy) / (1 - accuracy)
+    magnitude = QUANTILE_MIN_VALUE * 2 * np.power(gamma, np.abs(keys).astype(np.float64)) / (gamma + 1)
+    return np.where(keys == 0, 0.0, np.sign(keys) * magnitude)
+
+
+class QuantileSketch:
+    """
+    ملخص مئينات بدلاء لوغاريتمية (على طريقة DDSketch): عدد القيم في كل دلو لكل مجموعة.
+
+    يُبنى بـ np.bincount دون ترتيب القيم، ويُدمج بجمع العدادات، فملخصات الدفعات
+    والملفات تُجمع في ملخص واحد. الصفوف مجموعات (صف واحد بدون تجميع) والأعمدة مفاتيح الدلاء.
+    """
+
+    def __init__(self, counts, accuracy=QUANTILE_ACCURACY):
+        self.counts = counts
+        self.accuracy = accuracy
+
+    @classmethod
+    def from_values(cls, values, codes=None, uniques=None, accuracy=QUANTILE_ACCURACY):
+        """ملخص من مصفوفة قيم، مجمّعاً حسب رموز مجموعة (codes, uniques) إذا مُرّرت"""
+        values = np.asarray(values, dtype=np.float64)
+        valid = ~np.isnan(values)
+        if codes is not None:
+            valid &= codes >= 0
+        index = pd.RangeIndex(1) if codes is None else pd.Index(uniques).astype(object)
+        keys = quantile_keys(values[valid], accuracy)
+        if not len(keys):
+            return cls(pd.DataFrame(index=index[:0], dtype=np.int64), accuracy)
+
+        low = int(keys.min())
+        width = int(keys.max()) - low + 1
+        if codes is None:
+            counts = np.bincount(keys - low, minlength=width).reshape(1, width)
+        else:
+            cells = codes[valid].astype(np.int64) * width + (keys - low)
+            counts = np.bincount(cells, minlength=len(index) * width).reshape(len(index), width)
+        frame = pd.DataFrame(counts, index=index, columns=np.arange(low, low + width))
+        return cls(frame.loc[frame.any(axis=1), frame.any(axis=0)], accuracy)
+
+    def merge(self, other):
+        """دمج ملخص دفعة أو ملف آخر (جمع عدادات الدلاء لكل مجموعة)"""
+        if other.accuracy != self.accuracy:
+            raise ValueError('QuantileSketch accuracy mismatch')
+        merged = self.counts.add(other.counts, fill_value=0).fillna(0)
+        self.counts = merged.astype(np.int64).sort_index(axis=1)
+        return self
+
+    def table(self, quantiles=QUANTILES):
+        """عدد القيم والمئينات لكل مجموعة: الأعمدة count ثم p50/p90/p99"""
+        counts = self.counts.to_numpy()
+        keys = self.counts.columns.to_numpy(dtype=np.int64)
+        cumulative = np.cumsum(counts, axis=1)
+        total = cumulative[:, -1] if len(keys) else np.zeros(len(counts), dtype=np.int64)
+        table = {'count': total}
+        for name, q in quantiles.items():
+            # أول دلو يتجاوز عدده التراكمي رتبة المئين (الرتبة الدنيا كما في method='lower')
+            rank = np.floor(q * (total - 1))
+            position = np.argmax(cumulative > rank[:, None], axis=1) if len(keys) else total
+            table[name] = key_values(keys[position], self.accuracy) if len(keys) else np.full(len(total), np.nan)
+        return pd.DataFrame(table, index=self.counts.index)
+
+    def quantiles(self, quantiles=QUANTILES):
+        """مئينات الملخص غير المجمّع: {'count', 'p50', 'p90', 'p99'} ({} إذا لا توجد قيم)"""
+        table = self.table(quantiles)
+        if not len(table):
+            return {}
+        row = table.iloc[0]
+        return {'count': int(row['count']), **{name: float(row[name]) for name in quantiles}}
+
+    def records(self, quantiles=QUANTILES):
+        """مئينات كل مجموعة مرتبة تنازلياً حسب عدد المعاملات: [{'value', 'count', 'p50', ...}]"""
+        table = self.table(quantiles).sort_values('count', ascending=False, kind='stable')
+        return [
+            {'value': value, 'count': int(row['count']), **{name: float(row[name]) for name in quantiles}}
+            for value, row in table.iterrows()
+        ]
@@ -7,11 +7,16 @@ import plotly.express as px
 import pandas as pd
 import numpy as np
 
+from sales_prepared import PreparedSalesDataset
+from sales_groupby import GROUP_MEASURES
+
 class SalesSmartVisualizer:
-    def __init__(self, dataframe, column_mapping, analysis_results):
+    def __init__(self, dataframe, column_mapping, analysis_results, prepared=None):
         self.df = dataframe
         self.mapping = column_mapping
         self.analysis = analysis_results
+        # الحقول المحوّلة مشتركة مع المحلل (analyzer.prepared) بدلاً من نسخ البيانات لكل رسم
+        self.prepared = prepared if prepared is not None else PreparedSalesDataset(dataframe, column_mapping)
     
     def generate_all_charts(self):
         """توليد جميع الرسوم البيانية الممكنة للمبيعات"""
@@ -61,6 +66,15 @@ class SalesSmartVisualizer:
         
         return charts
     
+    def _group_sum(self, key_field, value_field, n=None):
+        """
+        مجموع حقل رقمي لكل قيمة من المفتاح من مجاميع الأبعاد المشتركة مرتباً تنازلياً (أعلى n باختيار جزئي)
+        - جدول بعمودين باسمي العمودين الأصليين
+        """
+        measure = next(name for name, field in GROUP_MEASURES.items() if field == value_field)
+        grouped = self.prepared.aggregates().top(key_field, measure, n)
+        return grouped.reset_index(name=self.mapping[value_field])
+    
     def _create_sales_trend_chart(self):
         """إنشاء رسم اتجاه المبيعات عبر الزمن"""
         date_col = self.mapping['order_date']
@@ -70,15 +84,14 @@ class SalesSmartVisualizer:
             return None
         
         try:
-            # إنشاء نسخة من البيانات
-            df_copy = self.df.copy()
-            
-            # تحويل التواريخ
-            df_copy[date_col] = pd.to_datetime(df_copy[date_col], errors='coerce')
-            df_copy[amount_col] = pd.to_numeric(df_copy[amount_col], errors='coerce')
+            # الحقول المحوّلة من البيانات المُجهّزة
+            df_typed = pd.DataFrame({
+                date_col: self.prepared.dates('order_date'),
+                amount_col: self.prepared.numeric('total_amount')
+            })
             
             # إزالة القيم الفارغة
-            df_clean = df_copy.dropna(subset=[date_col, amount_col])
+            df_clean = df_typed.dropna(subset=[date_col, amount_col])
             
             if len(df_clean) == 0:
                 return None
@@ -117,13 +130,8 @@ class SalesSmartVisualizer:
             return None
         
         try:
-            # تحويل الكميات إلى أرقام
-            df_copy = self.df.copy()
-            df_copy[quantity_col] = pd.to_numeric(df_copy[quantity_col], errors='coerce')
-            
-            # تجميع حسب المنتج
-            product_sales = df_copy.groupby(product_col)[quantity_col].sum().reset_index()
-            product_sales = product_sales.sort_values(quantity_col, ascending=False).head(10)
+            # تجميع الكميات المحوّلة حسب المنتج
+            product_sales = self._group_sum('product_name', 'quantity', n=10)
             
             # إنشاء الرسم البياني الشريطي
             fig = px.bar(
@@ -160,13 +168,8 @@ class SalesSmartVisualizer:
             return None
         
         try:
-            # تحويل المبالغ إلى أرقام
-            df_copy = self.df.copy()
-            df_copy[amount_col] = pd.to_numeric(df_copy[amount_col], errors='coerce')
-            
-            # تجميع حسب المنطقة
-            region_sales = df_copy.groupby(region_col)[amount_col].sum().reset_index()
-            region_sales = region_sales.sort_values(amount_col, ascending=False)
+            # تجميع المبالغ المحوّلة حسب المنطقة
+            region_sales = self._group_sum('region', 'total_amount')
             
             # إنشاء مخطط دائري
             fig = px.pie(
@@ -197,13 +200,8 @@ class SalesSmartVisualizer:
             return None
         
         try:
-            # تحويل المبالغ إلى أرقام
-            df_copy = self.df.copy()
-            df_copy[amount_col] = pd.to_numeric(df_copy[amount_col], errors='coerce')
-            
-            # تجميع حسب الفئة
-            category_sales = df_copy.groupby(category_col)[amount_col].sum().reset_index()
-            category_sales = category_sales.sort_values(amount_col, ascending=False).head(8)
+            # تجميع المبالغ المحوّلة حسب الفئة
+            category_sales = self._group_sum('category', 'total_amount', n=8)
             
             # إنشاء الرسم البياني
             fig = px.bar(
@@ -239,13 +237,8 @@ class SalesSmartVisualizer:
             return None
         
         try:
-            # تحويل المبالغ إلى أرقام
-            df_copy = self.df.copy()
-            df_copy[amount_col] = pd.to_numeric(df_copy[amount_col], errors='coerce')
-            
-            # تجميع حسب المندوب
-            salesperson_performance = df_copy.groupby(salesperson_col)[amount_col].sum().reset_index()
-            salesperson_performance = salesperson_performance.sort_values(amount_col, ascending=False).head(10)
+            # تجميع المبالغ المحوّلة حسب المندوب
+            salesperson_performance = self._group_sum('salesperson', 'total_amount', n=10)
             
             # إنشاء الرسم البياني
             fig = px.bar(
@@ -281,13 +274,14 @@ class SalesSmartVisualizer:
             return None
         
         try:
-            # تحويل البيانات إلى أرقام
-            df_copy = self.df.copy()
-            df_copy[price_col] = pd.to_numeric(df_copy[price_col], errors='coerce')
-            df_copy[quantity_col] = pd.to_numeric(df_copy[quantity_col], errors='coerce')
+            # الحقول المحوّلة من البيانات المُجهّزة
+            df_typed = pd.DataFrame({
+                price_col: self.prepared.numeric('price'),
+                quantity_col: self.prepared.numeric('quantity')
+            })
             
             # تنظيف البيانات
-            df_clean = df_copy.dropna(subset=[price_col, quantity_col])
+            df_clean = df_typed.dropna(subset=[price_col, quantity_col])
             
             if len(df_clean) == 0:
                 return None
@@ -319,7 +313,7 @@ class SalesSmartVisualizer:
             return None
         
         # حساب التوزيع
-        payment_counts = self.df[payment_col].value_counts().reset_index()
+        payment_counts = self.prepared.aggregates().top('payment_method').reset_index()
         payment_counts.columns = ['payment_method', 'count']
         
         # إنشاء مخطط دائري
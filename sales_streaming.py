@@ -0,0 +1,271 @@
+"""
+وحدة التحليل المتدفق لملفات CSV الكبيرة - حساب المؤشرات على دفعات دون تحميل الملف كاملاً
+"""
+
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from sales_data_loader import detect_csv_encoding, ENCODING_FALLBACK_BYTES
+from sales_projection import NUMERIC_FIELDS
+from sales_sketches import DistinctCounter, QuantileSketch, QUANTILE_GROUP_FIELDS
+
+DEFAULT_CHUNK_ROWS = 200_000
+
+# عدد الصفوف المحمّلة من كل CSV للمعاينة وتعيين الأعمدة في وضع التحليل المتدفق
+STREAM_PREVIEW_ROWS = 1000
+
+# الحقول التي تُجمع المبيعات حسبها تراكمياً
+GROUP_FIELDS = ('category', 'region', 'city', 'salesperson', 'payment_method', 'product_name')
+
+
+class SalesKPIAccumulator:
+    """مجمّع تراكمي لمجاميع المؤشرات والاتجاه الشهري ومجاميع المجموعات يُغذّى دفعة بعد دفعة"""
+
+    def __init__(self, column_mapping, distinct_mode='auto'):
+        self.mapping = column_mapping
+        # عدّ العملاء والمنتجات: مجموعة دقيقة أو ملخص HyperLogLog قابل للدمج (DISTINCT_MODES)
+        self.distinct_mode = distinct_mode
+        self.row_count = 0
+        self.sales_sum = None
+        self.cogs_sum = None
+        self.discount_sum = None
+        self.quantity_sum = 0.0
+        self.quantity_count = 0
+        self.quantity_seen = False
+        self.customers = None
+        self.products = None
+        self.monthly = None
+        # أول وآخر تاريخ طلب (فترة التحليل في التقرير)
+        self.first_date = None
+        self.last_date = None
+        self.groups = {}
+        # ملخصات مئينات قيمة المعاملة: للكل ولكل منطقة ومندوب
+        self.quantiles = None
+        self.group_quantiles = {}
+
+    def _add_period(self, first, last):
+        self.first_date = first if self.first_date is None else min(self.first_date, first)
+        self.last_date = last if self.last_date is None else max(self.last_date, last)
+
+    def _column(self, chunk, field):
+        """اسم العمود المعيّن للحقل إذا كان موجوداً في الدفعة"""
+        column = self.mapping.get(field)
+        if column is not None and column in chunk.columns:
+            return column
+        return None
+
+    def update(self, chunk):
+        """إضافة دفعة جديدة من الصفوف إلى المجاميع"""
+        self.row_count += len(chunk)
+
+        amount_col = self._column(chunk, 'total_amount')
+        cost_col = self._column(chunk, 'cost')
+        quantity_col = self._column(chunk, 'quantity')
+        discount_col = self._column(chunk, 'discount')
+        customer_col = self._column(chunk, 'customer_id')
+        product_col = self._column(chunk, 'product_id')
+        date_col = self._column(chunk, 'order_date')
+
+        amounts = pd.to_numeric(chunk[amount_col], errors='coerce') if amount_col else None
+        quantities = pd.to_numeric(chunk[quantity_col], errors='coerce') if quantity_col else None
+
+        # إجمالي المبيعات
+        if amounts is not None:
+            self.sales_sum = (self.sales_sum or 0.0) + amounts.sum()
+
+        # تكلفة البضاعة المباعة
+        if cost_col and amounts is not None:
+            # الضرب بـ float64 حتى لا يفيض حاصل ضرب أعداد صحيحة صغيرة النوع
+            costs = pd.to_numeric(chunk[cost_col], errors='coerce').astype(np.float64)
+            chunk_cogs = (costs * quantities.astype(np.float64)).sum() if quantities is not None else costs.sum()
+            self.cogs_sum = (self.cogs_sum or 0.0) + chunk_cogs
+
+        # الخصم
+        if discount_col and amounts is not None:
+            self.discount_sum = (self.discount_sum or 0.0) + pd.to_numeric(chunk[discount_col], errors='coerce').sum()
+
+        # الكمية (المتوسط = المجموع / عدد القيم الصالحة)
+        if quantities is not None:
+            self.quantity_seen = True
+            self.quantity_sum += quantities.sum()
+            self.quantity_count += int(quantities.count())
+
+        # العملاء والمنتجات الفريدة (القيم الفريدة للدفعة فقط تدخل العدّاد)
+        if customer_col:
+            self.customers = self.customers or DistinctCounter(self.distinct_mode)
+            self.customers.update(chunk[customer_col].dropna().unique())
+        if product_col:
+            self.products = self.products or DistinctCounter(self.distinct_mode)
+            self.products.update(chunk[product_col].dropna().unique())
+
+        # فترة التحليل
+        dates = pd.to_datetime(chunk[date_col], errors='coerce') if date_col else None
+        if dates is not None and dates.notna().any():
+            self._add_period(dates.min(), dates.max())
+
+        # الاتجاه الشهري
+        if dates is not None and amounts is not None:
+            valid = dates.notna() & amounts.notna()
+            if valid.any():
+                chunk_monthly = amounts[valid].groupby(dates[valid].dt.to_period('M')).agg(['sum', 'count'])
+                if self.monthly is None:
+                    self.monthly = chunk_monthly
+                else:
+                    self.monthly = self.monthly.add(chunk_monthly, fill_value=0)
+        
+        # مجاميع المبيعات حسب الفئة والمنطقة والمندوب...
+        if amounts is not None:
+            for field in GROUP_FIELDS:
+                group_col = self._column(chunk, field)
+                if group_col:
+                    chunk_groups = amounts.groupby(chunk[group_col], observed=True).agg(['sum', 'count'])
+                    self._add_groups(field, chunk_groups)
+        
+        # مئينات قيمة المعاملة (ملخص لكل دفعة يُدمج في الملخص التراكمي)
+        if amounts is not None:
+            values = amounts.to_numpy(dtype='float64', na_value=np.nan)
+            self._add_quantiles(None, QuantileSketch.from_values(values))
+            for field in QUANTILE_GROUP_FIELDS:
+                group_col = self._column(chunk, field)
+                if group_col:
+                    codes, uniques = pd.factorize(chunk[group_col])
+                    self._add_quantiles(field, QuantileSketch.from_values(values, codes, uniques))
+
+    def _add_groups(self, field, groups):
+        if field in self.groups:
+            self.groups[field] = self.groups[field].add(groups, fill_value=0)
+        else:
+            # فهرس عادي بدل category حتى تتوافق الدفعات ذات القواميس المختلفة عند الجمع
+            self.groups[field] = groups.set_axis(groups.index.astype(object))
+
+    def _add_quantiles(self, field, sketch):
+        if field is None:
+            self.quantiles = sketch if self.quantiles is None else self.quantiles.merge(sketch)
+        elif field in self.group_quantiles:
+            self.group_quantiles[field].merge(sketch)
+        else:
+            self.group_quantiles[field] = sketch
+
+    def merge(self, other):
+        """دمج مجمّع آخر (ملف أو جزء آخر من البيانات) في هذا المجمّع"""
+        self.row_count += other.row_count
+
+        for attr in ('sales_sum', 'cogs_sum', 'discount_sum'):
+            if getattr(other, attr) is not None:
+                setattr(self, attr, (getattr(self, attr) or 0.0) + getattr(other, attr))
+
+        self.quantity_seen = self.quantity_seen or other.quantity_seen
+        self.quantity_sum += other.quantity_sum
+        self.quantity_count += other.quantity_count
+
+        for attr in ('customers', 'products'):
+            if getattr(other, attr) is not None:
+                counter = getattr(self, attr) or DistinctCounter(self.distinct_mode)
+                setattr(self, attr, counter.merge(getattr(other, attr)))
+
+        if other.monthly is not None:
+            self.monthly = other.monthly.copy() if self.monthly is None else self.monthly.add(other.monthly, fill_value=0)
+
+        if other.first_date is not None:
+            self._add_period(other.first_date, other.last_date)
+
+        for field, groups in other.groups.items():
+            self._add_groups(field, groups)
+
+        # نسخ الملخصات حتى لا يتغيّر المجمّع الآخر عند الدمج اللاحق
+        if other.quantiles is not None:
+            self._add_quantiles(None, QuantileSketch(other.quantiles.counts, other.quantiles.accuracy))
+        for field, sketch in other.group_quantiles.items():
+            self._add_quantiles(field, QuantileSketch(sketch.counts, sketch.accuracy))
+
+        return self
+
+    def totals(self):
+        """المجاميع الخام بنفس بنية SalesDataAnalyzer._calculate_kpi_totals"""
+        totals = {'total_transactions': self.row_count}
+
+        if self.sales_sum is not None:
+            totals['total_sales'] = self.sales_sum
+        if self.cogs_sum is not None:
+            totals['total_cogs'] = self.cogs_sum
+        for key, counter in (('unique_customers', self.customers), ('unique_products', self.products)):
+            if counter is not None:
+                totals[key] = counter.count()
+                if counter.approximate:
+                    totals.setdefault('distinct_error', {})[key] = counter.relative_error
+        if self.quantity_seen:
+            totals['avg_quantity'] = self.quantity_sum / self.quantity_count if self.quantity_count else np.nan
+        if self.discount_sum is not None:
+            totals['total_discount'] = self.discount_sum
+        if self.quantiles is not None:
+            totals['transaction_quantiles'] = self.quantiles.quantiles()
+
+        return totals
+
+    def monthly_trend(self):
+        """الاتجاه الشهري بنفس بنية trends['monthly']"""
+        if self.monthly is None or len(self.monthly) == 0:
+            return []
+
+        monthly_trend = self.monthly.sort_index().reset_index()
+        monthly_trend.columns = ['year_month', 'sum', 'count']
+        monthly_trend['year_month'] = monthly_trend['year_month'].astype(str)
+        monthly_trend['count'] = monthly_trend['count'].astype(int)
+
+        return monthly_trend.to_dict('records')
+
+    def percentiles(self):
+        """مئينات قيمة المعاملة بنفس بنية SalesDataAnalyzer._analyze_percentiles"""
+        if self.quantiles is None:
+            return {}
+        percentiles = {'overall': self.quantiles.quantiles()}
+        for field, sketch in self.group_quantiles.items():
+            percentiles[field] = sketch.records()
+        return percentiles
+
+    def group_totals(self):
+        """مجاميع المبيعات لكل حقل تجميع مرتبة تنازلياً: {field: [{'value', 'sum', 'count'}]}"""
+        totals = {}
+        for field, groups in self.groups.items():
+            ordered = groups.sort_values('sum', ascending=False)
+            totals[field] = [
+                {'value': value, 'sum': float(row['sum']), 'count': int(row['count'])}
+                for value, row in ordered.iterrows()
+            ]
+        return totals
+
+
+def stream_csv(source, column_mapping, chunksize=DEFAULT_CHUNK_ROWS, accumulator=None):
+    """
+    قراءة ملف CSV (مسار أو بايتات) على دفعات وتغذية المجمّع بها.
+
+    تُقرأ الأعمدة المعيّنة فقط، ولا يتم الاحتفاظ بأكثر من دفعة واحدة في الذاكرة. الأعمدة غير الرقمية
+    (المفاتيح والتجميعات) تُقرأ نصوصاً حتى لا يُستنتج نوعها لكل دفعة على حدة فيُعدّ 1 و "1" مفتاحين.
+    """
+    if accumulator is None:
+        accumulator = SalesKPIAccumulator(column_mapping)
+
+    if isinstance(source, (bytes, bytearray)):
+        encoding = detect_csv_encoding(bytes(source))['encoding']
+        handle = BytesIO(source)
+    else:
+        with open(source, 'rb') as f:
+            encoding = detect_csv_encoding(f.read(ENCODING_FALLBACK_BYTES))['encoding']
+        handle = open(source, 'rb')
+
+    try:
+        header = pd.read_csv(handle, encoding=encoding, nrows=0).columns.tolist()
+        usecols = [column for column in header if column in set(column_mapping.values())] or header[:1]
+        measures = {column_mapping[field] for field in NUMERIC_FIELDS if field in column_mapping}
+        dtype = {column: str for column in usecols if column not in measures}
+
+        handle.seek(0)
+        for chunk in pd.read_csv(handle, encoding=encoding, encoding_errors='replace',
+                                 usecols=usecols, dtype=dtype, chunksize=chunksize):
+            accumulator.update(chunk)
+    finally:
+        handle.close()
+
+    return accumulator
@@ -0,0 +1,534 @@
+"""
+نظام الترجمة ثنائي اللغة - مستقل عن Streamlit حتى يُستخدم في لوحة التحكم ووضع الدفعات
+"""
+
+DEFAULT_LANGUAGE = 'ar'
+
+
+class TranslationSystem:
+    """نظام ترجمة متكامل ثنائي اللغة"""
+    
+    TRANSLATIONS = {
+        'ar': {
+            # العنوان الرئيسي
+            'dashboard_title': '📊 لوحة تحكم المبيعات الذكية',
+            'dashboard_subtitle': 'تحليل احترافي لبيانات المبيعات - مصمم للشركات الصغيرة والمتوسطة',
+            'audience_target': 'هذا المنتج مصمم للشركات الصغيرة والمتوسطة لفهم أداء المبيعات بسرعة',
+            
+            # الشريط الجانبي
+            'sidebar_settings': '⚙️ الإعدادات',
+            'language': 'اللغة',
+            'theme': 'المظهر',
+            'light_theme': '☀️ فاتح',
+            'dark_theme': '🌙 مظلم',
+            'load_settings': '📥 تحميل الإعدادات',
+            'save_settings': '💾 حفظ الإعدادات',
+            'settings_loaded': 'تم تحميل الإعدادات السابقة',
+            'settings_saved': 'تم حفظ الإعدادات',
+            'no_settings': 'لا توجد إعدادات سابقة',
+            'reset': '🔄 إعادة تعيين',
+            
+            # رفع الملفات
+            'step_1': 'الخطوة 1: رفع الملفات',
+            'upload_title': '📤 رفع ملفات المبيعات',
+            'upload_hint': 'اسحب وأفلت ملفات Excel أو CSV هنا أو انقر للاختيار',
+            'upload_supported': 'يدعم: Excel (.xlsx, .xls), CSV',
+            'upload_success': '✅ تم تحميل {count} ملف بنجاح!',
+            'upload_error': '❌ خطأ في تحميل الملف:',
+            'file_info': '📄 معلومات الملف',
+            'file_name': 'اسم الملف',
+            'file_size': 'حجم الملف',
+            'rows': 'عدد الصفوف',
+            'columns': 'عدد الأعمدة',
+            'load_time': 'زمن التحميل',
+            'encoding': 'الترميز',
+            'loaded_from_cache': '⚡ تم التحميل من الذاكرة المؤقتة دون إعادة تحليل الملف',
+            'loaded_from_store': '💾 تم فتح الملف من المخزن المحلي دون إعادة تحليله',
+            'memory_compaction': '🗜️ الذاكرة بعد ضغط الأنواع: {after} ميجابايت بدلاً من {before} ميجابايت (توفير {saved}%)',
+            'memory_compaction_total': '🗜️ ضغط أنواع البيانات وفّر {saved} ميجابايت من الذاكرة ({percent}%)',
+            'dataset_store': '💾 البيانات المحفوظة',
+            'dataset_store_usage': 'المساحة المستخدمة: {used} من {quota} ميجابايت',
+            'dataset_store_empty': 'لا توجد بيانات محفوظة بعد',
+            'open_dataset': 'فتح',
+            'delete_dataset': 'حذف',
+            'parallel_loading': '⚡ تحميل متوازي للملفات',
+            'reader_backend': 'محرك قراءة الملفات',
+            'duplicate_key': 'مفتاح كشف التكرار',
+            'duplicate_key_all': 'كل الأعمدة المعيّنة',
+            'duplicate_key_order_id': 'رقم الطلب',
+            'duplicate_key_order_product': 'رقم الطلب + المنتج',
+            'distinct_mode': 'عدّ العملاء والمنتجات الفريدة',
+            'distinct_mode_auto': 'تلقائي (دقيق للبيانات الصغيرة)',
+            'distinct_mode_exact': 'دقيق',
+            'distinct_mode_sketch': 'تقريبي (HyperLogLog)',
+            'streaming_mode': '🌊 تحليل متدفق لملفات CSV الكبيرة',
+            'streaming_preview_note': 'وضع التحليل المتدفق: تم تحميل أول {rows} صف للمعاينة وتعيين الأعمدة فقط، ويتم التحليل على الملف كاملاً على دفعات',
+            'append_mode': '➕ إلحاق الملفات الجديدة بالبيانات السابقة',
+            'append_status': '➕ وضع الإلحاق: {files} ملف، {rows} صف ({new} ملف جديد في هذا التحليل)',
+            'append_reset': 'بدء بيانات إلحاق جديدة',
+            'preview': '👀 معاينة البيانات',
+            'preview_rows': 'عرض أول 5 صفوف',
+            'merge_files': '🔗 دمج الملفات',
+            'use_merged': 'استخدام البيانات المدمجة',
+            'use_single': 'استخدام ملف واحد',
+            'merged_success': '✅ تم دمج الملفات بنجاح!',
+            'merge_schema': '🧬 مخطط البيانات المدمجة',
+            'merge_memory': 'الذاكرة: {before} ميجابايت قبل الدمج، {after} ميجابايت بعده',
+            'merge_zero_copy': 'دمج Arrow بدون نسخ',
+            
+            # الإحصائيات
+            'statistics': '📈 الإحصائيات',
+            'total_files': 'عدد الملفات',
+            'total_records': 'عدد السجلات',
+            'total_columns': 'عدد الأعمدة',
+            'numeric_columns': 'أعمدة رقمية',
+            'merged_data': 'بيانات مدمجة',
+            'individual_file': 'ملف فردي',
+            
+            # تعيين الأعمدة
+            'step_2': 'الخطوة 2: تعيين الأعمدة',
+            'mapping_title': '🎯 تعيين أعمدة البيانات',
+            'auto_detection': '💡 التعرف التلقائي',
+            'auto_detection_desc': 'النظام حاول تخمين أنواع الأعمدة. يمكنك تعديلها يدوياً إذا لزم الأمر.',
+            'not_available': '❌ غير متوفر',
+            
+            # فئات الأعمدة
+            'category_order': 'معلومات الطلب',
+            'category_customer': 'معلومات العميل',
+            'category_product': 'معلومات المنتج',
+            'category_financial': 'المعلومات المالية',
+            'category_location': 'الموقع',
+            'category_sales': 'معلومات المبيعات',
+            
+            # أسماء الحقول
+            'field_order_id': 'رقم الطلب',
+            'field_customer_id': 'رقم العميل',
+            'field_customer_name': 'اسم العميل',
+            'field_product_id': 'رقم المنتج',
+            'field_product_name': 'اسم المنتج',
+            'field_category': 'الفئة',
+            'field_quantity': 'الكمية',
+            'field_unit_price': 'سعر الوحدة',
+            'field_total_amount': 'المبلغ الإجمالي',
+            'field_order_date': 'تاريخ الطلب',
+            'field_region': 'المنطقة',
+            'field_city': 'المدينة',
+            'field_country': 'البلد',
+            'field_salesperson': 'مندوب المبيعات',
+            'field_payment_method': 'طريقة الدفع',
+            'field_discount': 'الخصم',
+            'field_cost': 'التكلفة',
+            'field_status': 'حالة الطلب',
+            
+            # التحليل
+            'step_3': 'الخطوة 3: التحليل',
+            'analyze_button': '🚀 بدء التحليل',
+            'analysis_title': '📊 نتائج تحليل المبيعات',
+            'loading_analysis': 'جاري تحليل البيانات...',
+            'analysis_projection': '🎯 إطار التحليل: {columns} عمود معيّن، {size} ميجابايت بدلاً من {original} ميجابايت',
+            'section_cache_stats': '🧠 أقسام التحليل: {misses} محسوبة، {hits} من الذاكرة',
+            'cube_title': 'تقطيع سريع (مكعب المبيعات)',
+            'cube_breakdown': 'التوزيع حسب',
+            'cube_trend': 'المبيعات الشهرية',
+            'cube_stats': '⚡ {cells} خلية في المكعب ({size} كيلوبايت) - الاستجابة {ms} مللي ثانية',
+            'filters_title': 'المرشحات',
+            'filter_date_range': 'نطاق التاريخ',
+            'filter_status': '🔎 التحليل على {rows} من {total} صف بعد التصفية',
+            'filter_empty': 'لا توجد صفوف مطابقة للمرشحات المختارة',
+            
+            # KPIs
+            'kpis_title': '📈 المؤشرات الرئيسية',
+            'kpi_transactions': 'إجمالي المعاملات',
+            'kpi_sales': 'إجمالي المبيعات',
+            'kpi_avg_transaction': 'متوسط قيمة المعاملة',
+            'kpi_customers': 'عدد العملاء',
+            'kpi_products': 'عدد المنتجات',
+            'kpi_avg_quantity': 'متوسط الكمية',
+            'kpi_discount_rate': 'معدل الخصم',
+            'kpi_p50_transaction': 'وسيط قيمة المعاملة',
+            'kpi_p90_transaction': 'المئين 90 لقيمة المعاملة',
+            'kpi_p99_transaction': 'المئين 99 لقيمة المعاملة',
+            'percentiles_title': 'مئينات قيمة المعاملة حسب المنطقة والمندوب',
+            'growth_title': 'النمو',
+            'growth_by_group': 'النمو حسب المنطقة والمندوب',
+            'segments_title': 'شرائح العملاء (RFM)',
+            'portfolio_title': 'محفظة المنتجات (ABC / باريتو)',
+            'portfolio_class': 'الفئة',
+            'portfolio_products': 'المنتجات',
+            'portfolio_pareto': 'منحنى باريتو: % من المنتجات مقابل % من الإيرادات',
+            'portfolio_long_tail': '⚠️ {count} منتج من الفئة C بهامش سالب (خسارة ${loss})',
+            'leaderboard_top': 'الأعلى',
+            'leaderboard_bottom': 'الأدنى',
+            'segment_customers': 'العملاء',
+            'segment_revenue_share': 'حصة الإيرادات %',
+            'segment_champions': 'الأبطال',
+            'segment_loyal': 'المخلصون',
+            'segment_potential': 'واعدون',
+            'segment_need_attention': 'بحاجة لاهتمام',
+            'segment_at_risk': 'معرّضون للفقد',
+            'segment_hibernating': 'خاملون',
+            'segment_lost': 'مفقودون',
+            'kpi_mom_growth': 'النمو الشهري',
+            'kpi_qoq_growth': 'النمو الربعي',
+            'kpi_yoy_growth': 'النمو السنوي',
+            'kpi_trailing_sales': 'مبيعات آخر {days} يوماً',
+            'gross_profit': 'الربح الإجمالي',
+            'gross_margin': 'هامش الربح الإجمالي',
+            
+            # التعريفات
+            'def_gross_profit': 'المبلغ المتبقي من الإيرادات بعد خصم تكلفة البضاعة المباعة',
+            'def_gross_margin': 'النسبة المئوية للإيرادات المتبقية بعد خصم تكلفة البضاعة المباعة',
+            'def_distinct_estimate': 'عدد تقديري (HyperLogLog) بخطأ نسبي ±{error}%',
+            'def_percentile': '{percent}% من المعاملات قيمتها لا تتجاوز هذا المبلغ (تقدير بخطأ ≤1%)',
+            'def_period_growth': 'مبيعات {current} مقارنة بـ {previous}',
+            'def_window_growth': 'مقارنة بالـ {days} يوماً السابقة: {growth}',
+            'def_total_sales': 'إجمالي الإيرادات من جميع المعاملات',
+            'def_transactions': 'عدد الفواتير أو المعاملات المكتملة',
+            
+            # الرسوم البيانية
+            'charts_title': '📊 الرسوم البيانية',
+            'chart_sales_trend': 'اتجاه المبيعات الشهري',
+            'chart_top_products': 'أفضل 10 منتجات مبيعاً',
+            'chart_region_dist': 'توزيع المبيعات حسب المنطقة',
+            'chart_category_dist': 'توزيع المبيعات حسب الفئة',
+            'chart_sales_performance': 'أداء مندوبي المبيعات',
+            'chart_price_quantity': 'العلاقة بين السعر والكمية',
+            'chart_payment_methods': 'توزيع طرق الدفع',
+            'chart_profit_dist': 'توزيع الأرباح',
+            'no_charts_data': '⚠️ لا توجد بيانات كافية لإنشاء الرسوم البيانية',
+            
+            # التقرير
+            'report_title': '📄 التقرير التحليلي',
+            'generate_report': '📋 إنشاء التقرير',
+            'copy_report': '📋 نسخ التقرير',
+            'report_copied': '✅ تم نسخ التقرير إلى الحافظة',
+            'executive_summary': 'الملخص التنفيذي',
+            'key_findings': 'النقاط الرئيسية',
+            'performance_analysis': 'تحليل الأداء',
+            'recommendations': 'التوصيات الاستراتيجية',
+            'data_quality': 'جودة البيانات',
+            'report_date': 'تاريخ التقرير',
+            'analysis_period': 'فترة التحليل',
+            'total_analysis': 'إجمالي التحليل',
+            'top_performers': 'الأفضل أداءً',
+            'areas_improvement': 'مجالات التحسين',
+            
+            # جودة البيانات
+            'data_quality_title': '🔍 جودة البيانات',
+            'quality_table_title': 'جودة الأعمدة',
+            'streaming_missing_file': '⚠️ الملف {name} لم يعد مرفوعاً - استُبعد من المجاميع (المعاينة وحدها لا تمثل الملف). أعد رفعه لتضمينه',
+            'quality_sampled': 'الفحص من عيّنة {rows} من {total} صف ({ms} ms) - الأعداد مقدّرة للبيانات كلها',
+            'missing_values': 'قيم مفقودة',
+            'duplicates': 'سجلات مكررة',
+            'negative_amounts': 'مبالغ سلبية',
+            'invalid_quantities': 'كميات غير منطقية',
+            'future_dates': 'تواريخ مستقبلية',
+            
+            # الأزرار العامة
+            'download': 'تحميل',
+            'copy': 'نسخ',
+            'close': 'إغلاق',
+            'back': 'رجوع',
+            'next': 'التالي',
+            'finish': 'إنهاء',
+            
+            # الرسائل
+            'no_data': 'لم يتم تحميل بيانات بعد',
+            'select_file_first': 'يرجى رفع ملف أولاً',
+            'select_columns': 'يرجى تعيين الأعمدة أولاً',
+            'analysis_complete': 'تم التحليل بنجاح',
+            'error': 'خطأ',
+            'warning': 'تحذير',
+            'success': 'نجاح',
+            'info': 'معلومة',
+            'definition': 'تعريف',
+            'explanation': 'تفسير',
+            
+            # تعريفات النقاط
+            'missing_values_desc': 'نسبة البيانات الناقصة في هذا العمود',
+            'duplicates_desc': 'سجلات متكررة قد تؤثر على دقة التحليل',
+            'data_uniqueness_desc': 'تكرر العملاء أو المنتجات - طبيعي في بيانات التجزئة',
+        },
+        
+        'en': {
+            # Main Title
+            'dashboard_title': '📊 Smart Sales Analytics Dashboard',
+            'dashboard_subtitle': 'Professional sales data analysis - Designed for small and medium businesses',
+            'audience_target': 'This product is designed for small and medium businesses to quickly understand sales performance',
+            
+            # Sidebar
+            'sidebar_settings': '⚙️ Settings',
+            'language': 'Language',
+            'theme': 'Theme',
+            'light_theme': '☀️ Light',
+            'dark_theme': '🌙 Dark',
+            'load_settings': '📥 Load Settings',
+            'save_settings': '💾 Save Settings',
+            'settings_loaded': 'Previous settings loaded',
+            'settings_saved': 'Settings saved',
+            'no_settings': 'No previous settings',
+            'reset': '🔄 Reset',
+            
+            # File Upload
+            'step_1': 'Step 1: Upload Files',
+            'upload_title': '📤 Upload Sales Files',
+            'upload_hint': 'Drag and drop Excel or CSV files here or click to browse',
+            'upload_supported': 'Supports: Excel (.xlsx, .xls), CSV',
+            'upload_success': '✅ Successfully uploaded {count} file(s)!',
+            'upload_error': '❌ Error loading file:',
+            'file_info': '📄 File Information',
+            'file_name': 'File Name',
+            'file_size': 'File Size',
+            'rows': 'Rows',
+            'columns': 'Columns',
+            'load_time': 'Load Time',
+            'encoding': 'Encoding',
+            'loaded_from_cache': '⚡ Loaded from cache without re-parsing the file',
+            'loaded_from_store': '💾 Opened from the local dataset store without re-parsing',
+            'memory_compaction': '🗜️ Memory after dtype compaction: {after} MB instead of {before} MB ({saved}% saved)',
+            'memory_compaction_total': '🗜️ Dtype compaction saved {saved} MB of memory ({percent}%)',
+            'dataset_store': '💾 Saved Datasets',
+            'dataset_store_usage': 'Used: {used} of {quota} MB',
+            'dataset_store_empty': 'No saved datasets yet',
+            'open_dataset': 'Open',
+            'delete_dataset': 'Delete',
+            'parallel_loading': '⚡ Parallel file loading',
+            'reader_backend': 'File reader backend',
+            'duplicate_key': 'Duplicate detection key',
+            'duplicate_key_all': 'All mapped columns',
+            'duplicate_key_order_id': 'Order ID',
+            'duplicate_key_order_product': 'Order ID + Product',
+            'distinct_mode': 'Unique customers/products counting',
+            'distinct_mode_auto': 'Automatic (exact for small data)',
+            'distinct_mode_exact': 'Exact',
+            'distinct_mode_sketch': 'Approximate (HyperLogLog)',
+            'streaming_mode': '🌊 Streaming analysis for large CSV files',
+            'streaming_preview_note': 'Streaming mode: only the first {rows} rows were loaded for preview and column mapping; the analysis runs over the full file in chunks',
+            'append_mode': '➕ Append new files to previous data',
+            'append_status': '➕ Append mode: {files} files, {rows} rows ({new} new files in this run)',
+            'append_reset': 'Start a new append dataset',
+            'preview': '👀 Data Preview',
+            'preview_rows': 'Show first 5 rows',
+            'merge_files': '🔗 Merge Files',
+            'use_merged': 'Use Merged Data',
+            'use_single': 'Use Single File',
+            'merged_success': '✅ Files merged successfully!',
+            'merge_schema': '🧬 Merged schema',
+            'merge_memory': 'Memory: {before} MB before merge, {after} MB after',
+            'merge_zero_copy': 'Zero-copy Arrow merge',
+            
+            # Statistics
+            'statistics': '📈 Statistics',
+            'total_files': 'Total Files',
+            'total_records': 'Total Records',
+            'total_columns': 'Total Columns',
+            'numeric_columns': 'Numeric Columns',
+            'merged_data': 'Merged Data',
+            'individual_file': 'Individual File',
+            
+            # Column Mapping
+            'step_2': 'Step 2: Map Columns',
+            'mapping_title': '🎯 Data Column Mapping',
+            'auto_detection': '💡 Auto Detection',
+            'auto_detection_desc': 'System tried to guess column types. You can adjust manually if needed.',
+            'not_available': '❌ Not Available',
+            
+            # Column Categories
+            'category_order': 'Order Information',
+            'category_customer': 'Customer Information',
+            'category_product': 'Product Information',
+            'category_financial': 'Financial Information',
+            'category_location': 'Location',
+            'category_sales': 'Sales Information',
+            
+            # Field Names
+            'field_order_id': 'Order ID',
+            'field_customer_id': 'Customer ID',
+            'field_customer_name': 'Customer Name',
+            'field_product_id': 'Product ID',
+            'field_product_name': 'Product Name',
+            'field_category': 'Category',
+            'field_quantity': 'Quantity',
+            'field_unit_price': 'Unit Price',
+            'field_total_amount': 'Total Amount',
+            'field_order_date': 'Order Date',
+            'field_region': 'Region',
+            'field_city': 'City',
+            'field_country': 'Country',
+            'field_salesperson': 'Salesperson',
+            'field_payment_method': 'Payment Method',
+            'field_discount': 'Discount',
+            'field_cost': 'Cost',
+            'field_status': 'Order Status',
+            
+            # Analysis
+            'step_3': 'Step 3: Analysis',
+            'analyze_button': '🚀 Start Analysis',
+            'analysis_title': '📊 Sales Analysis Results',
+            'loading_analysis': 'Analyzing data...',
+            'analysis_projection': '🎯 Analysis frame: {columns} mapped columns, {size} MB instead of {original} MB',
+            'section_cache_stats': '🧠 Analysis sections: {misses} computed, {hits} reused',
+            'cube_title': 'Quick slicing (sales cube)',
+            'cube_breakdown': 'Breakdown by',
+            'cube_trend': 'Monthly sales',
+            'cube_stats': '⚡ {cells} cube cells ({size} KB) - answered in {ms} ms',
+            'filters_title': 'Filters',
+            'filter_date_range': 'Date range',
+            'filter_status': '🔎 Analyzing {rows} of {total} rows after filtering',
+            'filter_empty': 'No rows match the selected filters',
+            
+            # KPIs
+            'kpis_title': '📈 Key Performance Indicators',
+            'kpi_transactions': 'Total Transactions',
+            'kpi_sales': 'Total Sales',
+            'kpi_avg_transaction': 'Average Transaction Value',
+            'kpi_customers': 'Number of Customers',
+            'kpi_products': 'Number of Products',
+            'kpi_avg_quantity': 'Average Quantity',
+            'kpi_discount_rate': 'Discount Rate',
+            'kpi_p50_transaction': 'Median Transaction Value',
+            'kpi_p90_transaction': 'P90 Transaction Value',
+            'kpi_p99_transaction': 'P99 Transaction Value',
+            'percentiles_title': 'Transaction value percentiles by region and salesperson',
+            'growth_title': 'Growth',
+            'growth_by_group': 'Growth by region and salesperson',
+            'segments_title': 'Customer segments (RFM)',
+            'portfolio_title': 'Product portfolio (ABC / Pareto)',
+            'portfolio_class': 'Class',
+            'portfolio_products': 'Products',
+            'portfolio_pareto': 'Pareto curve: % of products vs % of revenue',
+            'portfolio_long_tail': '⚠️ {count} class C products have a negative margin (loss of ${loss})',
+            'leaderboard_top': 'Top',
+            'leaderboard_bottom': 'Bottom',
+            'segment_customers': 'Customers',
+            'segment_revenue_share': 'Revenue share %',
+            'segment_champions': 'Champions',
+            'segment_loyal': 'Loyal',
+            'segment_potential': 'Potential',
+            'segment_need_attention': 'Need attention',
+            'segment_at_risk': 'At risk',
+            'segment_hibernating': 'Hibernating',
+            'segment_lost': 'Lost',
+            'kpi_mom_growth': 'Month-over-Month Growth',
+            'kpi_qoq_growth': 'Quarter-over-Quarter Growth',
+            'kpi_yoy_growth': 'Year-over-Year Growth',
+            'kpi_trailing_sales': 'Sales, last {days} days',
+            'gross_profit': 'Gross Profit',
+            'gross_margin': 'Gross Margin',
+            
+            # Definitions
+            'def_gross_profit': 'Revenue remaining after deducting cost of goods sold',
+            'def_gross_margin': 'Percentage of revenue remaining after deducting cost of goods sold',
+            'def_distinct_estimate': 'Estimated count (HyperLogLog), ±{error}% relative error',
+            'def_percentile': '{percent}% of transactions are at or below this amount (estimate within 1%)',
+            'def_period_growth': 'Sales in {current} compared with {previous}',
+            'def_window_growth': 'Compared with the previous {days} days: {growth}',
+            'def_total_sales': 'Total revenue from all transactions',
+            'def_transactions': 'Number of completed invoices or transactions',
+            
+            # Charts
+            'charts_title': '📊 Charts & Visualizations',
+            'chart_sales_trend': 'Monthly Sales Trend',
+            'chart_top_products': 'Top 10 Selling Products',
+            'chart_region_dist': 'Sales Distribution by Region',
+            'chart_category_dist': 'Sales Distribution by Category',
+            'chart_sales_performance': 'Salesperson Performance',
+            'chart_price_quantity': 'Price vs Quantity Relationship',
+            'chart_payment_methods': 'Payment Methods Distribution',
+            'chart_profit_dist': 'Profit Distribution',
+            'no_charts_data': '⚠️ Insufficient data to generate charts',
+            
+            # Report
+            'report_title': '📄 Analytical Report',
+            'generate_report': '📋 Generate Report',
+            'copy_report': '📋 Copy Report',
+            'report_copied': '✅ Report copied to clipboard',
+            'executive_summary': 'Executive Summary',
+            'key_findings': 'Key Findings',
+            'performance_analysis': 'Performance Analysis',
+            'recommendations': 'Strategic Recommendations',
+            'data_quality': 'Data Quality',
+            'report_date': 'Report Date',
+            'analysis_period': 'Analysis Period',
+            'total_analysis': 'Total Analysis',
+            'top_performers': 'Top Performers',
+            'areas_improvement': 'Areas for Improvement',
+            
+            # Data Quality
+            'data_quality_title': '🔍 Data Quality',
+            'quality_table_title': 'Column Quality',
+            'streaming_missing_file': '⚠️ {name} is no longer uploaded and was left out of the totals (its preview alone does not represent the file). Upload it again to include it',
+            'quality_sampled': 'Profiled from a sample of {rows} of {total} rows ({ms} ms) - counts are estimated for the full data',
+            'missing_values': 'Missing Values',
+            'duplicates': 'Duplicate Records',
+            'negative_amounts': 'Negative Amounts',
+            'invalid_quantities': 'Invalid Quantities',
+            'future_dates': 'Future Dates',
+            
+            # General Buttons
+            'download': 'Download',
+            'copy': 'Copy',
+            'close': 'Close',
+            'back': 'Back',
+            'next': 'Next',
+            'finish': 'Finish',
+            
+            # Messages
+            'no_data': 'No data loaded yet',
+            'select_file_first': 'Please upload a file first',
+            'select_columns': 'Please map columns first',
+            'analysis_complete': 'Analysis completed successfully',
+            'error': 'Error',
+            'warning': 'Warning',
+            'success': 'Success',
+            'info': 'Info',
+            'definition': 'Definition',
+            'explanation': 'Explanation',
+            
+            # Point definitions
+            'missing_values_desc': 'Percentage of missing data in this column',
+            'duplicates_desc': 'Duplicate records that may affect analysis accuracy',
+            'data_uniqueness_desc': 'Repeated customers or products - expected in retail datasets',
+        }
+    }
+    
+    # مصدر اللغة الحالية: لوحة التحكم تربطه بحالة الجلسة ووضع الدفعات يثبّته على لغة واحدة
+    _language_source = None
+    
+    @classmethod
+    def set_language_source(cls, source):
+        """تحديد مصدر اللغة: رمز لغة ثابت ('ar' أو 'en') أو دالة تعيده"""
+        cls._language_source = source
+    
+    @classmethod
+    def current_language(cls):
+        """اللغة الحالية"""
+        source = cls._language_source
+        if callable(source):
+            return source()
+        return source or DEFAULT_LANGUAGE
+    
+    @classmethod
+    def t(cls, key, **kwargs):
+        """ترجمة النص بناءً على اللغة الحالية"""
+        lang = cls.current_language()
+        translation = cls.TRANSLATIONS.get(lang, cls.TRANSLATIONS['ar']).get(key, key)
+        
+        if kwargs:
+            try:
+                return translation.format(**kwargs)
+            except:
+                return translation
+        return translation
+    
+    @classmethod
+    def get_language_direction(cls):
+        """الحصول على اتجاه النص للغة الحالية"""
+        lang = cls.current_language()
+        return 'rtl' if lang == 'ar' else 'ltr'
+    
+    @classmethod
+    def get_font_family(cls):
+        """الحصول على خط النص للغة الحالية"""
+        lang = cls.current_language()
+        return "'Cairo', 'Segoe UI', sans-serif" if lang == 'ar' else "'Segoe UI', Tahoma, Geneva, sans-serif"
@@ -0,0 +1,143 @@
+"""
+ذاكرة مؤقتة للملفات المحلَّلة مفهرسة ببصمة المحتوى - لتجنب إعادة التحليل مع كل إعادة تشغيل لـ Streamlit
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def content_hash(content):
+    """بصمة سريعة لمحتوى الملف"""
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+def upload_key(content, **options):
+    """مفتاح ملف محلَّل: بصمة المحتوى + خيارات القراءة"""
+    options_part = ','.join(f"{name}={options[name]}" for name in sorted(options))
+    return f"{content_hash(content)}|{options_part}"
+
+
+class ParsedUploadCache:
+    """
+    ذاكرة LRU للملفات المحلَّلة بحد أقصى للحجم بالبايت.
+
+    عند تحديد spill_dir تُحفظ العناصر المُزاحة كملفات Parquet محلية
+    ويُعاد تحميلها منها بدلاً من إعادة تحليل الملف الأصلي.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, spill_dir=None):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def get(self, key):
+        """إرجاع النتيجة المخزنة أو None"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+
+        result = self._load_spilled(key)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        self.put(key, result)
+        return result
+
+    def put(self, key, result):
+        """تخزين نتيجة تحليل ملف (قاموس يحتوي dataframe)"""
+        size = int(result['dataframe'].memory_usage(deep=True).sum())
+        if size > self.max_bytes:
+            self._spill(key, result)
+            return
+
+        evicted = []
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (result, size)
+            self.current_bytes += size
+
+            while self.current_bytes > self.max_bytes:
+                old_key, (old_result, old_size) = self._entries.popitem(last=False)
+                self.current_bytes -= old_size
+                evicted.append((old_key, old_result))
+
+        for old_key, old_result in evicted:
+            self._spill(old_key, old_result)
+
+    def clear(self):
+        """تفريغ الذاكرة (لا يحذف ملفات Parquet)"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """إحصائيات الاستخدام"""
+        return {
+            'entries': len(self._entries),
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+    def _spill_paths(self, key):
+        """مسارات ملف البيانات وملف الوصف لمفتاح معيّن"""
+        name = hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+        base = os.path.join(self.spill_dir, name)
+        return base + '.parquet', base + '.json'
+
+    def _spill(self, key, result):
+        """حفظ نتيجة مُزاحة كملف Parquet"""
+        if not self.spill_dir:
+            return
+
+        data_path, meta_path = self._spill_paths(key)
+        if os.path.exists(data_path):
+            return
+
+        try:
+            result['dataframe'].to_parquet(data_path)
+            meta = {name: value for name, value in result.items() if name != 'dataframe'}
+            with open(meta_path, 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+        except Exception:
+            # أنواع بيانات لا يدعمها Parquet (أعمدة مختلطة مثلاً): نتخلى عن الحفظ فقط
+            for path in (data_path, meta_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def _load_spilled(self, key):
+        """تحميل نتيجة محفوظة من Parquet إن وجدت"""
+        if not self.spill_dir:
+            return None
+
+        data_path, meta_path = self._spill_paths(key)
+        if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+            return None
+
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+            result['dataframe'] = pd.read_parquet(data_path)
+            return result
+        except Exception:
+            return None
@@ -0,0 +1,60 @@
+"""
+بيانات مبيعات صغيرة مشتركة بين الاختبارات - كل محرك يُقارن بحساب pandas مباشر عليها
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+SALES_MAPPING = {
+    'order_id': 'Order ID',
+    'order_date': 'Order Date',
+    'customer_id': 'Customer ID',
+    'product_id': 'Product ID',
+    'product_name': 'Product Name',
+    'category': 'Category',
+    'quantity': 'Quantity',
+    'total_amount': 'Total Amount',
+    'cost': 'Cost',
+    'discount': 'Discount',
+    'region': 'Region',
+    'city': 'City',
+    'salesperson': 'Salesperson',
+    'payment_method': 'Payment Method',
+    'status': 'Status',
+}
+
+
+def make_sales(seed=0, rows=600):
+    """طلبات عشوائية على ~14 شهراً بقيم فئوية قليلة التنوع ومنتجات بهامش سالب أحياناً"""
+    rng = np.random.default_rng(seed)
+    products = rng.integers(0, 25, rows)
+    quantity = rng.integers(1, 6, rows)
+    unit_price = 10.0 + products * 3.0
+    return pd.DataFrame({
+        'Order ID': np.arange(rows) + seed * rows,
+        'Order Date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 425, rows), unit='D'),
+        'Customer ID': [f'C{value}' for value in rng.integers(0, 40, rows)],
+        'Product ID': [f'P{value}' for value in products],
+        'Product Name': [f'Product {value}' for value in products],
+        'Category': rng.choice(['Electronics', 'Books', 'Home'], rows),
+        'Quantity': quantity,
+        'Total Amount': np.round(quantity * unit_price * rng.uniform(0.8, 1.2, rows), 2),
+        'Cost': np.round(unit_price * np.where(products % 7 == 0, 1.4, 0.6), 2),
+        'Discount': np.round(rng.uniform(0, 5, rows), 2),
+        'Region': rng.choice(['North', 'South', 'East', 'West'], rows),
+        'City': rng.choice(['Riyadh', 'Jeddah', 'Dammam', 'Abha', 'Taif'], rows),
+        'Salesperson': rng.choice(['Ali', 'Sara', 'Omar', 'Lina', 'Huda'], rows),
+        'Payment Method': rng.choice(['Cash', 'Card'], rows),
+        'Status': rng.choice(['Completed', 'Returned'], rows, p=[0.9, 0.1]),
+    })
+
+
+@pytest.fixture
+def sales_df():
+    return make_sales()
+
+
+@pytest.fixture
+def mapping():
+    return dict(SALES_MAPPING)
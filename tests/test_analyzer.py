@@ -0,0 +1,49 @@
+"""
+اختبارات المحلل خارج Streamlit - المؤشرات والاتجاهات تطابق حسابات pandas المباشرة
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+from sales_analyzer import SalesDataAnalyzer
+from sales_translations import TranslationSystem
+
+
+def test_analyzer_imports_without_streamlit():
+    code = "import sys, sales_analyzer, sales_batch; sys.exit('streamlit' in sys.modules)"
+    assert subprocess.run([sys.executable, '-c', code]).returncode == 0
+
+
+def test_kpi_totals_match_pandas(sales_df, mapping):
+    totals = SalesDataAnalyzer(sales_df, mapping)._calculate_kpi_totals()
+    assert totals['total_transactions'] == len(sales_df)
+    assert totals['total_sales'] == pytest.approx(sales_df['Total Amount'].sum())
+    assert totals['total_cogs'] == pytest.approx((sales_df['Cost'] * sales_df['Quantity']).sum())
+    assert totals['total_discount'] == pytest.approx(sales_df['Discount'].sum())
+    assert totals['avg_quantity'] == pytest.approx(sales_df['Quantity'].mean())
+    assert totals['unique_customers'] == sales_df['Customer ID'].nunique()
+    assert totals['unique_products'] == sales_df['Product ID'].nunique()
+
+
+def test_analyze_all_sections_and_report(sales_df, mapping, monkeypatch):
+    monkeypatch.setattr(TranslationSystem, '_language_source', 'en')
+    analyzer = SalesDataAnalyzer(sales_df, mapping)
+    analysis = analyzer.analyze_all()
+
+    monthly = sales_df.groupby(sales_df['Order Date'].dt.to_period('M'))['Total Amount'].agg(['sum', 'count'])
+    trends = analysis['trends']['monthly']
+    assert [row['year_month'] for row in trends] == [str(period) for period in monthly.index]
+    assert [row['sum'] for row in trends] == pytest.approx(monthly['sum'].tolist())
+    assert [row['count'] for row in trends] == monthly['count'].tolist()
+
+    for field in ('kpis', 'distributions', 'percentiles', 'top_performers', 'growth_metrics',
+                  'customer_analysis', 'product_analysis'):
+        assert analysis[field], field
+    assert analysis['duplicates']['duplicate_rows'] == int(sales_df.duplicated().sum())
+
+    report = analyzer.generate_professional_report(analysis)
+    first, last = sales_df['Order Date'].min(), sales_df['Order Date'].max()
+    assert f"{first:%Y-%m-%d} to {last:%Y-%m-%d}" in report
+    assert analyzer.notices == []
@@ -0,0 +1,48 @@
+"""
+اختبارات وضع الدفعات - مجموعة بيانات من عدة ملفات تُحلَّل وتُكتب نتائجها وتقريرها بدون Streamlit
+"""
+
+import json
+
+import pandas as pd
+import pytest
+
+from conftest import make_sales
+from sales_batch import find_datasets, run_batch
+from sales_translations import TranslationSystem
+
+
+@pytest.mark.parametrize('backend', ['pandas', 'pyarrow'])
+def test_run_batch_writes_analysis_and_report(tmp_path, mapping, backend, monkeypatch):
+    # run_dataset يثبّت لغة التقرير: تُستعاد اللغة السابقة بعد الاختبار
+    monkeypatch.setattr(TranslationSystem, '_language_source', TranslationSystem._language_source)
+    frames = {}
+    for branch, seed in (('north', 1), ('south', 2)):
+        directory = tmp_path / 'data' / branch
+        directory.mkdir(parents=True)
+        parts = [make_sales(seed, 300), make_sales(seed + 10, 200)]
+        for index, part in enumerate(parts):
+            part.to_csv(directory / f'sales_{index}.csv', index=False)
+        frames[branch] = pd.concat(parts, ignore_index=True)
+
+    datasets = find_datasets([str(tmp_path / 'data')])
+    assert [path.split('/')[-1] for path in datasets] == ['north', 'south']
+
+    summaries = run_batch(datasets, mapping, str(tmp_path / 'out'), language='en', backend=backend, workers=1)
+    for summary in summaries:
+        assert summary['error'] is None
+        expected = frames[summary['dataset']]
+        assert summary['rows'] == len(expected)
+
+        with open(summary['json'], encoding='utf-8') as f:
+            payload = json.load(f)
+        assert [item['rows'] for item in payload['files']] == [300, 200]
+        assert payload['trends']['monthly']
+        assert payload['kpis']['total_sales']['value'] == pytest.approx(expected['Total Amount'].sum())
+        assert payload['kpis']['total_transactions']['value'] == len(expected)
+        assert payload['duplicates']['total_rows'] == len(expected)
+
+        with open(summary['report'], encoding='utf-8') as f:
+            report = f.read()
+        first, last = expected['Order Date'].min(), expected['Order Date'].max()
+        assert f"{first:%Y-%m-%d} to {last:%Y-%m-%d}" in report
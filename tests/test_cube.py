@@ -0,0 +1,75 @@
+"""
+اختبارات مكعب المبيعات - التقطيع من الخلايا يطابق groupby وقناع الصفوف على البيانات نفسها
+"""
+
+import numpy as np
+import pytest
+
+from sales_prepared import PreparedSalesDataset
+
+FILTERS = [
+    (None, None, {}),
+    ('2024-03-01', '2024-08-31', {}),
+    (None, '2024-06-30', {'region': ['North', 'East']}),
+    ('2024-02-01', None, {'category': ['Books'], 'salesperson': ['Ali', 'Sara', 'Nobody']}),
+]
+
+
+def _rows(df, date_from, date_to, filters):
+    mask = np.ones(len(df), dtype=bool)
+    if date_from is not None:
+        mask &= df['Order Date'] >= date_from
+    if date_to is not None:
+        mask &= df['Order Date'] <= date_to
+    columns = {'region': 'Region', 'category': 'Category', 'salesperson': 'Salesperson'}
+    for field, values in filters.items():
+        mask &= df[columns[field]].isin(values)
+    return df[mask]
+
+
+@pytest.fixture
+def frame(sales_df):
+    # منطقة مفقودة: تبقى في الإجماليات وتخرج عند التصفية على المنطقة
+    sales_df.loc[::17, 'Region'] = None
+    return sales_df
+
+
+@pytest.mark.parametrize('date_from, date_to, filters', FILTERS)
+def test_cube_totals_match_row_mask(frame, mapping, date_from, date_to, filters):
+    cube = PreparedSalesDataset(frame, mapping).cube()
+    expected = _rows(frame, date_from, date_to, filters)
+    totals = cube.totals(date_from, date_to, filters)
+
+    assert totals['total_transactions'] == len(expected)
+    assert totals['total_sales'] == pytest.approx(expected['Total Amount'].sum())
+    assert totals['total_cogs'] == pytest.approx((expected['Cost'] * expected['Quantity']).sum())
+    assert totals['avg_quantity'] == pytest.approx(expected['Quantity'].mean())
+
+
+@pytest.mark.parametrize('date_from, date_to, filters', FILTERS)
+def test_cube_rollups_match_groupby(frame, mapping, date_from, date_to, filters):
+    cube = PreparedSalesDataset(frame, mapping).cube()
+    expected = _rows(frame, date_from, date_to, filters)
+
+    for field, column in (('region', 'Region'), ('category', 'Category'), ('payment_method', 'Payment Method')):
+        counts = cube.distribution(field, 'transactions', date_from, date_to, filters)
+        assert counts.to_dict() == expected[column].value_counts().to_dict()
+        sales = cube.distribution(field, 'sales', date_from, date_to, filters)
+        reference = expected.groupby(column)['Total Amount'].sum()
+        assert sales.to_dict() == pytest.approx(reference[reference > 0].to_dict())
+
+    monthly = expected.groupby(expected['Order Date'].dt.to_period('M'))['Total Amount'].agg(['sum', 'count'])
+    trend = cube.trend(date_from, date_to, filters)
+    assert [row['year_month'] for row in trend] == [str(period) for period in monthly.index]
+    assert [row['sum'] for row in trend] == pytest.approx(monthly['sum'].tolist())
+    assert [row['count'] for row in trend] == monthly['count'].tolist()
+
+
+def test_daily_cube_matches_monthly(frame, mapping):
+    prepared = PreparedSalesDataset(frame, mapping)
+    daily, monthly = prepared.cube('day'), prepared.cube('month')
+    assert len(daily) >= len(monthly)
+    assert [(row['year_month'], row['count']) for row in daily.trend()] == \
+        [(row['year_month'], row['count']) for row in monthly.trend()]
+    assert daily.totals('2024-05-10', '2024-05-20')['total_transactions'] == \
+        len(_rows(frame, '2024-05-10', '2024-05-20', {}))
@@ -0,0 +1,65 @@
+"""
+اختبارات تحميل الملفات - تحديد الترميز من بداية الملف والرجوع إلى البحث عن أول بايت عالٍ
+"""
+
+import codecs
+
+import pytest
+
+from sales_data_loader import ENCODING_FALLBACK_BYTES, detect_csv_encoding, read_sales_file
+
+HEADER = 'Order ID,Customer,Total Amount\n'
+
+
+def _ascii_rows(count):
+    return ''.join(f'{row},customer {row},{row}.5\n' for row in range(count))
+
+
+@pytest.mark.parametrize('text, encoding', [
+    (HEADER + '1,محمد,10\n', 'utf-8'),
+    (HEADER + '1,Zoë,10\n', 'utf-8'),
+])
+def test_prefix_detection(text, encoding):
+    info = detect_csv_encoding(text.encode(encoding))
+    assert (info['encoding'], info['method']) == ('utf-8', 'prefix')
+
+
+def test_bom_and_ascii():
+    assert detect_csv_encoding(codecs.BOM_UTF8 + HEADER.encode())['encoding'] == 'utf-8-sig'
+    assert detect_csv_encoding(HEADER.encode('utf-16'))['encoding'] == 'utf-16'
+    info = detect_csv_encoding((HEADER + _ascii_rows(10)).encode())
+    assert (info['encoding'], info['method']) == ('utf-8', 'ascii')
+
+
+def test_cp1256_and_latin1_prefix():
+    assert detect_csv_encoding((HEADER + '1,محمد أحمد,10\n').encode('cp1256'))['encoding'] == 'cp1256'
+    assert detect_csv_encoding((HEADER + '1,Zoë Müller,10\n').encode('latin1'))['encoding'] == 'latin1'
+
+
+@pytest.mark.parametrize('tail, encoding', [
+    ('1,محمد أحمد,10\n', 'cp1256'),
+    ('1,محمد أحمد,10\n', 'utf-8'),
+    ('1,Zoë Müller,10\n', 'latin1'),
+])
+def test_fallback_finds_first_high_byte_after_ascii_prefix(tail, encoding):
+    # البداية ASCII أطول من العيّنة: الترميز يُحدَّد من المنطقة حول أول بايت عالٍ
+    content = (HEADER + _ascii_rows(200) + tail).encode(encoding)
+    info = detect_csv_encoding(content, sample_size=256)
+    assert (info['encoding'], info['method']) == (encoding, 'fallback')
+
+    df, read_info = read_sales_file('sales.csv', content)
+    assert read_info['encoding'] == encoding
+    assert df['Customer'].iloc[-1] == tail.split(',')[1]
+
+
+def test_high_byte_beyond_budget_is_read_with_replacement():
+    # البايت العالي بعد حد البحث: يُقرأ الملف بالترميز الافتراضي مع استبدال البايتات غير الصالحة
+    rows = ENCODING_FALLBACK_BYTES // 20
+    content = (HEADER + _ascii_rows(rows)).encode() + '1,Zoë,10\n'.encode('latin1')
+    assert len(content) > ENCODING_FALLBACK_BYTES
+    assert detect_csv_encoding(content)['method'] == 'ascii'
+
+    df, info = read_sales_file('sales.csv', content)
+    assert (info['encoding'], info['method']) == ('utf-8', 'replace')
+    assert len(df) == rows + 1
+    assert df['Customer'].iloc[-1] == 'Zo\ufffd'
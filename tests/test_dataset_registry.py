@@ -0,0 +1,20 @@
+"""
+اختبارات سجل بيانات الجلسة - المراجع تشارك بيانات الجدول والكتابة عليها لا تصل إليه
+"""
+
+import numpy as np
+import pandas as pd
+
+from sales_dataset_registry import DatasetRegistry
+
+
+def test_views_share_data_and_writes_stay_local():
+    registry = DatasetRegistry()
+    table = pd.DataFrame({'Total Amount': np.arange(5, dtype=np.float64)})
+    view = registry.register('k', table)
+    assert registry.register('k', table.copy()) is not None and len(registry) == 1
+    assert np.shares_memory(view['Total Amount'].to_numpy(), table['Total Amount'].to_numpy())
+
+    view.loc[0, 'Total Amount'] = -1.0
+    assert table.loc[0, 'Total Amount'] == 0.0
+    assert registry.view('k').loc[0, 'Total Amount'] == 0.0
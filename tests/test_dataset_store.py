@@ -0,0 +1,50 @@
+"""
+اختبارات المخزن المحلي - نسختان على نفس المجلد لا تفقدان مدخلات بعضهما، والقراءة لا تعيد كتابة الفهرس
+"""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from sales_dataset_store import INDEX_FILE, LocalDatasetStore
+
+
+def _frame(value):
+    return pd.DataFrame({'Total Amount': [value, value + 1.0], 'Region': ['north', 'south']})
+
+
+def test_two_store_instances_keep_each_others_entries(tmp_path):
+    first = LocalDatasetStore(str(tmp_path))
+    second = LocalDatasetStore(str(tmp_path))
+
+    def put(args):
+        store, number = args
+        assert store.put(f'key-{number}', _frame(number), f'file-{number}.csv')
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(put, [(first if number % 2 else second, number) for number in range(40)]))
+
+    with open(tmp_path / INDEX_FILE, encoding='utf-8') as f:
+        index = json.load(f)
+    assert set(index) == {f'key-{number}' for number in range(40)}
+    feather_files = {name for name in os.listdir(tmp_path) if name.endswith('.feather')}
+    assert feather_files == {entry['file'] for entry in index.values()}
+
+
+def test_get_does_not_rewrite_index_but_updates_lru_on_next_write(tmp_path):
+    store = LocalDatasetStore(str(tmp_path), max_bytes=10 ** 9)
+    store.put('old', _frame(1), 'old.csv')
+    store.put('new', _frame(2), 'new.csv')
+    index_path = tmp_path / INDEX_FILE
+    before = index_path.read_bytes()
+
+    assert store.get('old')['Total Amount'].tolist() == [1.0, 2.0]
+    assert index_path.read_bytes() == before
+    assert store.list_datasets()[0]['key'] == 'old'
+
+    # الكتابة التالية تحفظ ترتيب الاستخدام: الأقدم استخداماً (new) يُحذف أولاً عند تجاوز الحد
+    store.max_bytes = store.total_bytes()
+    store.put('third', _frame(3), 'third.csv')
+    assert 'new' not in store and 'old' in store and 'third' in store
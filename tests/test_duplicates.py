@@ -0,0 +1,56 @@
+"""
+اختبارات كشف التكرارات - البصمات عبر الدفعات والملفات تطابق duplicated في pandas
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sales_duplicates import DuplicateDetector, find_duplicates, resolve_key_columns
+
+
+def _orders(seed, rows):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Order ID': rng.integers(0, rows // 2, rows),
+        'Product': rng.choice(['a', 'b', 'c'], rows),
+        'Amount': rng.integers(1, 4, rows).astype(np.float64),
+    })
+
+
+@pytest.mark.parametrize('chunk_rows', [7, 64, 10_000])
+def test_detector_across_chunks_matches_pandas(chunk_rows):
+    first, second = _orders(0, 500), _orders(1, 300)
+    detector = DuplicateDetector(chunk_rows=chunk_rows)
+    report = detector.add(first, 'first.csv').add(second, 'second.csv').report()
+
+    merged = pd.concat([first, second], ignore_index=True)
+    assert report['exact']
+    assert report['duplicate_rows'] == int(merged.duplicated().sum())
+    assert report['within_file']['first.csv'] == int(first.duplicated().sum())
+
+    # كل صف في الملف الثاني ظهر أولاً في الملف الأول يُنسب إليه مهما كانت حدود الدفعات
+    cross = int(second.apply(tuple, axis=1).isin(set(first.apply(tuple, axis=1))).sum())
+    assert report['cross_file'] == ([{'file': 'second.csv', 'origin': 'first.csv', 'count': cross}] if cross else [])
+    assert report['within_file']['second.csv'] == int(merged.duplicated().sum()) - report['within_file']['first.csv'] - cross
+    assert np.all(np.diff(detector._seen.astype(np.float64)) > 0)
+
+
+def test_duplicate_key_columns_and_sources():
+    df = pd.concat([_orders(2, 200), _orders(3, 100)], ignore_index=True)
+    mapping = {'order_id': 'Order ID', 'product_id': 'Product'}
+    columns = resolve_key_columns(df, mapping, 'order_product')
+    assert columns == ['Order ID', 'Product']
+    assert resolve_key_columns(df, {}, 'order_id') == df.columns.tolist()
+
+    report = find_duplicates(df, columns, sources=[('a', 200), ('b', 100)])
+    assert report['duplicate_rows'] == int(df.duplicated(columns).sum())
+    assert report['total_rows'] == 300
+
+
+def test_bounded_memory_estimate_is_close():
+    df = _orders(4, 20_000)
+    report = find_duplicates(df, max_fingerprints=2_000)
+    expected = int(df.duplicated().sum())
+    assert not report['exact']
+    assert report['duplicate_rows'] == pytest.approx(expected, rel=0.1)
@@ -0,0 +1,70 @@
+"""
+اختبارات المرشحات - تقاطع فهارس الصفوف يطابق القناع المنطقي على الأعمدة، والبيانات المقتطعة تطابق الصفوف المختارة
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sales_prepared import PreparedSalesDataset
+
+COLUMNS = {'region': 'Region', 'city': 'City', 'category': 'Category', 'salesperson': 'Salesperson', 'status': 'Status'}
+
+CASES = [
+    (None, None, {'region': ['North']}),
+    (None, None, {'region': ['North', 'West'], 'status': ['Returned']}),
+    ('2024-04-01', '2024-04-30', {}),
+    ('2024-04-01', '2024-04-30', {'city': ['Riyadh']}),
+    # النطاق أوسع من المرشحات: تُفحص تواريخ الصفوف المرشحة فقط
+    ('2024-01-15', '2025-01-31', {'salesperson': ['Ali'], 'category': ['Books']}),
+    (None, '2024-02-10', {'region': ['Nowhere']}),
+]
+
+
+def _mask(df, date_from, date_to, filters):
+    mask = np.ones(len(df), dtype=bool)
+    dates = df['Order Date']
+    if date_from is not None:
+        mask &= (dates >= pd.Timestamp(date_from)).to_numpy()
+    if date_to is not None:
+        mask &= (dates < pd.Timestamp(date_to) + pd.Timedelta(days=1)).to_numpy()
+    for field, values in filters.items():
+        mask &= df[COLUMNS[field]].isin(values).to_numpy()
+    return mask
+
+
+@pytest.fixture
+def frame(sales_df):
+    # تواريخ بساعات ومفقودة: يوم النهاية يُشمل كاملاً والتاريخ المفقود يخرج عند التصفية بالتاريخ
+    sales_df['Order Date'] += pd.to_timedelta(np.arange(len(sales_df)) % 24, unit='h')
+    sales_df.loc[::23, 'Order Date'] = pd.NaT
+    sales_df.loc[::29, 'Region'] = None
+    return sales_df
+
+
+@pytest.mark.parametrize('date_from, date_to, filters', CASES)
+def test_select_rows_matches_boolean_mask(frame, mapping, date_from, date_to, filters):
+    prepared = PreparedSalesDataset(frame, mapping)
+    rows = prepared.select_rows(date_from, date_to, filters)
+    expected = np.flatnonzero(_mask(frame, date_from, date_to, filters))
+    np.testing.assert_array_equal(rows, expected)
+
+
+def test_no_active_filter_selects_everything(frame, mapping):
+    prepared = PreparedSalesDataset(frame, mapping)
+    assert prepared.select_rows() is None
+    assert prepared.select_rows(filters={'region': [], 'unmapped': ['x']}) is None
+
+
+def test_subset_reuses_parent_conversions(frame, mapping):
+    prepared = PreparedSalesDataset(frame, mapping)
+    rows = prepared.select_rows('2024-03-01', None, {'category': ['Home', 'Books']})
+    subset = prepared.subset(rows)
+    expected = frame.iloc[rows]
+
+    assert len(subset) == len(expected)
+    assert subset.numeric('total_amount').sum() == pytest.approx(expected['Total Amount'].sum())
+    assert subset.distinct_count('customer_id') == expected['Customer ID'].nunique()
+    codes, uniques = subset.codes('region')
+    assert list(uniques[codes[codes >= 0]]) == expected['Region'].dropna().tolist()
+    assert subset.date_bounds() == (expected['Order Date'].min(), expected['Order Date'].max())
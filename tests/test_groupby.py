@@ -0,0 +1,52 @@
+"""
+اختبارات محرك التجميع ولوحات الصدارة - bincount يطابق groupby، والاختيار الجزئي يطابق الترتيب المستقر
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sales_groupby import LEADERBOARD_FIELDS, select_top
+from sales_prepared import PreparedSalesDataset
+
+
+def _stable_order(values, largest):
+    series = pd.Series(values)
+    return series.sort_values(ascending=not largest, kind='stable').index.to_numpy()
+
+
+@pytest.mark.parametrize('largest', [True, False])
+@pytest.mark.parametrize('values', [
+    [5, 3, 5, 1, 5, 2, 3],                       # تعادل عند الحد وقبله
+    [1.0, 1.0, 1.0, 1.0],                        # كل القيم متساوية
+    [np.nan, 4.0, np.nan, 4.0, 2.0],             # قيم مفقودة
+    [np.nan, np.nan, 1.0],
+    list(np.random.default_rng(0).integers(0, 20, 500)),
+])
+def test_select_top_matches_stable_sort(values, largest):
+    values = np.asarray(values)
+    expected = _stable_order(values, largest)
+    for k in range(0, len(values) + 2):
+        np.testing.assert_array_equal(select_top(values, k, largest), expected[:k], err_msg=f'k={k}')
+
+
+def test_group_aggregates_match_groupby(sales_df, mapping):
+    sales_df.loc[::13, 'Region'] = None
+    aggregates = PreparedSalesDataset(sales_df, mapping).aggregates()
+    for field, column in (('region', 'Region'), ('category', 'Category'), ('customer_id', 'Customer ID')):
+        table = aggregates.table(field).sort_index()
+        grouped = sales_df.groupby(column).agg(
+            rows=('Total Amount', 'size'), sales=('Total Amount', 'sum'), quantity=('Quantity', 'sum'))
+        np.testing.assert_array_equal(table['rows'].to_numpy(), grouped['rows'].to_numpy())
+        np.testing.assert_allclose(table['sales'].to_numpy(), grouped['sales'].to_numpy())
+        np.testing.assert_array_equal(table['quantity'].to_numpy(), grouped['quantity'].to_numpy())
+
+
+def test_leaderboards_match_sorted_groupby(sales_df, mapping):
+    boards = PreparedSalesDataset(sales_df, mapping).aggregates().leaderboards(k=3)
+    assert set(boards) == {field for field in LEADERBOARD_FIELDS if field in mapping}
+    sales = sales_df.groupby('Salesperson', sort=False)['Total Amount'].sum()
+    board = boards['salesperson']
+    assert board['measure'] == 'sales'
+    assert board['top'].index.tolist() == sales.sort_values(ascending=False, kind='stable').index[:3].tolist()
+    assert board['bottom'].index.tolist() == sales.sort_values(kind='stable').index[:3].tolist()
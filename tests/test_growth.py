@@ -0,0 +1,85 @@
+"""
+اختبارات محرك النمو - المجاميع التراكمية اليومية تطابق تجميع pandas للفترات والنوافذ
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sales_analyzer import SalesDataAnalyzer
+from sales_growth import GROWTH_PERIODS, GROWTH_WINDOWS, growth_rate
+from sales_prepared import PreparedSalesDataset
+
+
+def _complete_periods(df, freq):
+    """مجاميع الفترات الواقعة كاملة بين أول وآخر يوم في البيانات"""
+    days = df['Order Date'].dt.normalize()
+    first, last = days.min(), days.max()
+    sums = df['Total Amount'].groupby(days.dt.to_period(freq)).sum()
+    periods = pd.period_range(first, last, freq=freq)
+    sums = sums.reindex(periods, fill_value=0.0)
+    complete = [period for period in periods if period.start_time >= first and period.end_time.normalize() <= last]
+    return sums, complete
+
+
+@pytest.mark.parametrize('last_day', ['2025-02-28', '2025-02-20', '2024-12-31'])
+@pytest.mark.parametrize('name, freq', [('mom', 'M'), ('qoq', 'Q'), ('yoy', 'M')])
+def test_period_growth_matches_calendar_groupby(sales_df, mapping, name, freq, last_day):
+    # البيانات تنتهي في آخر يوم من الشهر (الشهر الأخير كامل) أو في منتصفه (الشهر الأخير ناقص)
+    sales_df = sales_df[sales_df['Order Date'] <= last_day]
+    months, shift = GROWTH_PERIODS[name]
+    result = PreparedSalesDataset(sales_df, mapping).daily_sales().period_growth(months, shift)
+    sums, complete = _complete_periods(sales_df, freq)
+
+    current = complete[-1]
+    previous = current - shift
+    if previous not in complete:
+        assert result is None
+        return
+    assert result[:2] == (str(current), str(previous))
+    assert result[2][0] == pytest.approx(sums[current])
+    assert result[3][0] == pytest.approx(sums[previous])
+
+
+def test_totals_and_trailing_windows(sales_df, mapping):
+    daily = PreparedSalesDataset(sales_df, mapping).daily_sales()
+    days = sales_df['Order Date'].dt.normalize()
+    amounts = sales_df['Total Amount']
+
+    for date_from, date_to in (('2024-02-03', '2024-02-03'), ('2024-03-15', '2024-07-01'), (None, '2024-01-31')):
+        mask = np.ones(len(days), dtype=bool)
+        if date_from:
+            mask &= days >= date_from
+        if date_to:
+            mask &= days <= date_to
+        assert daily.total(date_from, date_to)[0] == pytest.approx(amounts[mask].sum())
+
+    last = days.max()
+    for window in GROWTH_WINDOWS:
+        current, previous = daily.trailing(window)
+        recent = days > last - pd.Timedelta(days=window)
+        assert current[0] == pytest.approx(amounts[recent].sum())
+        if previous is None:
+            assert (last - days.min()).days + 1 < 2 * window
+        else:
+            before = (days > last - pd.Timedelta(days=2 * window)) & ~recent
+            assert previous[0] == pytest.approx(amounts[before].sum())
+
+
+def test_group_growth_matches_groupby(sales_df, mapping):
+    grouped = PreparedSalesDataset(sales_df, mapping).daily_sales('region')
+    expected = sales_df.groupby('Region')['Total Amount'].sum()
+    totals = pd.Series(grouped.prefix[:, -1], index=grouped.groups)
+    pd.testing.assert_series_equal(totals.sort_index(), expected.sort_index(), check_names=False)
+
+    growth = SalesDataAnalyzer(sales_df, mapping)._calculate_growth_metrics()
+    sums, complete = _complete_periods(sales_df, 'M')
+    assert growth['periods']['mom']['growth'] == pytest.approx(
+        float(growth_rate(sums[complete[-1]], sums[complete[-2]])))
+    assert [row['value'] for row in growth['region']] == expected.sort_values(ascending=False).index.tolist()
+
+
+def test_growth_rate_guards_non_positive_previous():
+    rates = growth_rate([110.0, 5.0, 5.0], [100.0, 0.0, -1.0])
+    assert rates[0] == pytest.approx(10.0)
+    assert np.isnan(rates[1:]).all()
@@ -0,0 +1,100 @@
+"""
+اختبارات الإلحاق التدريجي - الإلحاق يطابق إعادة الحساب الكاملة على البيانات المدمجة
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sales_analyzer import SalesDataAnalyzer
+import sales_schema
+from sales_incremental import IncrementalSalesDataset
+from sales_projection import build_analysis_frame
+from sales_schema import align_and_merge
+
+MAPPING = {
+    'order_date': 'Order Date',
+    'customer_id': 'Customer ID',
+    'quantity': 'Quantity',
+    'cost': 'Cost',
+    'total_amount': 'Total Amount',
+    'region': 'Region',
+}
+
+# نفس الحقول بصيغ أسماء أخرى (تُواءم بمرادفات HEADER_SYNONYMS)
+VARIANT_HEADERS = {
+    'Order Date': 'order_date',
+    'Customer ID': 'client id',
+    'Quantity': 'Qty',
+    'Cost': 'Unit Cost',
+    'Total Amount': 'Amount',
+    'Region': 'area',
+}
+
+
+def _sales_file(seed, rows=2_000):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Order Date': pd.date_range('2024-01-01', periods=rows, freq='h').astype(str),
+        'Customer ID': rng.integers(0, 300, rows),
+        'Quantity': rng.integers(1, 300, rows),
+        'Cost': rng.integers(100, 30_000, rows),
+        'Total Amount': rng.integers(100, 5_000_000, rows),
+        'Region': rng.choice(['north', 'south', 'east'], rows),
+    })
+
+
+def test_append_with_header_variants_matches_full_recompute():
+    first = _sales_file(0)
+    second = _sales_file(1).rename(columns=VARIANT_HEADERS)
+
+    dataset = IncrementalSalesDataset(MAPPING)
+    assert dataset.append(first, 'first')
+    assert dataset.append(second, 'second')
+    assert not dataset.append(second, 'second')
+
+    merged, _ = align_and_merge([first, second])
+    full = build_analysis_frame(merged, MAPPING)
+    expected = SalesDataAnalyzer(full, MAPPING)._calculate_kpi_totals()
+    totals = dataset.accumulator.totals()
+
+    assert totals['total_transactions'] == expected['total_transactions'] == 4_000
+    for key in ('total_sales', 'total_cogs', 'avg_quantity'):
+        assert totals[key] == pytest.approx(expected[key])
+    assert totals['unique_customers'] == expected['unique_customers']
+
+    assert len(dataset) == 4_000
+    assert list(dataset.dataframe.columns) == list(full.columns)
+    assert dataset.dataframe['Cost'].notna().all()
+
+
+def test_materialized_merge_only_aligns_new_files(monkeypatch):
+    files = [_sales_file(seed, rows=500) for seed in range(4)]
+    files[2] = files[2].rename(columns=VARIANT_HEADERS)
+
+    aligned_rows = []
+    real_unify = sales_schema._unify_parts
+
+    def recording_unify(parts):
+        aligned_rows.append(sum(len(part) for part in parts if part is not None))
+        return real_unify(parts)
+
+    monkeypatch.setattr(sales_schema, '_unify_parts', recording_unify)
+
+    dataset = IncrementalSalesDataset(MAPPING)
+    dataset.append(files[0], 'k0')
+    assert len(dataset.dataframe) == 500
+    dataset.append(files[1], 'k1')
+    dataset.append(files[2], 'k2')
+    assert len(dataset.dataframe) == 1_500
+    dataset.append(files[3], 'k3')
+    merged = dataset.dataframe
+
+    # البيانات المدمجة السابقة لا تدخل مواءمة الأنواع، فقط الملفات المُلحقة بعد آخر طلب
+    assert max(aligned_rows) <= 1_000
+    full = build_analysis_frame(align_and_merge(files)[0], MAPPING)
+    assert list(merged.columns) == list(full.columns)
+    assert isinstance(merged['Region'].dtype, pd.CategoricalDtype)
+    pd.testing.assert_series_equal(
+        merged['Total Amount'].astype(np.float64), full['Total Amount'].astype(np.float64), check_names=False)
+    assert merged['Region'].astype(str).tolist() == full['Region'].astype(str).tolist()
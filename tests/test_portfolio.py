@@ -0,0 +1,54 @@
+"""
+اختبارات محفظة المنتجات ABC - الإيرادات والربح وحدود الفئات تطابق groupby والحصة التراكمية
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sales_portfolio import build_portfolio_table, summarize_portfolio
+from sales_prepared import PreparedSalesDataset
+
+
+def test_portfolio_table_matches_groupby(sales_df, mapping):
+    table = PreparedSalesDataset(sales_df, mapping).portfolio()
+    frame = sales_df.assign(cogs=sales_df['Cost'] * sales_df['Quantity'])
+    grouped = frame.groupby('Product ID').agg(
+        transactions=('Total Amount', 'size'), revenue=('Total Amount', 'sum'),
+        quantity=('Quantity', 'sum'), cogs=('cogs', 'sum'), product_name=('Product Name', 'last'))
+    expected = grouped.sort_values('revenue', ascending=False)
+
+    assert table.index.tolist() == expected.index.tolist()
+    for column in ('transactions', 'revenue', 'quantity', 'cogs'):
+        np.testing.assert_allclose(table[column].to_numpy(dtype=np.float64), expected[column].to_numpy(dtype=np.float64))
+    np.testing.assert_allclose(table['margin'], expected['revenue'] - expected['cogs'])
+    assert table['product_name'].tolist() == expected['product_name'].tolist()
+
+    share = expected['revenue'] / expected['revenue'].sum() * 100
+    before = share.cumsum() - share
+    classes = np.where(before < 80, 'A', np.where(before < 95, 'B', 'C'))
+    assert table['abc'].astype(str).tolist() == classes.tolist()
+    np.testing.assert_allclose(table['cumulative_share'], share.cumsum())
+    assert table['long_tail_loss'].tolist() == ((classes == 'C') & (table['margin'] < 0).to_numpy()).tolist()
+
+
+def test_product_crossing_threshold_stays_in_higher_class():
+    # الحصص 50، 30، 15، 5: الثاني يبلغ 80 تماماً فيبقى A، والثالث يبدأ من 80 فيصبح B
+    df = pd.DataFrame({'Product': ['a', 'b', 'c', 'd'], 'Total Amount': [50.0, 30.0, 15.0, 5.0],
+                       'Cost': [10.0, 10.0, 10.0, 10.0]})
+    mapping = {'product_name': 'Product', 'total_amount': 'Total Amount', 'cost': 'Cost'}
+    table = build_portfolio_table(PreparedSalesDataset(df, mapping))
+    assert table['abc'].astype(str).tolist() == ['A', 'A', 'B', 'C']
+    assert table.attrs['key'] == 'product_name'
+    assert table['long_tail_loss'].tolist() == [False, False, False, True]
+
+
+def test_summary_adds_up(sales_df, mapping):
+    table = PreparedSalesDataset(sales_df, mapping).portfolio()
+    summary = summarize_portfolio(table, top=5)
+    assert summary['products'] == sales_df['Product ID'].nunique()
+    assert sum(item['products'] for item in summary['classes']) == summary['products']
+    assert sum(item['revenue'] for item in summary['classes']) == pytest.approx(sales_df['Total Amount'].sum())
+    assert [item['product'] for item in summary['top_products']] == table.index[:5].tolist()
+    assert summary['pareto'][-1]['revenue_share'] == pytest.approx(100.0)
+    assert summary['long_tail_loss']['products'] == int(table['long_tail_loss'].sum())
@@ -0,0 +1,76 @@
+"""
+اختبارات ملف تعريف الأعمدة - الإحصائيات تطابق حسابات pandas، والعيّنة تُقدّر الأعداد للبيانات كلها
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sales_prepared import PreparedSalesDataset
+from sales_profiler import PROFILE_OUTLIER_IQR, profile_columns
+from sales_projection import build_analysis_frame
+
+
+@pytest.fixture
+def frame(sales_df):
+    df = sales_df.astype({'Total Amount': object, 'Order Date': object})
+    df.loc[::10, 'Total Amount'] = None
+    df.loc[5::50, 'Total Amount'] = 'n/a'
+    df.loc[3::40, 'Order Date'] = 'not a date'
+    df.loc[::7, 'Region'] = None
+    df.loc[::9, 'Discount'] = 0.0
+    df.loc[1::11, 'Discount'] = -1.0
+    return df
+
+
+def _by_column(profile):
+    return {entry['column']: entry for entry in profile['columns']}
+
+
+def test_full_profile_matches_pandas(frame, mapping):
+    stats = {}
+    projected = build_analysis_frame(frame, mapping, stats)
+    profile = profile_columns(PreparedSalesDataset(projected, mapping, stats))
+    columns = _by_column(profile)
+    assert profile['rows'] == profile['profiled_rows'] == len(frame)
+    assert not profile['sampled']
+
+    amount = pd.to_numeric(frame['Total Amount'], errors='coerce')
+    entry = columns['Total Amount']
+    assert entry['kind'] == 'numeric'
+    assert entry['nulls'] == int(amount.isna().sum())
+    assert entry['parse_failures'] == int((frame['Total Amount'] == 'n/a').sum())
+    assert (entry['min'], entry['max']) == (amount.min(), amount.max())
+    q1, q3 = amount.quantile([0.25, 0.75])
+    spread = (q3 - q1) * PROFILE_OUTLIER_IQR
+    assert entry['outliers'] == int(((amount < q1 - spread) | (amount > q3 + spread)).sum())
+    assert entry['null_ratio'] == pytest.approx(amount.isna().mean() * 100)
+
+    discount = columns['Discount']
+    assert (discount['negative'], discount['zero']) == (int((frame['Discount'] < 0).sum()), int((frame['Discount'] == 0).sum()))
+
+    dates = pd.to_datetime(frame['Order Date'], errors='coerce', format='mixed')
+    entry = columns['Order Date']
+    assert entry['kind'] == 'datetime'
+    assert entry['parse_failures'] == int((frame['Order Date'] == 'not a date').sum())
+    assert entry['min'] is None and entry['max'] is None
+    assert (entry['first_date'], entry['last_date']) == (f"{dates.min():%Y-%m-%d}", f"{dates.max():%Y-%m-%d}")
+
+    region = columns['Region']
+    assert region['kind'] == 'text'
+    assert (region['nulls'], region['distinct']) == (int(frame['Region'].isna().sum()), frame['Region'].nunique())
+
+
+def test_sampled_profile_scales_counts(frame, mapping):
+    big = pd.concat([frame] * 20, ignore_index=True)
+    stats = {}
+    projected = build_analysis_frame(big, mapping, stats)
+    profile = profile_columns(PreparedSalesDataset(projected, mapping, stats), sample_rows=3_000)
+    columns = _by_column(profile)
+    assert profile['sampled'] and profile['profiled_rows'] == 3_000
+
+    # الأعداد مقدّرة من العيّنة، وما تعذر تحويله من إحصائيات التحويل الكاملة
+    region_nulls = int(big['Region'].isna().sum())
+    assert columns['Region']['nulls'] == pytest.approx(region_nulls, rel=0.15)
+    assert columns['Total Amount']['parse_failures'] == stats['total_amount']['failed']
+    assert columns['Order Date']['parse_failures'] == stats['order_date']['failed']
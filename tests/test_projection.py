@@ -0,0 +1,93 @@
+"""
+اختبارات إسقاط الأعمدة - المقاييس المصغّرة لا تفيض عند ضربها ببعضها
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from sales_analyzer import SalesDataAnalyzer
+from sales_data_loader import READER_BACKENDS, read_sales_file
+from sales_prepared import PreparedSalesDataset
+from sales_projection import build_analysis_frame, compact_frame
+from sales_schema import align_and_merge
+
+MAPPING = {'total_amount': 'Total Amount', 'cost': 'Cost', 'quantity': 'Quantity'}
+
+
+@pytest.mark.parametrize('dtype, cost, quantity', [
+    (np.int16, 300, 200),            # 60,000 > int16
+    (np.int32, 70_000, 40_000),      # 2.8 مليار > int32
+])
+def test_cogs_of_downcast_measures_does_not_overflow(dtype, cost, quantity):
+    rows = 1_000
+    df = pd.DataFrame({
+        'Total Amount': np.full(rows, 1.0),
+        'Cost': np.full(rows, cost, dtype=dtype),
+        'Quantity': np.full(rows, quantity, dtype=dtype),
+    })
+    expected = float(rows * cost * quantity)
+
+    analysis_df = build_analysis_frame(df, MAPPING)
+    assert analysis_df['Cost'].dtype == np.int64
+    assert analysis_df['Quantity'].dtype == np.int64
+
+    # المحلل يضرب بـ float64 حتى لو بقيت الأعمدة مصغّرة (بيانات مُجهّزة بلا إسقاط)
+    for frame in (analysis_df, df):
+        analyzer = SalesDataAnalyzer(frame, MAPPING, prepared=PreparedSalesDataset(frame, MAPPING))
+        assert analyzer._calculate_kpi_totals()['total_cogs'] == pytest.approx(expected)
+
+
+def test_compact_frame_keeps_measures_and_leaves_dates_to_projection():
+    df = pd.DataFrame({
+        'Order Date': ['2024-01-01', 'not a date'] * 50,
+        'Cost': np.arange(100, dtype=np.int64),
+        'Region': ['north', 'south'] * 50,
+    })
+    compacted = compact_frame(df)
+    assert compacted['Cost'].dtype == np.int64
+    assert isinstance(compacted['Region'].dtype, pd.CategoricalDtype)
+
+    # التاريخ غير الصالح يُعدّ عند الإسقاط ولا يُمحى عند التحميل
+    # التواريخ المضغوطة إلى category تُحوَّل إلى datetime64 لا إلى category من Timestamp
+    stats = {}
+    mapping = {'order_date': 'Order Date', 'cost': 'Cost'}
+    projected = build_analysis_frame(compacted, mapping, stats)
+    assert stats['order_date']['failed'] == 50
+    assert pd.api.types.is_datetime64_dtype(projected['Order Date'])
+    assert pd.api.types.is_datetime64_dtype(PreparedSalesDataset(compacted, mapping).dates('order_date'))
+
+
+def test_compact_frame_leaves_arrow_columns_for_zero_copy_merge():
+    df = pd.DataFrame({'Region': pd.array(['north', 'south'] * 50, dtype=pd.ArrowDtype(pa.string()))})
+    assert compact_frame(df)['Region'].dtype == df['Region'].dtype
+
+    merged, report = align_and_merge([compact_frame(df), compact_frame(df.copy())])
+    assert report['zero_copy']
+    assert isinstance(merged['Region'].dtype, pd.ArrowDtype)
+
+
+def test_categorical_dates_give_analysis_period():
+    df = pd.DataFrame({
+        'Order Date': pd.Series(['2024-01-05', '2024-03-10', 'bad'] * 10).astype('category'),
+        'Total Amount': np.ones(30),
+    })
+    mapping = {'order_date': 'Order Date', 'total_amount': 'Total Amount'}
+    analyzer = SalesDataAnalyzer(df, mapping)
+    assert analyzer._compute_date_range() == SalesDataAnalyzer.format_date_range(
+        pd.Timestamp('2024-01-05'), pd.Timestamp('2024-03-10'))
+
+
+def test_pyarrow_backend_dates_give_monthly_trends():
+    content = b'Order Date,Total Amount\n' + b''.join(
+        f'2024-{month:02d}-15,{month}.5\n'.encode() for month in range(1, 13))
+    mapping = {'order_date': 'Order Date', 'total_amount': 'Total Amount'}
+    trends = {}
+    for backend in READER_BACKENDS:
+        df, _ = read_sales_file('sales.csv', content, backend)
+        for frame in (df, build_analysis_frame(df, mapping)):
+            assert pd.api.types.is_datetime64_dtype(PreparedSalesDataset(frame, mapping).dates('order_date'))
+            trends[backend] = SalesDataAnalyzer(frame, mapping)._analyze_trends()['monthly']
+    assert len(trends['pyarrow']) == 12
+    assert trends['pyarrow'] == trends['pandas']
@@ -0,0 +1,73 @@
+"""
+اختبارات تقسيم العملاء RFM - المقاييس والدرجات تطابق groupby و pd.cut على حدود np.quantile
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sales_prepared import PreparedSalesDataset
+from sales_rfm import RFM_SEGMENTS, score, segment, summarize_rfm
+
+
+def _reference(df, frequency_column='Order ID'):
+    days = df['Order Date'].dt.normalize()
+    grouped = df.assign(day=days).groupby('Customer ID')
+    table = pd.DataFrame({
+        'recency': (days.max() - grouped['day'].max()).dt.days,
+        'frequency': grouped[frequency_column].nunique(),
+        'monetary': grouped['Total Amount'].sum(),
+    })
+    edges = lambda values: np.quantile(values, [0.2, 0.4, 0.6, 0.8])
+    # الدرجة = 1 + عدد الحدود الأصغر تماماً من القيمة
+    rank = lambda values: 1 + (values.to_numpy()[:, None] > edges(values)[None, :]).sum(axis=1)
+    table['r'] = rank(-table['recency'])
+    table['f'] = rank(table['frequency'])
+    table['m'] = rank(table['monetary'])
+    return table
+
+
+def test_rfm_table_matches_groupby(sales_df, mapping):
+    # طلبات من عدة صفوف (نفس رقم الطلب لمنتجين) تُعد طلباً واحداً
+    sales_df.loc[1::5, 'Order ID'] = sales_df['Order ID'].shift(1)[1::5]
+    sales_df.loc[1::5, 'Customer ID'] = sales_df['Customer ID'].shift(1)[1::5]
+    table = PreparedSalesDataset(sales_df, mapping).rfm()
+    expected = _reference(sales_df)
+
+    table = table.sort_index()
+    expected = expected.loc[table.index]
+    for column in ('recency', 'frequency', 'r', 'f', 'm'):
+        np.testing.assert_array_equal(table[column].to_numpy(), expected[column].to_numpy(), err_msg=column)
+    np.testing.assert_allclose(table['monetary'], expected['monetary'])
+    assert table.attrs['as_of'] == f"{sales_df['Order Date'].max():%Y-%m-%d}"
+
+
+def test_frequency_without_order_id_counts_rows(sales_df, mapping):
+    del mapping['order_id']
+    table = PreparedSalesDataset(sales_df, mapping).rfm()
+    counts = sales_df['Customer ID'].value_counts()
+    assert table['frequency'].to_dict() == counts.to_dict()
+
+
+def test_scores_keep_ties_together():
+    values = np.array([1, 1, 1, 1, 1, 1, 2, 3, 10, 50], dtype=np.float64)
+    scores = score(values)
+    assert len(set(scores[values == 1])) == 1
+    assert scores.min() >= 1 and scores.max() <= 5
+    assert np.all(np.diff(scores[np.argsort(values, kind='stable')]) >= 0)
+    np.testing.assert_array_equal(score(values, higher_is_better=False), score(-values))
+
+
+def test_segments_and_summary(sales_df, mapping):
+    assert RFM_SEGMENTS[segment(np.array([5]), np.array([5]))[0]] == 'champions'
+    assert RFM_SEGMENTS[segment(np.array([1]), np.array([1]))[0]] == 'lost'
+    assert RFM_SEGMENTS[segment(np.array([2]), np.array([4]))[0]] == 'at_risk'
+
+    table = PreparedSalesDataset(sales_df, mapping).rfm()
+    summary = summarize_rfm(table)
+    assert summary['customers'] == sales_df['Customer ID'].nunique()
+    assert sum(item['customers'] for item in summary['segments']) == summary['customers']
+    assert sum(item['revenue'] for item in summary['segments']) == pytest.approx(sales_df['Total Amount'].sum())
+    assert sum(item['customer_share'] for item in summary['segments']) == pytest.approx(100.0)
+    assert [item['segment'] for item in summary['segments']] == [
+        name for name in RFM_SEGMENTS if name in set(table['segment'])]
@@ -0,0 +1,25 @@
+"""
+اختبارات دمج الملفات - الأعمدة الناقصة تحافظ على نوعها وبدون نسخ فقط عند نجاح مسار Arrow
+"""
+
+import numpy as np
+import pandas as pd
+
+from sales_schema import align_and_merge
+
+
+def test_missing_int_and_bool_columns_keep_their_type():
+    first = pd.DataFrame({'Quantity': np.array([1, 2], dtype=np.int32), 'Returned': [True, False]})
+    second = pd.DataFrame({'Other': [1.5, 2.5, 3.5]})
+    merged, report = align_and_merge([first, second])
+    assert merged['Quantity'].dtype == 'Int32'
+    assert merged['Returned'].dtype == 'boolean'
+    assert merged['Quantity'].isna().sum() == 3
+    assert not report['zero_copy']
+
+
+def test_zero_copy_only_when_arrow_concat_succeeds():
+    ints = pd.DataFrame({'v': pd.array([1, 2], dtype='int64[pyarrow]')})
+    texts = pd.DataFrame({'v': pd.array(['a', 'b'], dtype='string[pyarrow]')})
+    assert align_and_merge([ints, ints.copy()])[1]['zero_copy']
+    assert not align_and_merge([ints, texts])[1]['zero_copy']
@@ -0,0 +1,55 @@
+"""
+اختبارات ذاكرة الأقسام - التحليل الثاني لنفس البيانات والتعيين يُعاد من الذاكرة دون إعادة حساب
+"""
+
+import pytest
+
+from sales_analyzer import SalesDataAnalyzer
+from sales_section_cache import SectionCache
+from sales_translations import TranslationSystem
+
+
+@pytest.fixture(autouse=True)
+def english(monkeypatch):
+    monkeypatch.setattr(TranslationSystem, '_language_source', 'en')
+
+
+def test_get_put_counters():
+    cache = SectionCache()
+    cache.bind('a')
+    assert cache.get('trends') == (False, None)
+    cache.put('trends', 1)
+    assert cache.get('trends') == (True, 1)
+    assert cache.get('trends', ('x',)) == (False, None)
+    assert cache.stats()['sections']['trends'] == {'hits': 1, 'misses': 2}
+
+    # ربط الذاكرة بمفتاح آخر يفرّغ النتائج
+    cache.bind('b')
+    assert cache.get('trends') == (False, None)
+    assert cache.stats()['entries'] == 0
+
+
+def test_second_analysis_hits_every_section(sales_df, mapping):
+    cache = SectionCache()
+    first = SalesDataAnalyzer(sales_df, mapping, dataset_key='k', section_cache=cache).analyze_all()
+    misses, hits = cache.misses, cache.hits
+    assert misses > 0
+
+    second = SalesDataAnalyzer(sales_df, mapping, dataset_key='k', section_cache=cache).analyze_all()
+    assert cache.misses == misses
+    # الأقسام المتداخلة (كالمجاميع) لا تُطلب أصلاً حين يُعاد القسم الخارجي من الذاكرة
+    assert cache.hits > hits
+    assert second['trends'] == first['trends']
+    assert second['growth_metrics'] == first['growth_metrics']
+
+
+@pytest.mark.parametrize('change', ['key', 'mapping'])
+def test_new_key_or_mapping_misses(sales_df, mapping, change):
+    cache = SectionCache()
+    SalesDataAnalyzer(sales_df, mapping, dataset_key='k', section_cache=cache).analyze_all()
+    misses = cache.misses
+
+    other_mapping = dict(mapping, region=None) if change == 'mapping' else mapping
+    other_key = 'k2' if change == 'key' else 'k'
+    SalesDataAnalyzer(sales_df, other_mapping, dataset_key=other_key, section_cache=cache).analyze_all()
+    assert cache.misses == 2 * misses
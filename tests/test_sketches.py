@@ -0,0 +1,100 @@
+"""
+اختبارات الملخصات التقريبية - HyperLogLog ضمن حدود الخطأ، والمئينات ضمن الدقة النسبية من np.quantile
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sales_analyzer import SalesDataAnalyzer
+from sales_prepared import PreparedSalesDataset
+from sales_sketches import DistinctCounter, HyperLogLog, QuantileSketch, QUANTILES, hash_values
+
+
+def test_hash_values_match_integral_floats():
+    np.testing.assert_array_equal(hash_values(pd.Series([1001, 7])), hash_values(pd.Series([1001.0, 7.0])))
+    assert len(set(hash_values(pd.Series(['a', 'b', 'a'])))) == 2
+
+
+@pytest.mark.parametrize('distinct', [10, 1_000, 50_000, 300_000])
+def test_hyperloglog_within_error_bound(distinct):
+    values = pd.Series([f'customer-{value}' for value in range(distinct)])
+    sketch = HyperLogLog().update(values)
+    # أربعة أضعاف الخطأ المعياري: الفشل العشوائي أقل من 1 في 10,000
+    assert sketch.count() == pytest.approx(distinct, rel=4 * sketch.relative_error)
+
+
+def test_hyperloglog_merge_equals_union():
+    first = pd.Series(np.arange(0, 60_000))
+    second = pd.Series(np.arange(40_000, 100_000))
+    merged = HyperLogLog().update(first).merge(HyperLogLog().update(second))
+    union = HyperLogLog().update(pd.concat([first, second]))
+    np.testing.assert_array_equal(merged.registers, union.registers)
+    assert merged.count() == pytest.approx(100_000, rel=4 * merged.relative_error)
+
+    with pytest.raises(ValueError):
+        HyperLogLog(10).merge(HyperLogLog(12))
+
+
+def test_distinct_counter_promotes_and_merges():
+    counter = DistinctCounter('auto', limit=1_000).update(np.arange(800))
+    assert not counter.approximate and counter.count() == 800
+    counter.merge(DistinctCounter('auto', limit=1_000).update(np.arange(500, 1_500)))
+    assert counter.approximate
+    assert counter.count() == pytest.approx(1_500, rel=4 * counter.relative_error)
+    assert DistinctCounter('exact').update([1, 2, 2, None]).count() == 2
+
+
+def test_prepared_sketch_counts_subset_values(sales_df, mapping):
+    prepared = PreparedSalesDataset(sales_df, mapping)
+    rows = np.flatnonzero(sales_df['Region'].eq('North').to_numpy())
+    subset = prepared.subset(rows)
+    exact = sales_df.iloc[rows]['Customer ID'].nunique()
+    direct = HyperLogLog().update(sales_df.iloc[rows]['Customer ID'].unique())
+    np.testing.assert_array_equal(subset.distinct_sketch('customer_id').registers, direct.registers)
+    assert subset.distinct_sketch('customer_id').count() == exact
+
+    totals = SalesDataAnalyzer(sales_df, mapping, distinct_mode='sketch')._calculate_kpi_totals()
+    assert totals['unique_customers'] == sales_df['Customer ID'].nunique()
+    assert totals['distinct_error']['unique_customers'] > 0
+
+
+def _assert_close(estimate, values, q, accuracy=0.01):
+    exact = np.quantile(values, q, method='lower')
+    assert abs(estimate - exact) <= accuracy * abs(exact) + 1e-6
+
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_quantiles_within_relative_accuracy(seed):
+    rng = np.random.default_rng(seed)
+    values = np.concatenate([rng.lognormal(4, 1.5, 20_000), -rng.lognormal(2, 1, 500), np.zeros(100)])
+    sketch = QuantileSketch.from_values(np.append(values, np.nan))
+    result = sketch.quantiles()
+    assert result['count'] == len(values)
+    for name, q in QUANTILES.items():
+        _assert_close(result[name], values, q)
+
+
+def test_grouped_quantiles_and_merge():
+    rng = np.random.default_rng(2)
+    values = rng.gamma(2.0, 50.0, 10_000)
+    groups = rng.choice(['North', 'South', 'East'], 10_000)
+    codes, uniques = pd.factorize(pd.Series(groups))
+
+    half = 5_000
+    merged = QuantileSketch.from_values(values[:half], codes[:half], uniques)
+    merged.merge(QuantileSketch.from_values(values[half:], codes[half:], uniques))
+    whole = QuantileSketch.from_values(values, codes, uniques)
+    pd.testing.assert_frame_equal(merged.table(), whole.table())
+
+    records = whole.records()
+    assert [record['count'] for record in records] == sorted(pd.Series(groups).value_counts().tolist(), reverse=True)
+    for record in records:
+        group_values = values[groups == record['value']]
+        assert record['count'] == len(group_values)
+        for name, q in QUANTILES.items():
+            _assert_close(record[name], group_values, q)
+
+
+def test_empty_sketch():
+    assert QuantileSketch.from_values(np.array([np.nan])).quantiles() == {}
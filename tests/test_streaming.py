@@ -0,0 +1,43 @@
+"""
+اختبارات التحليل المتدفق - مؤشرات الدفعات تطابق التحليل الكامل لنفس الملف
+"""
+
+import pandas as pd
+import pytest
+
+from sales_analyzer import SalesDataAnalyzer
+from sales_data_loader import read_sales_file
+from sales_streaming import stream_csv
+
+MAPPING = {
+    'order_date': 'Order Date',
+    'customer_id': 'Customer ID',
+    'product_id': 'Product ID',
+    'quantity': 'Quantity',
+    'cost': 'Cost',
+    'total_amount': 'Total Amount',
+    'region': 'Region',
+}
+
+
+def _csv():
+    # المعرّفات رقمية في الدفعة الأولى ونصية في الثانية (نفس العميل يظهر في الدفعتين)
+    lines = ['Order Date,Customer ID,Product ID,Quantity,Cost,Total Amount,Region']
+    for row in range(100):
+        customer = 'C51' if row == 99 else row % 50 + 1
+        product = 'P7' if row == 99 else row % 7
+        lines.append(f'2024-{row % 12 + 1:02d}-01,{customer},{product},{row % 5 + 1},{row % 3 + 1},{row * 1.5},R{row % 4}')
+    return ('\n'.join(lines) + '\n').encode()
+
+
+def test_streaming_kpis_match_full_analysis():
+    content = _csv()
+    streamed = stream_csv(content, MAPPING, chunksize=50).totals()
+
+    df, _ = read_sales_file('sales.csv', content)
+    full = SalesDataAnalyzer(df, MAPPING)._calculate_kpi_totals()
+
+    assert streamed['unique_customers'] == full['unique_customers'] == 51
+    assert streamed['unique_products'] == full['unique_products']
+    for key in ('total_transactions', 'total_sales', 'total_cogs', 'avg_quantity'):
+        assert streamed[key] == pytest.approx(full[key])
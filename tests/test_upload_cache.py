@@ -0,0 +1,55 @@
+"""
+اختبارات ذاكرة الملفات المحلَّلة - إزاحة LRU بحد الحجم والحفظ في Parquet ثم الاسترجاع منه
+"""
+
+import numpy as np
+import pandas as pd
+
+from sales_upload_cache import ParsedUploadCache, upload_key
+
+
+def _result(name, rows=1_000):
+    df = pd.DataFrame({'Total Amount': np.arange(rows, dtype=np.float64), 'Region': ['north'] * rows})
+    return {'name': name, 'size': rows, 'dataframe': df}
+
+
+def _bytes(result):
+    return int(result['dataframe'].memory_usage(deep=True).sum())
+
+
+def test_upload_key_depends_on_content_and_options():
+    assert upload_key(b'a,b\n1,2\n', backend='pandas') == upload_key(b'a,b\n1,2\n', backend='pandas')
+    assert upload_key(b'a,b\n1,2\n', backend='pandas') != upload_key(b'a,b\n1,2\n', backend='pyarrow')
+    assert upload_key(b'a,b\n1,2\n') != upload_key(b'a,b\n1,3\n')
+
+
+def test_lru_evicts_least_recently_used():
+    size = _bytes(_result('x'))
+    cache = ParsedUploadCache(max_bytes=2 * size)
+    cache.put('a', _result('a'))
+    cache.put('b', _result('b'))
+    assert cache.get('a')['name'] == 'a'
+    cache.put('c', _result('c'))
+
+    assert cache.get('b') is None
+    assert cache.get('a')['name'] == 'a' and cache.get('c')['name'] == 'c'
+    stats = cache.stats()
+    assert stats['entries'] == 2 and stats['bytes'] == 2 * size
+    assert (stats['hits'], stats['misses']) == (3, 1)
+
+
+def test_evicted_entries_spill_to_parquet_and_reload(tmp_path):
+    size = _bytes(_result('x'))
+    cache = ParsedUploadCache(max_bytes=size, spill_dir=str(tmp_path))
+    cache.put('a', _result('a'))
+    cache.put('b', _result('b'))
+    assert cache.stats()['entries'] == 1
+
+    restored = cache.get('a')
+    assert restored['name'] == 'a'
+    pd.testing.assert_frame_equal(restored['dataframe'], _result('a')['dataframe'])
+
+    # نسخة جديدة من الذاكرة (إعادة تشغيل) تجد الملفات المحفوظة
+    fresh = ParsedUploadCache(max_bytes=size, spill_dir=str(tmp_path))
+    assert fresh.get('b')['name'] == 'b'
+    assert fresh.get('missing') is None